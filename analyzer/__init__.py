@@ -1,20 +1,35 @@
 import importlib
-from typing import Any, Dict, List
+import os
+import time
+from contextlib import nullcontext
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Union
 
 # local modules (package)
-from .code_parser import CodeParser
+from .code_parser import EXTRACTOR_VERSION, CodeParser
 from .doc_parser import DocumentationParser
 from .comparator import Comparator
+from .watch import ProjectWatcher
+from .llm_pipeline import LLMPipeline
+from .llm_cache import LLMCache, configure_default_cache, default_cache
+from .metrics import Metrics, resolve_metrics
+from .parse_cache import ParseCache
+from .walker import walk_files
 
-# Lazy load langchain when needed
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+# Lazy load langchain when needed. The probe result is remembered either way, so a
+# missing langchain costs one failed import per process, not one per analyze_project call.
 _LLM_AVAILABLE = False
+_LLM_PROBED = False
 _llm = None
 _prompt = None
 
 def _init_llm():
-    global _LLM_AVAILABLE, _llm, _prompt
-    if _LLM_AVAILABLE:
+    global _LLM_AVAILABLE, _LLM_PROBED, _llm, _prompt
+    if _LLM_PROBED:
         return
+    _LLM_PROBED = True
     try:
         llms_mod = importlib.import_module("langchain.llms")
         prompts_mod = importlib.import_module("langchain.prompts")
@@ -29,50 +44,210 @@ def _init_llm():
     except Exception:
         _LLM_AVAILABLE = False
 
-def analyze_project(project_path: str) -> Dict[str, Any]:
-    """
-    Analyze a project directory for documentation consistency.
-    Uses local parsers/comparator and, if available, an LLM to augment results.
-    Returns a dict with status, checked_samples and issues.
-    """
-    cp = CodeParser(project_path)
-    dp = DocumentationParser(project_path)
-    code_elements = cp.analyze_directory()
-    docs = dp.read_docs()
-    comparator = Comparator(code_elements, docs)
-    issues = comparator.check_consistency()
-
-    # Try to augment analysis with LLM if available
+def _default_llm_pipeline() -> Optional[LLMPipeline]:
+    """The langchain-backed pipeline when langchain is available, else None."""
     _init_llm()
     if _LLM_AVAILABLE and _llm is not None and _prompt is not None:
-        # Create a compact code sample for the LLM
-        sample_snippets = []
-        for el in code_elements[:10]:
-            name = el.get("name")
-            doc = el.get("doc") or "<no-doc>"
-            snippet = f"{el.get('type')} {name} - doc: {doc}"
-            sample_snippets.append(snippet)
-        payload = "\n".join(sample_snippets) or "no samples"
-        formatted = _prompt.format(code_snippet=payload)
-        try:
-            llm_out = _llm(formatted)
-        except Exception:
-            try:
-                llm_out = _llm.generate([formatted])
-            except Exception:
-                llm_out = "LLM invocation failed."
-
-        return {
+        return LLMPipeline(_llm, prompt=_prompt, cache=default_cache())
+    return None
+
+
+def _result(
+    code_elements: List[Any],
+    issues: List[Any],
+    llm_pipeline: Optional[LLMPipeline],
+    llm_run: Optional[Dict[str, Any]],
+    skipped: List[Dict[str, str]],
+    cache_stats: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """The result dict of analyze_project, shared with analyze_project_async."""
+    if llm_run is not None:
+        llm_out = llm_run.pop("analysis")
+
+        result = {
             "status": "ok",
             "mode": "llm_augmented",
             "checked_samples": len(code_elements),
             "issues": issues,
-            "llm_analysis": str(llm_out)
+            "llm_analysis": llm_out,
+            "llm": llm_run,
         }
+        if llm_pipeline.cache is not None:
+            result["llm_cache"] = llm_pipeline.cache.stats()
     else:
-        return {
+        result = {
             "status": "fallback",
             "mode": "deterministic",
             "checked_samples": len(code_elements),
             "issues": issues
-        }
\ No newline at end of file
+        }
+
+    if skipped:
+        result["skipped_files"] = sorted(skipped, key=lambda s: s["path"])
+    if cache_stats is not None:
+        result["cache"] = cache_stats
+    return result
+
+
+def analyze_project(
+    project_path: str,
+    workers: Optional[int] = None,
+    cache_path: Union[str, ParseCache, None] = None,
+    llm_pipeline: Optional[LLMPipeline] = None,
+    llm_scope: str = "all",
+    metrics: Any = None,
+    executor: Optional["Executor"] = None,
+    base_revision: Optional[str] = None,
+    doc_chunk_size: Optional[int] = None,
+    mode: str = "substring",
+) -> Dict[str, Any]:
+    """
+    Analyze a project directory for documentation consistency.
+    Uses local parsers/comparator and, if available, an LLM to augment results.
+    Returns a dict with status, checked_samples and issues, plus "skipped_files" (path,
+    reason, error) when some Python files could not be read, decoded or parsed.
+    ``workers`` > 1 parses the Python files in a process pool (see CodeParser).
+    ``cache_path`` enables the on-disk parse cache; its statistics are returned under "cache"
+    (hits and misses of this call's lookups). It may also be an open ParseCache shared
+    between calls, which is then left open.
+    ``executor`` is an existing pool to parse with (see analyze_projects).
+    ``llm_pipeline`` overrides the default LLM pipeline (e.g. another client or budget);
+    ``llm_scope`` selects what it sees: "all" elements or only the "issues".
+    ``metrics`` (True or a Metrics, which may carry hooks) adds a "metrics" block with
+    per-stage wall/CPU times, counters, parse failures and the slowest files.
+    ``base_revision`` (any git revision) switches to changed-files mode: only what changed
+    since that revision is analyzed and the result lists the issues "introduced" and
+    "resolved" by the change (see analyze_changes). No LLM pass is made in that mode.
+    ``doc_chunk_size`` bounds memory for huge doc trees: docs are opened lazily and scanned
+    in windows of that many bytes, stopping once every name is found (see ChunkedMatcher).
+    ``mode`` is how a name counts as documented (see Comparator), in changed-files mode too.
+    """
+    if base_revision is not None:
+        from .changes import analyze_changes
+
+        return analyze_changes(project_path, base_revision, mode=mode)
+    metrics = resolve_metrics(metrics)
+    cp = CodeParser(project_path, workers=workers, cache=cache_path, metrics=metrics)
+    dp = DocumentationParser(project_path, lazy=bool(doc_chunk_size), metrics=metrics)
+    code_elements = cp.analyze_directory(executor)
+    cache_stats = cp.cache_stats()
+    if cp.cache is not None and cp.cache is not cache_path:
+        cp.cache.close()
+    docs = dp.iter_docs() if doc_chunk_size else dp.read_docs()
+    comparator = Comparator(code_elements, docs, mode=mode, metrics=metrics, chunk_size=doc_chunk_size)
+    issues = comparator.check_consistency()
+
+    # Try to augment analysis with LLM if available
+    if llm_pipeline is None:
+        llm_pipeline = _default_llm_pipeline()
+    llm_run = None
+    if llm_pipeline is not None:
+        with metrics.stage("llm") if metrics is not None else nullcontext():
+            llm_run = llm_pipeline.run(issues if llm_scope == "issues" else code_elements)
+    result = _result(code_elements, issues, llm_pipeline, llm_run, cp.skipped, cache_stats)
+    if metrics is not None:
+        metrics.count("elements", len(code_elements))
+        metrics.count("issues", len(issues))
+        result["metrics"] = metrics.as_dict()
+    return result
+
+
+def analyze_project_stream(
+    project_path: str,
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = None,
+    mode: str = "substring",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of analyze_project: yields each issue as soon as it is known.
+
+    Docs are indexed first, then code elements are checked while the tree is still being
+    parsed, so consumers can start reporting before the walk finishes. No LLM pass is made.
+    ``mode`` is the matching mode, as in analyze_project.
+    """
+    cp = CodeParser(project_path, workers=workers, cache=cache_path)
+    dp = DocumentationParser(project_path)
+    comparator = Comparator([], dp.iter_docs(), mode=mode)
+    try:
+        yield from comparator.iter_issues(cp.iter_elements())
+    finally:
+        if cp.cache is not None:
+            cp.cache.close()
+
+
+def _project_size(project_path: str) -> int:
+    """Total size of a project's Python files, used to schedule the largest projects first."""
+    total = 0
+    for path in walk_files(project_path, (".py",)):
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+def analyze_projects(
+    project_paths: Iterable[str],
+    workers: Optional[int] = None,
+    concurrency: int = 4,
+    cache_path: Optional[str] = None,
+    llm_pipeline: Optional[LLMPipeline] = None,
+    llm_scope: str = "all",
+) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze many projects, sharing resources between them, and yield each result as it finishes.
+
+    Projects are scheduled largest first (by Python source size) and run ``concurrency`` at
+    a time. They share one process pool of ``workers`` for parsing, one ParseCache at
+    ``cache_path`` and one LLM client/response cache. Each result is the analyze_project dict
+    plus "project" and a running "batch" block (completed, total, elapsed, projects_per_minute).
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+    ordered = sorted(project_paths, key=_project_size, reverse=True)
+    if not ordered:
+        return
+    started = time.perf_counter()
+    pool = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    cache = ParseCache(cache_path, version=EXTRACTOR_VERSION) if cache_path else None
+    if llm_pipeline is None:
+        llm_pipeline = _default_llm_pipeline()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as threads:
+            futures = {
+                threads.submit(
+                    analyze_project,
+                    path,
+                    cache_path=cache,
+                    llm_pipeline=llm_pipeline,
+                    llm_scope=llm_scope,
+                    executor=pool,
+                ): path
+                for path in ordered
+            }
+            for completed, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                elapsed = time.perf_counter() - started
+                result["project"] = futures[future]
+                result["batch"] = {
+                    "completed": completed,
+                    "total": len(ordered),
+                    "elapsed": elapsed,
+                    "projects_per_minute": (completed * 60 / elapsed) if elapsed > 0 else 0.0,
+                }
+                yield result
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        if cache is not None:
+            cache.close()
+
+
+async def analyze_project_async(project_path: str, **kwargs: Any) -> Dict[str, Any]:
+    """
+    analyze_project without blocking the event loop: I/O in threads, parsing in processes,
+    awaited LLM calls. Keyword arguments and service use (AsyncAnalyzer): see analyzer.aio.
+    """
+    from .aio import analyze_project_async as run
+
+    return await run(project_path, **kwargs)
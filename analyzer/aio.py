@@ -0,0 +1,314 @@
+"""
+Asyncio-native analysis, for embedding the checker in an event-loop service.
+
+``analyze_project_async`` returns the analyze_project result without blocking the loop:
+
+- the file walk, parse-cache lookups/writes and result assembly run in a thread pool;
+- Python files are read and parsed in a process pool, chunk by chunk (as CodeParser does
+  with ``workers``), and the docs are read and matched against the names there too;
+- the LLM pass is awaited (LLMPipeline.arun), each call bounded by the pipeline timeout.
+
+Cancelling the awaiting task (or an ``asyncio.wait_for`` around it) cancels the chunks not
+started yet and every LLM call in flight.
+
+An AsyncAnalyzer keeps those pools for the life of a service and runs at most
+``max_concurrent`` analyses at once: further callers wait for a slot (backpressure), or get
+AnalyzerBusy straight away once ``max_waiting`` of them are already queued.
+LoopLagMonitor measures how late the loop wakes up while analyses run
+(see ``python -m benchmarks.loop_lag``).
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from .code_parser import EXTRACTOR_VERSION, CodeParser, _analyze_chunk, _element_sort_key
+from .comparator import Comparator
+from .doc_parser import DocumentationParser
+from .llm_pipeline import LLMPipeline
+from .parse_cache import ParseCache
+
+DEFAULT_MAX_CONCURRENT = 4
+DEFAULT_IO_THREADS = 4
+DEFAULT_WORKER_NICE = 5
+
+
+class AnalyzerBusy(RuntimeError):
+    """Raised instead of queueing when ``max_waiting`` analyses already wait for a slot."""
+
+
+def _lower_priority(increment: int) -> None:
+    """Process-pool initializer: parsing yields the CPU to the process running the loop."""
+    if increment and hasattr(os, "nice"):
+        os.nice(increment)
+
+
+def _undocumented(
+    project_path: str, names: Set[str], mode: str, doc_chunk_size: Optional[int]
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Process-pool entry point: the ``names`` the project's docs do not mention, each with the
+    fields Comparator adds to its issues (confidence and closest in fuzzy mode, else none).
+    """
+    dp = DocumentationParser(project_path, lazy=bool(doc_chunk_size))
+    docs = dp.iter_docs() if doc_chunk_size else dp.read_docs()
+    comparator = Comparator([{"name": name} for name in names], docs, mode=mode, chunk_size=doc_chunk_size)
+    return {issue.pop("name"): issue for issue in map(dict, comparator.check_consistency())}
+
+
+def _issues(code_elements: List[Dict[str, Any]], missing: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    issues = []
+    for e in code_elements:
+        extra = missing.get(e["name"])
+        if extra is not None:
+            issues.append(dict(e, **extra) if extra else e)
+    return issues
+
+
+def _split_cached(parser: CodeParser, paths: List[str]) -> Tuple[List[List[Dict[str, Any]]], List[str]]:
+    """Elements served by the parse cache (one list per file), and the paths left to parse."""
+    cached: List[List[Dict[str, Any]]] = []
+    todo: List[str] = []
+    for path in paths:
+        hit = parser._from_cache(path)
+        if hit is None:
+            todo.append(path)
+        else:
+            cached.append(hit)
+    return cached, todo
+
+
+def _merge(
+    parser: CodeParser, files: List[List[Dict[str, Any]]], chunks: List[Tuple[Any, Any, Any]]
+) -> Tuple[List[Dict[str, Any]], Set[str]]:
+    """
+    The analyze_directory ordering, built file by file: one sort of the whole element list
+    holds the GIL for tens of milliseconds on big projects, and so stalls the loop thread.
+    """
+    for parsed, worker_metrics, worker_skipped in chunks:
+        for _ in parser._collect(parsed, worker_metrics, worker_skipped):
+            pass  # stores each file in the parse cache
+        files.extend(file_elements for _, file_elements in parsed)
+    if parser.cache is not None:
+        parser.cache.flush()
+    # All the elements of a file share its "file" key: ordering the files, then each file's
+    # elements, gives the same order as sorting everything by _element_sort_key.
+    files = sorted((f for f in files if f), key=lambda f: _element_sort_key(f[0])[0])
+    elements: List[Dict[str, Any]] = []
+    for file_elements in files:
+        elements.extend(sorted(file_elements, key=_element_sort_key))
+    return elements, {e["name"] for e in elements}
+
+
+class AsyncAnalyzer:
+    """
+    Shared pools and admission control for analyze_project_async.
+
+    ``workers`` sizes the parsing process pool (default: one per CPU), ``io_threads`` the
+    thread pool for file system, cache and blocking LLM client work. ``cache_path`` opens one
+    ParseCache for every analysis. ``llm_pipeline`` is the default pipeline (else langchain's
+    when available). Workers run ``worker_nice`` steps below the service's priority (POSIX),
+    so that on a busy host the loop keeps getting the CPU first; 0 keeps the same priority.
+    Close it with ``aclose()`` or use it as an async context manager.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        io_threads: int = DEFAULT_IO_THREADS,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT,
+        max_waiting: Optional[int] = None,
+        cache_path: Optional[str] = None,
+        llm_pipeline: Optional[LLMPipeline] = None,
+        worker_nice: int = DEFAULT_WORKER_NICE,
+    ):
+        self.workers = workers
+        self.worker_nice = worker_nice
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_waiting = max_waiting
+        self.cache_path = cache_path
+        self.llm_pipeline = llm_pipeline
+        self.running = 0
+        self.waiting = 0
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._io = ThreadPoolExecutor(max_workers=max(1, io_threads), thread_name_prefix="analyzer-io")
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cache: Optional[ParseCache] = None
+        self._default_llm_probed = False
+        self._start_lock = threading.Lock()
+
+    def stats(self) -> Dict[str, int]:
+        return {"running": self.running, "waiting": self.waiting, "max_concurrent": self.max_concurrent}
+
+    @asynccontextmanager
+    async def _admission(self) -> AsyncIterator[None]:
+        if self.max_waiting is not None and self._slots.locked() and self.waiting >= self.max_waiting:
+            raise AnalyzerBusy(f"{self.running} analyses running and {self.waiting} waiting")
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+    def _start(self) -> None:
+        # Runs in the I/O pool: opening the cache and forking the workers are blocking.
+        with self._start_lock:
+            self._start_locked()
+
+    def _start_locked(self) -> None:
+        if self.cache_path and self._cache is None:
+            self._cache = ParseCache(self.cache_path, version=EXTRACTOR_VERSION)
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_lower_priority, initargs=(self.worker_nice,)
+            )
+            self._pool.submit(int).result()
+        if self.llm_pipeline is None and not self._default_llm_probed:
+            from . import _default_llm_pipeline
+
+            self.llm_pipeline = _default_llm_pipeline()
+            self._default_llm_probed = True
+
+    async def analyze(
+        self,
+        project_path: str,
+        mode: str = "substring",
+        llm_pipeline: Optional[LLMPipeline] = None,
+        llm_scope: str = "all",
+        doc_chunk_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        analyze_project on this analyzer's pools and parse cache, with the same result. Takes
+        its ``mode``, ``llm_pipeline``, ``llm_scope`` and ``doc_chunk_size`` arguments; the
+        workers and cache are the AsyncAnalyzer's, and ``metrics``, ``executor`` and
+        ``base_revision`` are not supported.
+        """
+        async with self._admission():
+            loop = asyncio.get_running_loop()
+            io = self._io
+            await loop.run_in_executor(io, self._start)
+            pool = self._pool
+            cp = CodeParser(project_path, cache=self._cache)
+            paths = await loop.run_in_executor(io, cp.list_files)
+            cached, todo = await loop.run_in_executor(io, _split_cached, cp, paths)
+            chunks = await asyncio.gather(*(
+                loop.run_in_executor(
+                    pool,
+                    _analyze_chunk,
+                    cp.project_dir,
+                    todo[start:start + cp.chunk_size],
+                    cp.compact,
+                    False,
+                    cp.light_min_bytes,
+                    cp.light_bytes_per_def,
+                )
+                for start in range(0, len(todo), cp.chunk_size)
+            ))
+            code_elements, names = await loop.run_in_executor(io, _merge, cp, cached, chunks)
+            missing = await loop.run_in_executor(pool, _undocumented, cp.project_dir, names, mode, doc_chunk_size)
+            issues = await loop.run_in_executor(io, _issues, code_elements, missing)
+
+            if llm_pipeline is None:
+                llm_pipeline = self.llm_pipeline
+            llm_run = None
+            if llm_pipeline is not None:
+                llm_run = await llm_pipeline.arun(issues if llm_scope == "issues" else code_elements, executor=io)
+            cache_stats = cp.cache_stats()
+
+            from . import _result
+
+            return _result(code_elements, issues, llm_pipeline, llm_run, cp.skipped, cache_stats)
+
+    def _shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+        self._io.shutdown()
+        if self._cache is not None:
+            self._cache.close()
+
+    async def aclose(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(None, self._shutdown)
+
+    async def __aenter__(self) -> "AsyncAnalyzer":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+
+async def analyze_project_async(
+    project_path: str,
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = None,
+    mode: str = "substring",
+    llm_pipeline: Optional[LLMPipeline] = None,
+    llm_scope: str = "all",
+    doc_chunk_size: Optional[int] = None,
+    analyzer: Optional[AsyncAnalyzer] = None,
+) -> Dict[str, Any]:
+    """
+    analyze_project for asyncio callers, with the arguments of AsyncAnalyzer.analyze.
+    Services should pass a long-lived ``analyzer`` so pools are reused and concurrent analyses
+    are limited; otherwise a temporary one is built from ``workers`` and ``cache_path``.
+    """
+    if analyzer is not None:
+        return await analyzer.analyze(project_path, mode, llm_pipeline, llm_scope, doc_chunk_size)
+    async with AsyncAnalyzer(workers=workers, max_concurrent=1, cache_path=cache_path) as temporary:
+        return await temporary.analyze(project_path, mode, llm_pipeline, llm_scope, doc_chunk_size)
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: a task sleeps ``interval`` seconds over and over and records how
+    much later than asked it wakes up. ``async with LoopLagMonitor() as lag: ...``, then
+    ``lag.stats()`` gives the samples count and the max, mean and p99 lag in seconds.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional["asyncio.Task"] = None
+        self._tick_started = 0.0
+
+    def _record(self, now: float) -> None:
+        self.lags.append(max(0.0, now - self._tick_started - self.interval))
+
+    async def _tick(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._tick_started = loop.time()
+            await asyncio.sleep(self.interval)
+            self._record(loop.time())
+
+    async def __aenter__(self) -> "LoopLagMonitor":
+        self._task = asyncio.ensure_future(self._tick())
+        await asyncio.sleep(0)
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        now = asyncio.get_running_loop().time()
+        if now - self._tick_started > self.interval:
+            # The last tick is overdue (the loop was blocked until now): count it.
+            self._record(now)
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+
+    def stats(self) -> Dict[str, float]:
+        lags = sorted(self.lags)
+        if not lags:
+            return {"samples": 0, "max": 0.0, "mean": 0.0, "p99": 0.0}
+        return {
+            "samples": len(lags),
+            "max": lags[-1],
+            "mean": sum(lags) / len(lags),
+            "p99": lags[min(len(lags) - 1, int(len(lags) * 0.99))],
+        }
@@ -0,0 +1,229 @@
+import os
+import re
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .code_parser import CodeParser, _element_sort_key
+from .doc_parser import DOC_SUFFIXES
+from .matching import DocIndex, doc_tokens, identifier_parts
+from .walker import DEFAULT_EXCLUDED_DIRS
+
+CODE_SUFFIXES = (".py",)
+DOC_PATHSPECS = tuple(f"*{suffix}" for suffix in DOC_SUFFIXES)
+
+# Names that can be looked up with a `def`/`class` regex (docs may mention anything).
+_IDENTIFIER_RE = re.compile(r"[A-Za-z_]\w*")
+
+
+class GitError(Exception):
+    """Raised when a git command fails (not a repository, unknown revision...)."""
+
+
+def _git(cwd: str, *args: str, stdin: Optional[bytes] = None, ok: Sequence[int] = (0,)) -> bytes:
+    proc = subprocess.run(["git", *args], cwd=cwd, input=stdin, capture_output=True)
+    if proc.returncode not in ok:
+        message = proc.stderr.decode("utf-8", errors="replace").strip()
+        raise GitError(f"git {args[0]} failed: {message}")
+    return proc.stdout
+
+
+def _split_z(output: bytes) -> List[str]:
+    return [item for item in output.decode("utf-8", errors="surrogateescape").split("\0") if item]
+
+
+def _tracked(rel: str, suffixes: Tuple[str, ...]) -> bool:
+    """Whether the walker would have picked ``rel`` up (same suffixes and pruned dirs)."""
+    if not rel.endswith(suffixes):
+        return False
+    parts = rel.split("/")[:-1]
+    return not any(p in DEFAULT_EXCLUDED_DIRS or p.startswith(".venv") for p in parts)
+
+
+def changed_paths(project_path: str, base: str) -> Dict[str, str]:
+    """
+    Python and doc files that differ between ``base`` and the working tree, relative to
+    ``project_path``, mapped to "A" (added, including untracked), "M" or "D".
+    """
+    entries = _split_z(_git(project_path, "diff", "--name-status", "--no-renames", "--relative", "-z", base))
+    changes = {path: status[0] for status, path in zip(entries[::2], entries[1::2])}
+    for path in _split_z(_git(project_path, "ls-files", "--others", "--exclude-standard", "-z")):
+        changes.setdefault(path, "A")
+    suffixes = CODE_SUFFIXES + DOC_SUFFIXES
+    return {path: status for path, status in sorted(changes.items()) if _tracked(path, suffixes)}
+
+
+def _read_blobs(project_path: str, base: str, prefix: str, paths: Iterable[str]) -> Dict[str, bytes]:
+    """Raw contents of ``paths`` at revision ``base``, fetched in one ``git cat-file --batch``."""
+    paths = list(paths)
+    if not paths:
+        return {}
+    request = "".join(f"{base}:{prefix}{path}\n" for path in paths).encode("utf-8")
+    out = _git(project_path, "cat-file", "--batch", stdin=request)
+    blobs: Dict[str, bytes] = {}
+    pos = 0
+    for path in paths:
+        header_end = out.index(b"\n", pos)
+        header = out[pos:header_end].split()
+        pos = header_end + 1
+        if len(header) < 3 or header[1] != b"blob":
+            continue  # "missing": not present at base
+        size = int(header[2])
+        blobs[path] = out[pos:pos + size]
+        pos += size + 1
+    return blobs
+
+
+def _read_worktree(project_path: str, path: str) -> Optional[bytes]:
+    # Bytes: Python sources are decoded by the parser as they declare (PEP 263).
+    try:
+        with open(os.path.join(project_path, path), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _text(data: Optional[bytes]) -> Optional[str]:
+    return None if data is None else data.decode("utf-8", errors="replace")
+
+
+def _grep_files(
+    project_path: str,
+    flag: str,
+    patterns: Iterable[str],
+    pathspecs: Sequence[str],
+    revision: Optional[str] = None,
+) -> List[str]:
+    """
+    Files matching any of ``patterns`` (passed on stdin) via ``git grep -l``: in the working
+    tree, or in ``revision`` (then without the ``<revision>:`` prefix git adds).
+    """
+    stdin = "\n".join(patterns).encode("utf-8")
+    if not stdin:
+        return []
+    revisions = [revision] if revision else []
+    out = _git(project_path, "grep", "-l", "-z", flag, "-f", "-", *revisions, "--", *pathspecs, stdin=stdin, ok=(0, 1))
+    hits = _split_z(out)
+    if revision:
+        hits = [hit[len(revision) + 1:] for hit in hits]
+    return hits
+
+
+def _literal_patterns(names: Iterable[str], group: int = 256) -> List[str]:
+    """
+    ERE alternations matching any of ``names`` literally. git grep -E with a few large
+    alternations is far faster than -F with hundreds of fixed strings sharing a prefix.
+    """
+    names = sorted((n for n in names if n), key=len, reverse=True)
+    return ["|".join(re.escape(n) for n in names[i:i + group]) for i in range(0, len(names), group)]
+
+
+def _defining_files(project_path: str, names: Set[str]) -> List[str]:
+    """Tracked Python files that define a function or class named after one of ``names``."""
+    patterns = [
+        rf"^[[:space:]]*(async[[:space:]]+)?(def|class)[[:space:]]+{name}([^[:alnum:]_]|$)"
+        for name in sorted(names)
+        if _IDENTIFIER_RE.fullmatch(name)
+    ]
+    return [p for p in _grep_files(project_path, "-E", patterns, ["*.py"]) if _tracked(p, CODE_SUFFIXES)]
+
+
+def _issue_key(element: Dict[str, Any]) -> Tuple[str, str, str]:
+    # Line numbers are left out: moving an undocumented function is not a new issue.
+    return (element["file"], element["name"], element["type"])
+
+
+def analyze_changes(project_path: str, base: str, mode: str = "substring") -> Dict[str, Any]:
+    """
+    Report the documentation issues introduced or resolved since git revision ``base``.
+
+    Only the changed ``.py`` files are parsed (at ``base`` and in the working tree), plus the
+    unchanged files defining a name whose mentions changed in an edited doc. Documentation
+    is limited to the docs that mention one of those names (found with ``git grep``) and the
+    edited docs themselves, so the work done follows the size of the diff, not of the repo.
+    In ``substring`` mode, a name that only occurs inside a longer word of an edited doc is
+    not re-checked; run a full analyze_project for that.
+    """
+    project_path = project_path or "."
+    commit = _git(project_path, "rev-parse", "--verify", f"{base}^{{commit}}").decode().strip()
+    prefix = _git(project_path, "rev-parse", "--show-prefix").decode().strip()
+    changes = changed_paths(project_path, commit)
+    code_changes = {p: s for p, s in changes.items() if p.endswith(CODE_SUFFIXES)}
+    doc_changes = {p: s for p, s in changes.items() if p.endswith(DOC_SUFFIXES)}
+
+    old_blobs = _read_blobs(project_path, commit, prefix, [p for p, s in changes.items() if s != "A"])
+    new_texts = {p: _read_worktree(project_path, p) for p, s in changes.items() if s != "D"}
+
+    parser = CodeParser(project_path)
+
+    def parse(source: Optional[bytes], path: str) -> List[Dict[str, Any]]:
+        if source is None:
+            return []
+        try:
+            return parser.analyze_source(source, os.path.join(project_path, path))
+        except (SyntaxError, ValueError):
+            return []
+
+    old_elements: List[Dict[str, Any]] = []
+    new_elements: List[Dict[str, Any]] = []
+    for path in code_changes:
+        old_elements.extend(parse(old_blobs.get(path), path))
+        new_elements.extend(parse(new_texts.get(path), path))
+
+    # Names whose mentions changed in an edited doc: their (unchanged) definitions need a re-check.
+    old_tokens: Set[str] = set()
+    new_tokens: Set[str] = set()
+    for path in doc_changes:
+        if path in old_blobs:
+            old_tokens |= doc_tokens({"content": _text(old_blobs[path])})
+        if new_texts.get(path) is not None:
+            new_tokens |= doc_tokens({"content": _text(new_texts[path])})
+    touched = {part for token in old_tokens ^ new_tokens for part in identifier_parts(token)}
+    if touched:
+        for path in _defining_files(project_path, touched):
+            if path in code_changes:
+                continue
+            for element in parse(_read_worktree(project_path, path), path):
+                if touched.intersection(identifier_parts(element["name"])):
+                    old_elements.append(element)
+                    new_elements.append(dict(element))
+
+    names = {e["name"] for e in old_elements} | {e["name"] for e in new_elements}
+    patterns = _literal_patterns(names)
+
+    # Unchanged docs read the same at ``base`` and now: index them once for both sides.
+    unchanged_docs = []
+    for path in sorted(_grep_files(project_path, "-E", patterns, DOC_PATHSPECS)):
+        if path in doc_changes or not _tracked(path, DOC_SUFFIXES):
+            continue
+        text = _text(_read_worktree(project_path, path))
+        if text is not None:
+            unchanged_docs.append({"filename": os.path.basename(path), "content": text})
+    undocumented = DocIndex(unchanged_docs).missing(names, mode)
+
+    def changed_docs(texts: Dict[str, Optional[bytes]]) -> List[Dict[str, str]]:
+        return [
+            {"filename": os.path.basename(p), "content": _text(texts[p])}
+            for p in sorted(doc_changes)
+            if texts.get(p) is not None
+        ]
+
+    old_docs, new_docs = changed_docs(old_blobs), changed_docs(new_texts)
+    old_missing = DocIndex(old_docs).missing({e["name"] for e in old_elements} & undocumented, mode)
+    new_missing = DocIndex(new_docs).missing({e["name"] for e in new_elements} & undocumented, mode)
+    old_issues = {_issue_key(e): e for e in old_elements if e["name"] in old_missing}
+    new_issues = {_issue_key(e): e for e in new_elements if e["name"] in new_missing}
+    introduced = sorted((e for k, e in new_issues.items() if k not in old_issues), key=_element_sort_key)
+    resolved = sorted((e for k, e in old_issues.items() if k not in new_issues), key=_element_sort_key)
+
+    return {
+        "status": "ok",
+        "mode": "changed_files",
+        "base": base,
+        "base_commit": commit,
+        "changed_files": sorted(changes),
+        "checked_samples": len(new_elements),
+        "checked_docs": len(unchanged_docs) + len(new_docs),
+        "issues": introduced,
+        "introduced": introduced,
+        "resolved": resolved,
+    }
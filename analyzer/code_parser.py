@@ -1,85 +1,473 @@
 import os
+import sys
 import ast
-from typing import Any, Dict, List
+import gc
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .elements import CodeElement
+from .light_extract import Unsupported, definition_count, definitions, has_definitions
+from .metrics import Metrics
+from .parse_cache import ParseCache
+from .walker import walk_files
+
+if TYPE_CHECKING:
+    # concurrent.futures pulls in multiprocessing and logging: only import it when parallel.
+    from concurrent.futures import Executor, Future
+
+# Bump whenever analyze_file changes what it extracts, so cached results are discarded.
+EXTRACTOR_VERSION = 2
+
+# Number of files handed to a worker process in one task when parsing in parallel.
+DEFAULT_CHUNK_SIZE = 64
+
+# The read buffer is reused from file to file; one grown past this size is not kept.
+READ_BUFFER_LIMIT = 4 << 20
+
+# Suggested light_min_bytes when opting in: files of at least LIGHT_MIN_BYTES with at most one
+# ``def``/``class`` per LIGHT_BYTES_PER_DEF bytes (generated stubs, data tables) then go
+# through light_extract instead of a full ast.parse.
+LIGHT_MIN_BYTES = 256 << 10
+LIGHT_BYTES_PER_DEF = 2048
+
+
+def _analyze_chunk(
+    project_dir: str,
+    paths: List[str],
+    compact: bool = False,
+    collect_metrics: bool = False,
+    light_min_bytes: Optional[int] = None,
+    light_bytes_per_def: int = LIGHT_BYTES_PER_DEF,
+) -> Tuple[List[Tuple[str, List[Dict[str, Any]]]], Optional[Dict[str, Any]], List[Dict[str, str]]]:
+    """Worker entry point: parse a batch of files (sharing one read buffer) in a child process."""
+    metrics = Metrics() if collect_metrics else None
+    parser = CodeParser(
+        project_dir,
+        compact=compact,
+        metrics=metrics,
+        light_min_bytes=light_min_bytes,
+        light_bytes_per_def=light_bytes_per_def,
+    )
+    parsed = [(path, parser.analyze_file(path)) for path in paths]
+    return parsed, (metrics.as_dict() if metrics is not None else None), parser.skipped
+
+
+def _skip_reason(source: Union[bytes, bytearray, memoryview], exc: SyntaxError) -> str:
+    """"undecodable" when ``source`` cannot be decoded as it declares (PEP 263), else "syntax"."""
+    from tokenize import detect_encoding  # deferred: only needed when a file fails
+
+    data = bytes(source)
+    lines = iter(data.splitlines(keepends=True))
+    try:
+        encoding, _ = detect_encoding(lambda: next(lines, b""))
+        data.decode(encoding)
+    except (SyntaxError, LookupError, UnicodeDecodeError):
+        return "undecodable"
+    return "syntax"
+
+
+def _dict_element(
+    name: str,
+    type_: str,
+    file: str,
+    line: Optional[int],
+    doc: Optional[str],
+    signature: Optional[str] = None,
+    decorators: Tuple[str, ...] = (),
+) -> Dict[str, Any]:
+    return {
+        "name": name, "type": type_, "file": file, "line": line, "doc": doc,
+        "signature": signature, "decorators": decorators,
+    }
+
+
+_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+# Statement fields that hold nested statement lists (if/for/while/with/try/match bodies).
+_BLOCK_FIELDS = ("body", "orelse", "finalbody", "handlers", "cases")
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Suspend the cyclic GC while a module's AST is built and walked.
+
+    ast.parse allocates hundreds of thousands of container objects, which keeps triggering
+    full collections; the tree has no reference cycles and is freed by refcounting anyway.
+    """
+    if not gc.isenabled():
+        yield
+        return
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def _docstring(node: ast.AST, cleandoc) -> Optional[str]:
+    body = node.body
+    if body and isinstance(body[0], ast.Expr):
+        value = body[0].value
+        if isinstance(value, ast.Constant) and isinstance(value.value, str):
+            return cleandoc(value.value)
+    return None
+
+
+def _signature(node: ast.AST) -> str:
+    if isinstance(node, ast.ClassDef):
+        bases = [ast.unparse(b) for b in node.bases] + [ast.unparse(k) for k in node.keywords]
+        return f"({', '.join(bases)})" if bases else ""
+    prefix = "async " if isinstance(node, ast.AsyncFunctionDef) else ""
+    returns = f" -> {ast.unparse(node.returns)}" if node.returns is not None else ""
+    return f"{prefix}({ast.unparse(node.args)}){returns}"
+
+
+def _build(make, name: str, kind: str, file: str, line: int, node: ast.AST, cleandoc) -> Any:
+    return make(
+        name,
+        kind,
+        file,
+        line,
+        _docstring(node, cleandoc),
+        _signature(node),
+        tuple(ast.unparse(d) for d in node.decorator_list),
+    )
+
+
+def _extract(tree: ast.Module, file: str, make) -> List[Any]:
+    """
+    Collect every function, method and class of a module in one walk of its statements.
+
+    Names are qualified by their enclosing classes and functions (``Outer.Inner.method``,
+    ``build.helper``), so nested definitions no longer collide or go missing. Definitions
+    inside if/try/with/for blocks are found too; expressions are never visited.
+    """
+    from inspect import cleandoc  # deferred: keeps inspect out of `import analyzer`
+
+    results: List[Any] = []
+    # (statements, qualified prefix, enclosing node kind), processed depth first in source order.
+    stack: List[Tuple[List[ast.stmt], str, Optional[str]]] = [(tree.body, "", None)]
+    while stack:
+        body, prefix, scope = stack.pop()
+        nested = []
+        for stmt in body:
+            if isinstance(stmt, _DEFS):
+                name = prefix + stmt.name
+                if isinstance(stmt, ast.ClassDef):
+                    kind = "class"
+                else:
+                    kind = "method" if scope == "class" else "function"
+                results.append(_build(make, name, kind, file, stmt.lineno, stmt, cleandoc))
+                nested.append((stmt.body, name + ".", "class" if kind == "class" else "function"))
+                continue
+            for field in _BLOCK_FIELDS:
+                block = getattr(stmt, field, None)
+                if block:
+                    nested.append((block, prefix, scope))
+        stack.extend(reversed(nested))
+    return results
+
+
+def _element_sort_key(e: Dict[str, Any]):
+    return (e.get("file") or "", e.get("line") or 0, e.get("name") or "")
 
 
 class CodeParser:
     """
-    Parse Python files in a directory and extract top-level functions, async functions and classes
-    with their docstrings and location. This implementation has no external dependencies and
+    Parse Python files in a directory and extract functions, async functions, classes and
+    methods at any nesting depth, with qualified names, signatures, decorators, docstrings and
+    location. This implementation has no external dependencies and
     is safe to import in test environments where optional packages (e.g. langchain) are missing.
+
+    ``workers`` enables parallel parsing: files are split into batches of ``chunk_size`` paths
+    and parsed in a process pool. ``None``/``0``/``1`` keeps the sequential behaviour.
+    ``cache`` (a ParseCache or a path to its file) serves unchanged files without re-parsing.
+    ``compact`` returns CodeElement records (slots, interned file paths) instead of dicts.
+    ``exclude``/``include``/``max_file_size`` are passed to the shared walker (see walker.py).
+    ``metrics`` (a Metrics) records walk/read/parse times, bytes and parse failures.
+
+    Files are read as bytes in one bulk read into a buffer reused across files, and the
+    bytes go straight to the parser, which honors PEP 263 encoding cookies (latin-1, cp1252
+    ... legacy sources). Files that cannot be read, decoded or parsed are listed in
+    ``skipped`` (path, reason, error) rather than dropped silently, and are not cached.
+
+    Extraction is tiered per file. A byte scan first skips files where ``def``/``class`` never
+    occurs (they are not parsed, so not checked either). Opt-in (``light_min_bytes``, e.g.
+    LIGHT_MIN_BYTES): files of at least ``light_min_bytes`` with at most one candidate
+    definition per ``light_bytes_per_def`` bytes go through light_extract, which finds the
+    definitions without building the module's AST; whatever it cannot handle falls back to the
+    full ast.parse. It does not validate the statements outside definitions, so a syntax error
+    there is not reported in ``skipped``.
     """
 
-    def __init__(self, project_dir: str):
+    def __init__(
+        self,
+        project_dir: str,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        cache: Optional[Any] = None,
+        compact: bool = False,
+        exclude: Sequence[str] = (),
+        include: Sequence[str] = (),
+        max_file_size: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+        light_min_bytes: Optional[int] = None,
+        light_bytes_per_def: int = LIGHT_BYTES_PER_DEF,
+    ):
         self.project_dir = project_dir or "."
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        if isinstance(cache, str):
+            cache = ParseCache(cache, version=EXTRACTOR_VERSION)
+        self.cache: Optional[ParseCache] = cache
+        self.compact = compact
+        self.exclude = exclude
+        self.include = include
+        self.max_file_size = max_file_size
+        self.metrics = metrics
+        self.light_min_bytes = light_min_bytes
+        self.light_bytes_per_def = light_bytes_per_def
+        self._make_element = CodeElement if compact else _dict_element
+        self._buffer = bytearray()
+        self.skipped: List[Dict[str, str]] = []
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _skip(self, filepath: str, reason: str, exc: BaseException) -> None:
+        self.skipped.append({"path": filepath, "reason": reason, "error": f"{type(exc).__name__}: {exc}"})
+        if self.metrics is not None:
+            self.metrics.record_parse_failure(filepath, exc)
+
+    def _read(self, filepath: str) -> int:
+        """Read ``filepath`` into the shared buffer in one call; returns its size in bytes."""
+        with open(filepath, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if len(self._buffer) <= size:
+                self._buffer = bytearray(size + 1)
+            n = f.readinto(self._buffer)
+            if n == len(self._buffer):  # the file grew since fstat
+                rest = f.read()
+                self._buffer += rest
+                n += len(rest)
+        return n
 
     def analyze_file(self, filepath: str) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
+        metrics = self.metrics
+        if metrics is not None:
+            started, started_cpu = time.perf_counter(), time.process_time()
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                source = f.read()
-        except Exception:
+            size = self._read(filepath)
+        except OSError as exc:
+            self._skip(filepath, "unreadable", exc)
             return results
+        if metrics is not None:
+            read, read_cpu = time.perf_counter(), time.process_time()
+            metrics.add_time("read", read - started, read_cpu - started_cpu)
 
         try:
-            node = ast.parse(source, filename=filepath)
-        except SyntaxError:
-            return results
+            with memoryview(self._buffer) as view, view[:size] as source:
+                try:
+                    results = self._extract_tiered(source, size, filepath)
+                except (SyntaxError, ValueError) as exc:
+                    # ValueError: null bytes in the source.
+                    reason = _skip_reason(source, exc) if isinstance(exc, SyntaxError) else "syntax"
+                    self._skip(filepath, reason, exc)
+                    return results
+        finally:
+            if len(self._buffer) > READ_BUFFER_LIMIT:
+                self._buffer = bytearray()
 
-        for child in ast.iter_child_nodes(node):
-            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                results.append(
-                    {
-                        "name": child.name,
-                        "type": "function",
-                        "file": os.path.relpath(filepath, self.project_dir),
-                        "line": getattr(child, "lineno", None),
-                        "doc": ast.get_docstring(child),
-                    }
-                )
-            elif isinstance(child, ast.ClassDef):
-                # Class docstring
-                results.append(
-                    {
-                        "name": child.name,
-                        "type": "class",
-                        "file": os.path.relpath(filepath, self.project_dir),
-                        "line": getattr(child, "lineno", None),
-                        "doc": ast.get_docstring(child),
-                    }
-                )
-                # Methods inside class
-                for sub in child.body:
-                    if isinstance(sub, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                        results.append(
-                            {
-                                "name": f"{child.name}.{sub.name}",
-                                "type": "method",
-                                "file": os.path.relpath(filepath, self.project_dir),
-                                "line": getattr(sub, "lineno", None),
-                                "doc": ast.get_docstring(sub),
-                            }
-                        )
+        if metrics is not None:
+            done = time.perf_counter()
+            metrics.add_time("parse", done - read, time.process_time() - read_cpu)
+            metrics.record_file(filepath, done - started, size)
         return results
 
-    def analyze_directory(self) -> List[Dict[str, Any]]:
-        elements: List[Dict[str, Any]] = []
+    def _light_eligible(self, size: int) -> bool:
+        if self.light_min_bytes is None or size < self.light_min_bytes:
+            return False
+        return definition_count(self._buffer, size) * self.light_bytes_per_def <= size
+
+    def _extract_tiered(self, source: memoryview, size: int, filepath: str) -> List[Dict[str, Any]]:
+        """Extract the file held in the read buffer with the cheapest tier that applies."""
+        buf, metrics = self._buffer, self.metrics
+        if not has_definitions(buf, size):
+            if metrics is not None:
+                metrics.count("prefiltered_files")
+            return []
+        if self._light_eligible(size):
+            try:
+                found = definitions(buf, size)
+            except Unsupported:
+                if metrics is not None:
+                    metrics.count("light_fallbacks")
+            else:
+                from inspect import cleandoc
+
+                if metrics is not None:
+                    metrics.count("light_files")
+                file = self._relative(filepath)
+                make = self._make_element
+                return [_build(make, name, kind, file, line, node, cleandoc) for name, kind, line, node in found]
+        return self.analyze_source(source, filepath)
+
+    def _relative(self, filepath: str) -> str:
+        rel = os.path.relpath(filepath, self.project_dir)
+        return sys.intern(rel) if self.compact else rel
+
+    def analyze_source(
+        self, source: Union[str, bytes, bytearray, memoryview], filepath: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Extract the elements of ``source`` as if read from ``filepath`` (which need not exist,
+        e.g. an older revision of the file). Bytes are decoded by the parser as declared in the
+        source (PEP 263, UTF-8 by default). Raises SyntaxError when it does not parse.
+        """
+        # Per-file values are computed once and shared by every element of the file.
+        rel = self._relative(filepath)
+        with _gc_paused():
+            return _extract(ast.parse(source, filename=filepath), rel, self._make_element)
+
+    def iter_files(self) -> Iterator[str]:
+        """Yield the paths of the Python files that analyze_directory would parse."""
         if not os.path.isdir(self.project_dir):
             # If the directory doesn't exist, try current directory
             base_dir = "."
         else:
             base_dir = self.project_dir
 
-        for root, _, files in os.walk(base_dir):
-            # Skip virtualenv and common binary dirs
-            if any(part.startswith(".venv") or part == "__pycache__" for part in root.split(os.sep)):
-                continue
-            for fname in files:
-                if not fname.endswith(".py"):
+        yield from walk_files(
+            base_dir,
+            (".py",),
+            exclude=self.exclude,
+            include=self.include,
+            max_size=self.max_file_size,
+        )
+
+    def list_files(self) -> List[str]:
+        return list(self.iter_files())
+
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Parse cache statistics with the hits and misses of this parser's own lookups, as the
+        cache may be shared (evictions and bytes stay those of the whole cache).
+        """
+        if self.cache is None:
+            return None
+        lookups = self.cache_hits + self.cache_misses
+        return dict(
+            self.cache.stats(),
+            hits=self.cache_hits,
+            misses=self.cache_misses,
+            hit_rate=(self.cache_hits / lookups) if lookups else 0.0,
+        )
+
+    def _from_cache(self, path: str) -> Optional[List[Dict[str, Any]]]:
+        if self.cache is None:
+            return None
+        cached = self.cache.get(path)
+        if cached is None:
+            self.cache_misses += 1
+        else:
+            self.cache_hits += 1
+            rel = os.path.relpath(path, self.project_dir)
+            if self.compact:
+                return [CodeElement.from_dict(dict(e, file=sys.intern(rel))) for e in cached]
+            for e in cached:
+                e["file"] = rel
+                e["decorators"] = tuple(e.get("decorators") or ())
+        return cached
+
+    def _collect(
+        self,
+        parsed: List[Tuple[str, List[Dict[str, Any]]]],
+        worker_metrics: Optional[Dict[str, Any]] = None,
+        worker_skipped: Optional[List[Dict[str, str]]] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        if worker_metrics is not None and self.metrics is not None:
+            self.metrics.merge(worker_metrics)
+        if worker_skipped:
+            self.skipped.extend(worker_skipped)
+        # A skipped file is re-tried on the next run instead of being cached as empty.
+        skipped = {s["path"] for s in self.skipped} if self.skipped else ()
+        for path, file_elements in parsed:
+            if self.cache is not None and path not in skipped:
+                self.cache.put(path, file_elements)
+            yield from file_elements
+
+    def _submit(self, pool: "Executor", chunk: List[str], collect_metrics: bool) -> "Future":
+        return pool.submit(
+            _analyze_chunk,
+            self.project_dir,
+            chunk,
+            self.compact,
+            collect_metrics,
+            self.light_min_bytes,
+            self.light_bytes_per_def,
+        )
+
+    def iter_elements(self, executor: Optional["Executor"] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield elements file by file, as soon as each file is parsed (or served from the cache).
+
+        Elements come out in walk order, not in the sorted order of analyze_directory. In
+        parallel mode at most a few chunks per worker are in flight, so memory stays bounded.
+        """
+        parallel = executor is not None or (self.workers or 0) > 1
+        max_in_flight = 2 * (self.workers or os.cpu_count() or 1)
+        pool = executor
+        in_flight: Deque["Future"] = deque()
+        chunk: List[str] = []
+        files = self.iter_files()
+        if self.metrics is not None:
+            files = self.metrics.timed_iter("walk", files)
+        collect_metrics = self.metrics is not None
+        try:
+            for path in files:
+                cached = self._from_cache(path)
+                if cached is not None:
+                    yield from cached
+                    continue
+                if not parallel:
+                    yield from self._collect([(path, self.analyze_file(path))])
+                    continue
+                chunk.append(path)
+                if len(chunk) < self.chunk_size:
                     continue
-                path = os.path.join(root, fname)
-                elements.extend(self.analyze_file(path))
+                if pool is None:
+                    from concurrent.futures import ProcessPoolExecutor
+
+                    pool = ProcessPoolExecutor(max_workers=self.workers)
+                in_flight.append(self._submit(pool, chunk, collect_metrics))
+                chunk = []
+                if len(in_flight) >= max_in_flight:
+                    yield from self._collect(*in_flight.popleft().result())
+            if chunk:
+                # Left-over batch: not worth a round trip when no pool was needed so far.
+                if pool is None:
+                    yield from self._collect([(path, self.analyze_file(path)) for path in chunk])
+                else:
+                    in_flight.append(self._submit(pool, chunk, collect_metrics))
+            while in_flight:
+                yield from self._collect(*in_flight.popleft().result())
+        finally:
+            if pool is not None and executor is None:
+                pool.shutdown(cancel_futures=True)
+            if self.cache is not None:
+                self.cache.flush()
+
+    def analyze_directory(self, executor: Optional["Executor"] = None) -> List[Dict[str, Any]]:
+        """
+        Parse every Python file under the project directory.
+
+        When ``workers`` is greater than one (or an ``executor`` is supplied) the files are
+        parsed in parallel; the merged result uses the same ordering as the sequential path.
+        """
+        elements = list(self.iter_elements(executor))
 
         # Ensure deterministic ordering for tests
-        elements.sort(key=lambda e: (e.get("file") or "", e.get("line") or 0, e.get("name") or ""))
-        return elements
\ No newline at end of file
+        elements.sort(key=_element_sort_key)
+        return elements
@@ -1,24 +1,76 @@
-import re
+from contextlib import nullcontext
+
+from .matching import ChunkedMatcher, DocIndex
+
 
 class Comparator:
-    def __init__(self, code_elements, docs):
+    """
+    ``mode`` selects how names are matched against the docs: ``substring`` (default,
+    same results as a plain ``name in text`` check), the stricter ``identifier``, or the
+    Markdown-aware ``code``, ``heading`` and ``structured`` (see DocIndex). In the looser
+    ``fuzzy`` mode (see FuzzyIndex) each issue is a copy of the element with a "confidence"
+    that it is really undocumented (1 - match score) and the "closest" doc words, or None.
+    ``metrics`` (a Metrics) times the "index" and "compare" stages.
+    ``chunk_size`` switches check_consistency to the bounded-memory scan (ChunkedMatcher,
+    substring and identifier modes): docs are read window by window of that many
+    characters/bytes and reading stops as soon as every name is found.
+    """
+
+    def __init__(self, code_elements, docs, mode="substring", metrics=None, chunk_size=None):
         self.code_elements = code_elements
         self.docs = docs
+        self.mode = mode
+        self.metrics = metrics
+        self.chunk_size = chunk_size
+
+    def _stage(self, name):
+        return self.metrics.stage(name) if self.metrics is not None else nullcontext()
+
+    def _issue(self, element, index):
+        if self.mode != "fuzzy":
+            return element
+        score, closest = index.fuzzy.score(element["name"])
+        return dict(element, confidence=round(1.0 - score, 3), closest=closest)
 
     def check_consistency(self):
         """Compare le code et la doc et détecte les éléments manquants."""
-        missing = []
-        all_doc_text = " ".join(d["content"] for d in self.docs)
+        if self.chunk_size:
+            with self._stage("compare"):
+                matcher = ChunkedMatcher((e["name"] for e in self.code_elements), self.mode, self.chunk_size)
+                for doc in self.docs:
+                    if matcher.feed(doc):
+                        break
+                missing_names = matcher.missing()
+                return [element for element in self.code_elements if element["name"] in missing_names]
+        with self._stage("index"):
+            index = DocIndex(self.docs)
+        with self._stage("compare"):
+            missing_names = index.missing((e["name"] for e in self.code_elements), self.mode)
+            return [self._issue(e, index) for e in self.code_elements if e["name"] in missing_names]
+
+    def iter_issues(self, code_elements=None):
+        """
+        Yield missing elements one at a time, as soon as each one is known.
 
-        for element in self.code_elements:
-            if element["name"] not in all_doc_text:
-                missing.append(element)
-        return missing
+        The docs are indexed up front; ``code_elements`` may then be any iterable (for
+        instance CodeParser.iter_elements()) and is consumed lazily.
+        """
+        with self._stage("index"):
+            index = DocIndex(self.docs)
+        known = {}
+        for element in self.code_elements if code_elements is None else code_elements:
+            name = element["name"]
+            documented = known.get(name)
+            if documented is None:
+                documented = known[name] = index.contains(name, self.mode)
+            if not documented:
+                yield self._issue(element, index)
 
 
 if __name__ == "__main__":
-    from code_parser import CodeParser
-    from doc_parser import DocumentationParser
+    # Run from the repository root with: python -m analyzer.comparator
+    from .code_parser import CodeParser
+    from .doc_parser import DocumentationParser
 
     code_parser = CodeParser("example_project")
     doc_parser = DocumentationParser("example_project")
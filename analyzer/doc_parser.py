@@ -1,26 +1,125 @@
+import mmap
 import os
-import markdown
+import time
+from collections.abc import Mapping
+from contextlib import contextmanager
+
+from .walker import walk_files
+
+DOC_SUFFIXES = (".md", ".txt")
+
+# Au-delà de cette taille, le contenu est lu via mmap plutôt que chargé en mémoire.
+MMAP_THRESHOLD = 1 << 20
+
+
+class LazyDocument(Mapping):
+    """
+    Document dont le contenu n'est lu qu'au moment où on en a besoin.
+
+    Se comporte comme les dicts de read_docs (``doc["filename"]``, ``doc["content"]``) mais
+    ne garde rien en mémoire : ``content`` relit le fichier à chaque accès. Pour parcourir
+    un gros fichier sans le copier dans une ``str``, utiliser ``buffer()``.
+    """
+
+    __slots__ = ("path", "filename", "size")
+    KEYS = ("filename", "content")
+
+    def __init__(self, path, size=None):
+        self.path = path
+        self.filename = os.path.basename(path)
+        self.size = os.path.getsize(path) if size is None else size
+
+    @property
+    def content(self):
+        with open(self.path, "r", encoding="utf-8") as file:
+            return file.read()
+
+    @contextmanager
+    def buffer(self):
+        """Contenu brut (bytes) ; projeté en mémoire (mmap) pour les gros fichiers."""
+        with open(self.path, "rb") as file:
+            if self.size < MMAP_THRESHOLD:
+                yield file.read()
+                return
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+
+    def __getitem__(self, key):
+        if key == "filename":
+            return self.filename
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"LazyDocument({self.path!r}, size={self.size})"
+
 
 class DocumentationParser:
-    def __init__(self, directory):
+    """
+    ``lazy=True`` produit des LazyDocument au lieu de dicts déjà chargés, pour que la
+    mémoire reste bornée quelle que soit la taille totale de la documentation.
+    ``metrics`` (un Metrics) mesure le parcours, la lecture et le volume lu.
+    """
+
+    def __init__(self, directory, exclude=(), include=(), max_file_size=None, lazy=False, metrics=None):
         self.directory = directory
+        self.lazy = lazy
+        self.metrics = metrics
+        self.exclude = exclude
+        self.include = include
+        self.max_file_size = max_file_size
+
+    def iter_files(self):
+        """Chemins des fichiers de documentation, via le parcours partagé avec CodeParser."""
+        return walk_files(
+            self.directory,
+            DOC_SUFFIXES,
+            exclude=self.exclude,
+            include=self.include,
+            max_size=self.max_file_size,
+        )
+
+    def iter_docs(self):
+        """Produit les documents un par un, au fil du parcours du répertoire."""
+        metrics = self.metrics
+        files = self.iter_files()
+        if metrics is not None:
+            files = metrics.timed_iter("docs_walk", files)
+        for filepath in files:
+            if self.lazy:
+                doc = LazyDocument(filepath)
+                if metrics is not None:
+                    metrics.count("doc_files")
+                    metrics.count("doc_bytes", doc.size)
+                yield doc
+                continue
+            if metrics is not None:
+                started, started_cpu = time.perf_counter(), time.process_time()
+            with open(filepath, "r", encoding="utf-8") as file:
+                doc = {
+                    "filename": os.path.basename(filepath),
+                    "content": file.read()
+                }
+            if metrics is not None:
+                metrics.add_time("docs_read", time.perf_counter() - started, time.process_time() - started_cpu)
+                metrics.count("doc_files")
+                metrics.count("doc_bytes", os.path.getsize(filepath))
+            yield doc
 
     def read_docs(self):
         """Lit les fichiers Markdown et retourne leur contenu brut."""
-        docs = []
-        for root, _, files in os.walk(self.directory):
-            for f in files:
-                if f.endswith(".md") or f.endswith(".txt"):
-                    filepath = os.path.join(root, f)
-                    with open(filepath, "r", encoding="utf-8") as file:
-                        docs.append({
-                            "filename": f,
-                            "content": file.read()
-                        })
-        return docs
+        return list(self.iter_docs())
 
 
 if __name__ == "__main__":
+    # Run from the repository root with: python -m analyzer.doc_parser
     parser = DocumentationParser("example_project")
     docs = parser.read_docs()
     for d in docs:
@@ -0,0 +1,182 @@
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .matching import TOKEN_RE, identifier_parts
+
+# Where an identifier was seen in a document; a structure stores the OR of these per name.
+HEADING = 1
+CODE = 2
+TEXT = 4
+
+# Flags a name must carry to count as documented in each structure-aware matching mode.
+MODE_FLAGS = {"code": CODE, "heading": HEADING, "structured": HEADING | CODE}
+
+# Line-level Markdown syntax. This is deliberately a small subset of CommonMark: enough to
+# tell headings, fenced blocks and code spans apart from prose, one line at a time.
+FENCE_RE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+ATX_RE = re.compile(r"^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$")
+SETEXT_RE = re.compile(r"^ {0,3}(?:=+|-+)[ \t]*$")
+CODE_SPAN_RE = re.compile(r"(`+)(.+?)\1")
+
+# Number of parsed documents kept by the default structure cache.
+DEFAULT_CACHED_STRUCTURES = 256
+
+
+class DocStructure:
+    """
+    Structural index of one Markdown document.
+
+    ``headings`` lists (level, title, line) in document order. ``contexts`` maps every
+    identifier to the OR of HEADING / CODE / TEXT flags for the places it occurs (code spans
+    and fenced blocks count as CODE). ``sections`` maps it to the indexes of the headings it
+    appears under, -1 standing for text before the first heading.
+    """
+
+    __slots__ = ("headings", "contexts", "sections")
+
+    def __init__(self) -> None:
+        self.headings: List[Tuple[int, str, int]] = []
+        self.contexts: Dict[str, int] = {}
+        self.sections: Dict[str, List[int]] = {}
+
+    def _note(self, text: str, flag: int) -> None:
+        section = len(self.headings) - 1
+        contexts, sections = self.contexts, self.sections
+        for token in TOKEN_RE.findall(text):
+            for name in identifier_parts(token):
+                contexts[name] = contexts.get(name, 0) | flag
+                seen = sections.get(name)
+                if seen is None:
+                    sections[name] = [section]
+                elif seen[-1] != section:
+                    seen.append(section)
+
+    def _note_inline(self, text: str, flag: int) -> None:
+        # Code spans are indexed as CODE (plus ``flag`` inside headings); the rest as ``flag``.
+        if "`" in text:
+            for match in CODE_SPAN_RE.finditer(text):
+                self._note(match.group(2), CODE | (flag & HEADING))
+            text = CODE_SPAN_RE.sub(" ", text)
+        self._note(text, flag)
+
+    def _heading(self, level: int, title: str, line: int) -> None:
+        self.headings.append((level, title.strip(), line))
+        self._note_inline(title, HEADING)
+
+    def section_titles(self, name: str) -> List[str]:
+        """Titles of the sections mentioning ``name`` ("" for text before the first heading)."""
+        return [self.headings[i][1] if i >= 0 else "" for i in self.sections.get(name, ())]
+
+
+def parse_structure(lines: Iterable[str]) -> DocStructure:
+    """Build the DocStructure of a Markdown document given as an iterable of lines."""
+    structure = DocStructure()
+    fence = None
+    pending: Optional[Tuple[int, str]] = None  # last prose line, in case a setext underline follows
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if fence is not None:
+            stripped = line.strip()
+            if stripped.startswith(fence) and not stripped.strip(fence[0]):
+                fence = None
+            else:
+                structure._note(line, CODE)
+            continue
+
+        if pending is not None and SETEXT_RE.match(line):
+            structure._heading(1 if line.lstrip()[0] == "=" else 2, pending[1], pending[0])
+            pending = None
+            continue
+        if pending is not None:
+            structure._note_inline(pending[1], TEXT)
+            pending = None
+
+        opening = FENCE_RE.match(line)
+        if opening:
+            fence = opening.group(1)
+            continue
+        heading = ATX_RE.match(line)
+        if heading:
+            structure._heading(len(heading.group(1)), heading.group(2) or "", number)
+        elif line.strip():
+            pending = (number, line)
+    if pending is not None:
+        structure._note_inline(pending[1], TEXT)
+    return structure
+
+
+def fingerprint(doc: Mapping[str, Any]) -> Tuple:
+    """Cache key of a document: stat signature for lazy documents, content hash otherwise."""
+    path = getattr(doc, "path", None)
+    if path is not None:
+        st = os.stat(path)
+        return ("file", os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    return ("text", hashlib.sha1(doc["content"].encode("utf-8")).hexdigest())
+
+
+class StructureCache:
+    """
+    In-memory LRU of DocStructure keyed by document fingerprint, so each document is
+    parsed once per content however many comparisons or watcher refreshes look at it.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHED_STRUCTURES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple, DocStructure]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, doc: Mapping[str, Any]) -> DocStructure:
+        key = fingerprint(doc)
+        with self._lock:
+            structure = self._entries.get(key)
+            if structure is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return structure
+            self.misses += 1
+        if hasattr(doc, "path"):
+            # Lazy document: stream its lines rather than loading the whole text.
+            with open(doc.path, "r", encoding="utf-8") as f:
+                structure = parse_structure(f)
+        else:
+            structure = parse_structure(doc["content"].splitlines())
+        with self._lock:
+            self._entries[key] = structure
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return structure
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+_default_cache: Optional[StructureCache] = None
+
+
+def default_structure_cache() -> StructureCache:
+    """Process-wide structure cache used by DocIndex."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = StructureCache()
+    return _default_cache
+
+
+def doc_structure(doc: Mapping[str, Any], cache: Optional[StructureCache] = None) -> DocStructure:
+    """DocStructure of ``doc``, parsed at most once per fingerprint."""
+    return (cache or default_structure_cache()).get(doc)
@@ -0,0 +1,61 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+
+class CodeElement(Mapping):
+    """
+    Compact, read-only record for one extracted function, class or method.
+    ``name`` is qualified by the enclosing scopes (``Outer.Inner.method``).
+
+    Uses ``__slots__`` instead of a per-element dict and is meant to share one interned
+    ``file`` string per source file. It behaves like the historical element dicts
+    (``e["name"]``, ``e.get("doc")``, ``dict(e)``, equality with dicts) so Comparator and
+    other callers keep working unchanged.
+    """
+
+    FIELDS = ("name", "type", "file", "line", "doc", "signature", "decorators")
+    __slots__ = FIELDS
+
+    def __init__(
+        self,
+        name: str,
+        type: str,
+        file: str,
+        line: Optional[int],
+        doc: Optional[str],
+        signature: Optional[str] = None,
+        decorators: Tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.type = type
+        self.file = file
+        self.line = line
+        self.doc = doc
+        self.signature = signature
+        self.decorators = decorators
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CodeElement":
+        values = {field: data.get(field) for field in cls.FIELDS}
+        values["decorators"] = tuple(values["decorators"] or ())
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __reduce__(self):
+        return (self.__class__, tuple(getattr(self, field) for field in self.FIELDS))
+
+    def __repr__(self) -> str:
+        return f"CodeElement({self.to_dict()!r})"
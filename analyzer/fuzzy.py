@@ -0,0 +1,246 @@
+"""
+Fuzzy name matching, for docs that refer to an element without spelling its name exactly:
+``Student.__init__`` documented as "Student's constructor" or ``Student.init``,
+``Student.get_grade`` as ``Student.get_grades``.
+
+Names and document text are split into lower-case words: dots, underscores and camelCase
+humps separate words, so ``__init__`` is the word ``init``. The index keeps, over the docs:
+
+- the word vocabulary, with a character n-gram index over it (n-gram -> word ids);
+- which words occur close to each other (within WINDOW consecutive words), as a fixed-size
+  bit set of hashed word-id pairs.
+
+A name (its last two components: owner and member) is scored word by word with the best
+vocabulary match: 1.0 when exact, SYNONYM_SCORE for a known synonym (``init`` and
+"constructor"), else the n-gram similarity. The mean is scaled by SCATTERED_FACTOR unless
+consecutive words also occur near each other in the docs.
+
+Candidates come from the rarest n-grams of a word (prefix filtering: a word sharing none of
+them cannot reach the similarity threshold), reading at most ``max_postings`` posting
+entries, and at most ``max_candidates`` of them are verified. Word results are memoized:
+a lookup costs about the same whatever the size of the docs.
+"""
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .matching import TOKEN_RE
+
+NGRAM = 3
+
+# Two words are "near" when they occur within this many consecutive words.
+WINDOW = 4
+
+# Size of the word-pair bit set (4 MiB); a collision can only make two words look near.
+PAIR_BITS = 1 << 25
+_PAIR_MASK = PAIR_BITS - 1
+_MIX_LOW, _MIX_HIGH = 0x9E3779B1, 0x85EBCA77
+
+DEFAULT_MAX_CANDIDATES = 32
+
+# Posting entries read per word looked up, rarest n-grams first: bounds the lookup cost
+# when a large vocabulary makes even the rarest n-grams of a word common.
+DEFAULT_MAX_POSTINGS = 1024
+DEFAULT_WORD_SIMILARITY = 0.7
+DEFAULT_THRESHOLD = 0.75
+
+# Alternatives kept per name word when checking that the words occur near each other.
+WORD_ALTERNATIVES = 3
+
+SYNONYM_SCORE = 0.9
+SCATTERED_FACTOR = 0.5
+
+# How docs commonly name special methods.
+SYNONYMS = {
+    "init": ("constructor", "initializer", "initialiser"),
+    "new": ("constructor",),
+    "del": ("destructor", "finalizer"),
+    "repr": ("representation",),
+    "str": ("string",),
+    "len": ("length",),
+    "iter": ("iterator", "iteration"),
+    "eq": ("equality", "equal"),
+    "hash": ("hashable",),
+    "call": ("callable",),
+    "enter": ("context",),
+    "exit": ("context",),
+}
+
+_PART_SPLIT_RE = re.compile(r"[._]+")
+_CAMEL_SPLIT_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+
+
+def words(text: str) -> List[str]:
+    """Lower-case words of ``text`` in order (``Student.get_gradeHTTP`` -> student get grade http)."""
+    out: List[str] = []
+    for token in TOKEN_RE.findall(text):
+        for part in _PART_SPLIT_RE.split(token):
+            if not part:
+                continue
+            if part.islower() or part.isdigit():
+                out.append(part)
+            else:
+                out.extend(w.lower() for w in _CAMEL_SPLIT_RE.split(part))
+    return out
+
+
+def name_words(name: str) -> List[str]:
+    """Words of the owner and member parts of a qualified name (``a.B.c`` -> b c)."""
+    return words(".".join(name.split(".")[-2:]))
+
+
+def _pair_bit(a: int, b: int) -> int:
+    """Bit of the (unordered) word-id pair in the pair bit set."""
+    if a > b:
+        a, b = b, a
+    return (a * _MIX_LOW + b * _MIX_HIGH) & _PAIR_MASK
+
+
+def ngrams(word: str) -> Set[str]:
+    padded = f"${word}$"
+    return {padded[i:i + NGRAM] for i in range(max(1, len(padded) - NGRAM + 1))}
+
+
+class FuzzyIndex:
+    """
+    Word and n-gram index over documents for the ``fuzzy`` matching mode (see DocIndex).
+
+    ``score(name)`` is in [0, 1]; a name is ``documented`` from ``threshold`` on. Words are
+    similar from ``word_similarity`` on (Dice coefficient of their n-gram sets), and at
+    most ``max_candidates`` vocabulary words, found in at most ``max_postings`` posting
+    entries, are verified per word looked up.
+    """
+
+    def __init__(
+        self,
+        docs: Iterable[Mapping[str, Any]] = (),
+        max_candidates: int = DEFAULT_MAX_CANDIDATES,
+        max_postings: int = DEFAULT_MAX_POSTINGS,
+        word_similarity: float = DEFAULT_WORD_SIMILARITY,
+        threshold: float = DEFAULT_THRESHOLD,
+    ):
+        self.max_candidates = max(1, max_candidates)
+        self.max_postings = max(1, max_postings)
+        self.word_similarity = word_similarity
+        self.threshold = threshold
+        self._ids: Dict[str, int] = {}
+        self._vocabulary: List[str] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._pairs = bytearray(PAIR_BITS >> 3)
+        self._similar: Dict[str, List[Tuple[float, str]]] = {}
+        self._scores: Dict[str, Tuple[float, Optional[str]]] = {}
+        for d in docs:
+            self.add(d)
+
+    def _id(self, word: str) -> int:
+        wid = self._ids.get(word)
+        if wid is None:
+            wid = self._ids[word] = len(self._vocabulary)
+            self._vocabulary.append(word)
+            postings = self._postings
+            for gram in ngrams(word):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [wid]
+                else:
+                    posting.append(wid)
+        return wid
+
+    def add(self, doc: Mapping[str, Any]) -> None:
+        """Index one more document (a dict with "content" or a lazy document)."""
+        pairs, ids, new_id = self._pairs, self._ids, self._id
+        recent: List[int] = []
+        for word in words(doc["content"]):
+            wid = ids.get(word)
+            if wid is None:
+                wid = new_id(word)
+            for other in recent:
+                # _pair_bit, inlined: this loop runs a few times per word of the docs.
+                if other < wid:
+                    i = (other * _MIX_LOW + wid * _MIX_HIGH) & _PAIR_MASK
+                elif other > wid:
+                    i = (wid * _MIX_LOW + other * _MIX_HIGH) & _PAIR_MASK
+                else:
+                    continue
+                pairs[i >> 3] |= 1 << (i & 7)
+            recent.append(wid)
+            if len(recent) == WINDOW:
+                del recent[0]
+        self._similar.clear()
+        self._scores.clear()
+
+    def near(self, a: str, b: str) -> bool:
+        """Whether words ``a`` and ``b`` occur within WINDOW consecutive words of some document."""
+        ia, ib = self._ids.get(a), self._ids.get(b)
+        if ia is None or ib is None:
+            return False
+        if ia == ib:
+            return True
+        i = _pair_bit(ia, ib)
+        return bool(self._pairs[i >> 3] & (1 << (i & 7)))
+
+    def similar(self, word: str) -> List[Tuple[float, str]]:
+        """Vocabulary words matching ``word``, best first, as (similarity, word) pairs."""
+        found = self._similar.get(word)
+        if found is None:
+            found = self._similar[word] = self._lookup(word)
+        return found
+
+    def _lookup(self, word: str) -> List[Tuple[float, str]]:
+        matches: Dict[str, float] = {}
+        if word in self._ids:
+            matches[word] = 1.0
+        for synonym in SYNONYMS.get(word, ()):
+            if synonym in self._ids:
+                matches.setdefault(synonym, SYNONYM_SCORE)
+        grams = ngrams(word)
+        t = self.word_similarity
+        # Dice >= t needs at least this many shared n-grams, so a match shares one of the
+        # len(grams) - overlap + 1 rarest n-grams of ``word``: only those are probed.
+        overlap = max(1, math.ceil(t * len(grams) / (2 - t)))
+        postings = self._postings
+        probes = sorted(grams, key=lambda g: len(postings.get(g, ())))[:len(grams) - overlap + 1]
+        shared: Counter = Counter()
+        budget = self.max_postings
+        for gram in probes:
+            posting = postings.get(gram, ())
+            if len(posting) > budget:
+                posting = posting[:budget]
+            shared.update(posting)
+            budget -= len(posting)
+            if not budget:
+                break
+        vocabulary = self._vocabulary
+        for wid, _ in shared.most_common(self.max_candidates):
+            other = vocabulary[wid]
+            if other in matches:
+                continue
+            other_grams = ngrams(other)
+            similarity = 2 * len(grams & other_grams) / (len(grams) + len(other_grams))
+            if similarity >= t:
+                matches[other] = similarity
+        return sorted(((s, w) for w, s in matches.items()), key=lambda m: (-m[0], m[1]))[:WORD_ALTERNATIVES]
+
+    def score(self, name: str) -> Tuple[float, Optional[str]]:
+        """Match score of ``name`` in [0, 1] and the doc words that matched it best (or None)."""
+        found = self._scores.get(name)
+        if found is not None:
+            return found
+        options = [self.similar(w) for w in name_words(name)]
+        if not options:
+            found = (0.0, None)
+        else:
+            best = [o[0] if o else (0.0, "") for o in options]
+            score = sum(s for s, _ in best) / len(best)
+            for left, right in zip(options, options[1:]):
+                if not any(self.near(a, b) for _, a in left for _, b in right):
+                    score *= SCATTERED_FACTOR
+                    break
+            closest = " ".join(w for _, w in best if w)
+            found = (score, closest or None)
+        self._scores[name] = found
+        return found
+
+    def documented(self, name: str) -> bool:
+        return self.score(name)[0] >= self.threshold
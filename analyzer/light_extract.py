@@ -0,0 +1,309 @@
+"""
+Lightweight extraction for large, mostly generated modules (protobuf stubs, data tables).
+
+ast.parse builds a node for every literal of a multi-MB table, while such a file only holds a
+handful of definitions. ``definitions`` finds them with a lexer that only materializes what
+decides the statement structure: strings, comments, brackets and the start of each logical
+line outside brackets, all matched by compiled regexes (the tokenize module is pure Python
+and slower than ast.parse itself). The indentation of the logical lines gives the nesting;
+each definition's decorators, header and first statement are then parsed on their own, so
+names, signatures, decorators and docstrings come out exactly as from the full AST walk, in
+the same order.
+
+Anything the lexer does not model (tab indentation, backslash continuations, f-strings on
+3.12+, multi-byte encodings other than UTF-8, unbalanced brackets...) raises Unsupported and
+the caller falls back to the full parse. Statements other than definitions are not validated.
+"""
+import ast
+import codecs
+import re
+import sys
+from typing import Any, List, Optional, Tuple
+
+_DEFS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+# The next byte that matters. Outside brackets newlines end logical lines (and a backslash
+# outside a string can only be a continuation); inside them only nesting and strings matter.
+# A plain character class lets the regex engine skip everything else at memchr-like speed.
+_TOP_RE = re.compile(rb"[\"'#()\[\]{}\n\\]")
+_NESTED_RE = re.compile(rb"[\"'#()\[\]{}]")
+_QUOTES = (ord('"'), ord("'"))
+_QUOTE = {ord('"'): b'"', ord("'"): b"'"}
+_TRIPLE_TAIL = {ord('"'): b'""', ord("'"): b"''"}
+_TRIPLE_QUOTE = {ord('"'): b'"""', ord("'"): b"'''"}
+_BACKSLASH = ord("\\")
+_OPENING = (ord("("), ord("["), ord("{"))
+_CLOSING = (ord(")"), ord("]"), ord("}"))
+_HASH, _NEWLINE = ord("#"), ord("\n")
+# Rest of a string after its opening quote; backslash pairs are skipped, raw or not.
+# Possessive quantifiers (3.11+) leave nothing to backtrack into: long escaped blobs stay fast.
+_P = b"+" if sys.version_info >= (3, 11) else b""
+_STRING_END = {
+    ord('"'): re.compile(rb'[^"\\\n]*%s(?:(?:\\\r\n|\\.)[^"\\\n]*%s)*%s"' % (_P, _P, _P), re.S),
+    ord("'"): re.compile(rb"[^'\\\n]*%s(?:(?:\\\r\n|\\.)[^'\\\n]*%s)*%s'" % (_P, _P, _P), re.S),
+}
+_TRIPLE_END = {
+    ord('"'): re.compile(rb'[^"\\]*%s(?:(?:\\.|"(?!""))[^"\\]*%s)*%s"""' % (_P, _P, _P), re.S),
+    ord("'"): re.compile(rb"[^'\\]*%s(?:(?:\\.|'(?!''))[^'\\]*%s)*%s'''" % (_P, _P, _P), re.S),
+}
+_INDENT_RE = re.compile(rb"[ \t\f]*")
+_DEF_RE = re.compile(rb"(?:async[ \t]+)?(?:def|class)[ \t]")
+_CLAUSE_RE = re.compile(rb"(try|except|else|finally)(?![\w\x80-\xff])")
+_DOCSTRING_START_RE = re.compile(rb"[rRbBuUfF]{0,2}[\"']|\(")
+_IDENTIFIER_TAIL_RE = re.compile(rb"[\w\x80-\xff]")
+
+# Single-byte or UTF-8 encodings, where a byte below 0x80 is always that ASCII character.
+_SAFE_ENCODINGS = {"utf-8", "utf-8-sig", "ascii", "iso8859-1", "cp1252"}
+_BOM = codecs.BOM_UTF8
+
+
+class Unsupported(Exception):
+    """The light extractor cannot vouch for this source: use the full parse."""
+
+
+class _Line:
+    """A logical line outside brackets and its block (the more indented lines after it)."""
+
+    __slots__ = ("begin", "start", "end", "indent", "lineno", "children")
+
+    def __init__(self, begin: int, start: int, lineno: int):
+        self.begin = begin  # start of the physical line, indentation included
+        self.start = start  # first character of the statement
+        self.end = -1
+        self.indent = start - begin
+        self.lineno = lineno
+        self.children: List["_Line"] = []
+
+
+def has_definitions(buf, size: int) -> bool:
+    """Cheap byte scan: False when ``def``/``class`` never occurs, so nothing can be extracted."""
+    for keyword in (b"def", b"class"):
+        # bytes.find is several times faster than a regex search; check what follows by hand.
+        pos = buf.find(keyword, 0, size)
+        while pos >= 0:
+            after = pos + len(keyword)
+            if after >= size or _IDENTIFIER_TAIL_RE.match(buf, after, after + 1) is None:
+                return True
+            pos = buf.find(keyword, after, size)
+    return False
+
+
+def definition_count(buf, size: int) -> int:
+    """Upper bound of the number of definitions (occurrences of ``def``/``class``)."""
+    return buf.count(b"def", 0, size) + buf.count(b"class", 0, size)
+
+
+def _encoding(buf, size: int) -> str:
+    from tokenize import detect_encoding  # deferred: only for files taking this path
+
+    # Only the first two lines can declare it; a cookie never sits past their first 1 KiB.
+    first = buf.find(b"\n", 0, size) + 1 or size
+    second = buf.find(b"\n", first, size) + 1 or size
+    lines = iter([bytes(buf[:min(first, 1024)]), bytes(buf[first:min(second, first + 1024)])])
+    try:
+        encoding, _ = detect_encoding(lambda: next(lines, b""))
+        name = codecs.lookup(encoding).name
+    except (SyntaxError, LookupError) as exc:
+        raise Unsupported(str(exc)) from None
+    if name not in _SAFE_ENCODINGS:
+        raise Unsupported(f"encoding {encoding}")
+    return "utf-8" if name == "utf-8-sig" else name
+
+
+def _skip_string(buf, at: int, size: int) -> int:
+    """Position just after the string literal whose opening quote is at ``at``."""
+    c = buf[at]
+    triple = buf[at + 1:at + 3] == _TRIPLE_TAIL[c]
+    quote = _TRIPLE_QUOTE[c] if triple else buf[at:at + 1]
+    pos = start = at + len(quote)
+    while True:
+        # Jump from quote to quote (memchr speed on long blobs); an odd run of backslashes
+        # before one escapes it.
+        end = buf.find(quote, pos, size)
+        if end < 0:
+            raise Unsupported("unterminated string")
+        if not triple and buf.find(b"\n", pos, end) >= 0:
+            break  # escaped newline inside a one-line string, or an error: let the regex decide
+        k = end
+        while k > start and buf[k - 1] == _BACKSLASH:
+            k -= 1
+        if (end - k) % 2 == 0:
+            return end + len(quote)
+        pos = end + 1
+    match = (_TRIPLE_END if triple else _STRING_END)[c].match(buf, start, size)
+    if match is None:
+        raise Unsupported("unterminated string")
+    return match.end()
+
+
+def _scan(buf, size: int) -> List[_Line]:
+    """The logical lines of the module, nested by indentation."""
+    lines: List[_Line] = []
+    check_fstrings = sys.version_info >= (3, 12)  # nested quotes are legal in 3.12 f-strings
+    pos = len(_BOM) if buf.startswith(_BOM) else 0
+    depth = 0
+    lineno, counted = 1, 0
+    current: Optional[_Line] = None
+    line_begin: Optional[int] = pos
+    while True:
+        if line_begin is not None:
+            ws = _INDENT_RE.match(buf, line_begin, size).end()
+            if buf[ws:ws + 1] not in (b"", b"\n", b"\r", b"#"):
+                if b"\t" in buf[line_begin:ws] or b"\f" in buf[line_begin:ws]:
+                    raise Unsupported("tab or form feed indentation")
+                lineno += buf.count(b"\n", counted, line_begin)
+                counted = line_begin
+                current = _Line(line_begin, ws, lineno)
+                lines.append(current)
+            line_begin = None
+        m = (_TOP_RE if depth == 0 else _NESTED_RE).search(buf, pos, size)
+        if m is None:
+            break
+        at = m.start()
+        c = buf[at]
+        if c in _QUOTES:
+            if check_fstrings and b"f" in buf[max(0, at - 2):at].lower():
+                raise Unsupported("f-string")  # or an identifier ending in f: just as safe
+            end = buf.find(_QUOTE[c], at + 1, size)
+            if end > at + 1 and buf.find(b"\\", at + 1, end) < 0 and buf.find(b"\n", at + 1, end) < 0:
+                pos = end + 1  # the common case: a short one-line string without escapes
+            else:
+                pos = _skip_string(buf, at, size)
+        elif c == _HASH:
+            newline = buf.find(b"\n", at, size)
+            pos = size if newline < 0 else newline
+        elif c in _OPENING:
+            depth += 1
+            pos = at + 1
+        elif c in _CLOSING:
+            depth -= 1
+            if depth < 0:
+                raise Unsupported("unbalanced brackets")
+            pos = at + 1
+        elif c == _NEWLINE:
+            if current is not None:
+                current.end = at
+                current = None
+            pos = line_begin = at + 1
+        else:
+            raise Unsupported("backslash continuation")
+    if depth:
+        raise Unsupported("unbalanced brackets")
+    if current is not None:
+        current.end = size
+
+    root: List[_Line] = []
+    stack: List[Tuple[int, List[_Line]]] = [(0, root)]
+    for line in lines:
+        dedented = False
+        while stack[-1][0] > line.indent:
+            stack.pop()
+            dedented = True
+        indent, block = stack[-1]
+        if indent == line.indent:
+            block.append(line)
+        elif dedented or not block:
+            raise Unsupported("inconsistent indentation")
+        else:
+            block[-1].children.append(line)
+            stack.append((line.indent, block[-1].children))
+    return root
+
+
+class _Group:
+    """A try statement with its clauses, visited in the AST's field order."""
+
+    __slots__ = ("blocks",)
+
+    def __init__(self, body: List[_Line]):
+        # body, orelse, finalbody, handlers (each handler is a line with its own block)
+        self.blocks: List[list] = [body, [], [], []]
+
+
+def _statements(body: List[_Line], buf, size: int) -> List[Tuple[Optional[int], Any]]:
+    """
+    The statements of ``body`` as the AST sees them: (decorators begin, definition line) for
+    definitions, (None, blocks) for anything else. try/except/else/finally lines are grouped.
+    """
+    statements: List[Tuple[Optional[int], Any]] = []
+    decorators: Optional[int] = None
+    group: Optional[_Group] = None
+    for line in body:
+        if _DEF_RE.match(buf, line.start, size):
+            statements.append(((line.begin if decorators is None else decorators), line))
+            decorators = group = None
+            continue
+        if buf[line.start:line.start + 1] == b"@":
+            if decorators is None:
+                decorators = line.begin
+            group = None
+            continue
+        decorators = None
+        clause = _CLAUSE_RE.match(buf, line.start, size)
+        keyword = clause.group(1) if clause else None
+        if keyword == b"try":
+            group = _Group(line.children)
+            statements.append((None, group.blocks))
+        elif group is not None and keyword == b"except":
+            group.blocks[3].append(line)
+        elif group is not None and keyword == b"else":
+            group.blocks[1] = line.children
+        elif group is not None and keyword == b"finally":
+            group.blocks[2] = line.children
+        else:
+            group = None
+            statements.append((None, [line.children]))
+    return statements
+
+
+def _parse_definition(buf, size: int, begin: int, line: _Line, encoding: str) -> ast.AST:
+    """Parse a definition's decorators, header and first statement (its docstring) alone."""
+    try:
+        text = buf[begin:line.end].decode(encoding)
+        if line.children:
+            first = line.children[0]
+            if _DOCSTRING_START_RE.match(buf, first.start, size):
+                text += "\n" + buf[first.begin:first.end].decode(encoding)
+            else:
+                text += "\n" + " " * first.indent + "pass"
+        if line.indent:
+            text = "if 1:\n" + text
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError) as exc:  # UnicodeDecodeError is a ValueError
+        raise Unsupported(str(exc)) from None
+    node = tree.body[0].body[0] if line.indent else tree.body[0]
+    if not isinstance(node, _DEFS):
+        raise Unsupported("not a definition")
+    return node
+
+
+def definitions(buf, size: int) -> List[Tuple[str, str, int, ast.AST]]:
+    """
+    (qualified name, kind, line, node) of every definition of the module held in the
+    first ``size`` bytes of ``buf``, in the order of the full AST walk. ``node`` is the parsed
+    definition (decorators, signature and docstring are exact; its body is not).
+    Raises Unsupported when the source is outside what it handles.
+    """
+    encoding = _encoding(buf, size)
+    found: List[Tuple[str, str, int, ast.AST]] = []
+    # (statements, qualified prefix, enclosing node kind), depth first as in code_parser._extract.
+    stack: List[Tuple[list, str, Optional[str]]] = [(_scan(buf, size), "", None)]
+    while stack:
+        body, prefix, scope = stack.pop()
+        nested = []
+        for begin, item in _statements(body, buf, size):
+            if begin is None:
+                for block in item:
+                    if block:
+                        nested.append((block, prefix, scope))
+                continue
+            node = _parse_definition(buf, size, begin, item, encoding)
+            name = prefix + node.name
+            if isinstance(node, ast.ClassDef):
+                kind = "class"
+            else:
+                kind = "method" if scope == "class" else "function"
+            found.append((name, kind, item.lineno, node))
+            nested.append((item.children, name + ".", "class" if kind == "class" else "function"))
+        stack.extend(reversed(nested))
+    return found
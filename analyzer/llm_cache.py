@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MEMORY_ENTRIES = 1024
+DEFAULT_DISK_ENTRIES = 100_000
+
+
+def llm_params(llm: Any) -> Dict[str, Any]:
+    """Model parameters that change the answer, as far as they can be read off the client."""
+    return {
+        "class": type(llm).__name__,
+        "model": getattr(llm, "model_name", None) or getattr(llm, "model", None),
+        "temperature": getattr(llm, "temperature", None),
+        "max_tokens": getattr(llm, "max_tokens", None),
+    }
+
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM responses, shared by analyze_project and the text suggester.
+
+    Keys are a SHA-256 of (prompt, template, model parameters). Lookups go through an
+    in-memory LRU of ``max_memory_entries`` first, then the optional SQLite file at ``path``
+    (capped at ``max_disk_entries``, least recently used evicted first). Entries older than
+    ``ttl`` seconds are treated as misses. Safe to use from the LLM pipeline's threads.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_memory_entries: int = DEFAULT_MEMORY_ENTRIES,
+        max_disk_entries: int = DEFAULT_DISK_ENTRIES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            import sqlite3  # deferred: only needed for the persistent tier
+
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY, value TEXT, created REAL, last_used REAL)"
+            )
+            self._db.commit()
+
+    @staticmethod
+    def make_key(prompt: str, template: str = "", params: Optional[Dict[str, Any]] = None) -> str:
+        blob = json.dumps({"prompt": prompt, "template": template, "params": params or {}}, sort_keys=True)
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _remember(self, key: str, value: str, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and not self._expired(entry[1]):
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            if self._db is not None:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None and not self._expired(row[1]):
+                    self._db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key))
+                    self._db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is None:
+                return
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, value, now, now))
+            if self.ttl is not None:
+                self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_disk_entries:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+                    (count - self.max_disk_entries,),
+                )
+            self._db.commit()
+
+    def get_or_call(self, key: str, call: Callable[[], Any]) -> str:
+        """Return the response for ``key`` as text: from the cache, or from ``call()`` (then cached)."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        value = str(call())
+        self.put(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (hits / lookups) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+
+_default_cache: Optional[LLMCache] = None
+
+
+def default_cache() -> LLMCache:
+    """Process-wide cache used when callers do not pass one (memory-only unless configured)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMCache()
+    return _default_cache
+
+
+def configure_default_cache(path: Optional[str] = None, **options: Any) -> LLMCache:
+    """Replace the process-wide cache, e.g. to add a persistent tier at ``path``."""
+    global _default_cache
+    if _default_cache is not None:
+        _default_cache.close()
+    _default_cache = LLMCache(path, **options)
+    return _default_cache
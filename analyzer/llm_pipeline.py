@@ -0,0 +1,243 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional
+
+if TYPE_CHECKING:
+    # asyncio imports concurrent.futures: the async API imports it when first used.
+    import asyncio
+    from concurrent.futures import Executor
+
+from .llm_cache import LLMCache, llm_params
+
+DEFAULT_TEMPLATE = "Analyze the following code for documentation inconsistencies:\n\n{code_snippet}"
+
+
+class LLMTimeout(Exception):
+    """Raised when one LLM call does not answer within the pipeline timeout."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token), good enough for budgeting prompts."""
+    return len(text) // 4 + 1
+
+
+def format_element(el: Mapping[str, Any]) -> str:
+    doc = el.get("doc") or "<no-doc>"
+    return f"{el.get('type')} {el.get('name')} - doc: {doc}"
+
+
+def pack_batches(snippets: Iterable[str], token_budget: int, overhead: int = 0) -> List[List[str]]:
+    """
+    Greedily pack snippets, in order, into batches whose estimated size (plus ``overhead``
+    for the template) stays under ``token_budget``. An oversized snippet is truncated.
+    """
+    room = max(1, token_budget - overhead)
+    batches: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for snippet in snippets:
+        cost = estimate_tokens(snippet)
+        if cost > room:
+            snippet = snippet[: room * 4 - 4]
+            cost = estimate_tokens(snippet)
+        if current and used + cost > room:
+            batches.append(current)
+            current, used = [], 0
+        current.append(snippet)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def invoke_llm(llm: Any, text: str) -> Any:
+    """Call a langchain-style LLM: ``llm(text)`` first, then ``llm.generate([text])``."""
+    try:
+        return llm(text)
+    except Exception:
+        return llm.generate([text])
+
+
+async def ainvoke_llm(llm: Any, text: str, executor: Optional["Executor"] = None) -> Any:
+    """
+    Async counterpart of invoke_llm: awaits the client's own coroutine API (an ``async def``
+    callable, langchain's ``ainvoke`` or ``agenerate``) so the call can really be cancelled;
+    a blocking client is run with invoke_llm in ``executor`` (default: the loop's).
+    """
+    import asyncio
+
+    if asyncio.iscoroutinefunction(llm):
+        return await llm(text)
+    ainvoke = getattr(llm, "ainvoke", None)
+    if ainvoke is not None:
+        return await ainvoke(text)
+    agenerate = getattr(llm, "agenerate", None)
+    if agenerate is not None:
+        return await agenerate([text])
+    return await asyncio.get_running_loop().run_in_executor(executor, invoke_llm, llm, text)
+
+
+def _call_with_timeout(fn, timeout: Optional[float]):
+    if timeout is None:
+        return fn()
+    box: Dict[str, Any] = {}
+
+    def target():
+        try:
+            box["value"] = fn()
+        except BaseException as exc:  # re-raised in the caller's thread
+            box["error"] = exc
+
+    # Blocking client calls cannot be interrupted: a timed-out call is abandoned in a daemon thread.
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise LLMTimeout(f"LLM call exceeded {timeout}s")
+    if "error" in box:
+        raise box["error"]
+    return box["value"]
+
+
+class LLMPipeline:
+    """
+    Sends every element (not just a sample) to the LLM, packed into prompts under
+    ``token_budget``, with at most ``max_concurrency`` calls in flight. Each batch is
+    retried ``retries`` times with exponential ``backoff`` and each attempt is bounded by
+    ``timeout`` seconds. Outputs are merged in batch order.
+
+    ``llm`` is anything accepted by invoke_llm (a langchain LLM, or a plain callable in
+    tests); ``prompt`` is an optional langchain PromptTemplate replacing ``template``.
+    With a ``cache`` (LLMCache), batches already answered for the same prompt, template
+    and model parameters are served without calling the model.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        prompt: Any = None,
+        template: str = DEFAULT_TEMPLATE,
+        token_budget: int = 2000,
+        max_concurrency: int = 4,
+        retries: int = 2,
+        timeout: Optional[float] = 60.0,
+        backoff: float = 0.5,
+        cache: Optional[LLMCache] = None,
+    ):
+        self.llm = llm
+        self.prompt = prompt
+        self.template = template
+        self.token_budget = token_budget
+        self.max_concurrency = max(1, max_concurrency)
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.cache = cache
+
+    def format_prompt(self, payload: str) -> str:
+        if self.prompt is not None:
+            return self.prompt.format(code_snippet=payload)
+        return self.template.format(code_snippet=payload)
+
+    def _cache_key(self, text: str) -> Optional[str]:
+        if self.cache is None:
+            return None
+        template = getattr(self.prompt, "template", None) or self.template
+        return self.cache.make_key(text, template, llm_params(self.llm))
+
+    def _run_batch(self, snippets: List[str]) -> Dict[str, Any]:
+        text = self.format_prompt("\n".join(snippets))
+        key = self._cache_key(text)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {"ok": True, "output": cached, "attempts": 0}
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                output = str(_call_with_timeout(lambda: invoke_llm(self.llm, text), self.timeout))
+                if key is not None:
+                    self.cache.put(key, output)
+                return {"ok": True, "output": output, "attempts": attempt + 1}
+            except Exception as exc:
+                error = exc
+        return {"ok": False, "output": f"LLM invocation failed: {error}", "attempts": self.retries + 1}
+
+    async def _arun_batch(
+        self, snippets: List[str], slots: "asyncio.Semaphore", executor: Optional["Executor"]
+    ) -> Dict[str, Any]:
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        text = self.format_prompt("\n".join(snippets))
+        key = self._cache_key(text)
+        if key is not None:
+            # The disk tier is SQLite: keep it off the event loop.
+            cached = await loop.run_in_executor(executor, self.cache.get, key)
+            if cached is not None:
+                return {"ok": True, "output": cached, "attempts": 0}
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(self.backoff * (2 ** (attempt - 1)))
+            try:
+                async with slots:
+                    output = str(await asyncio.wait_for(ainvoke_llm(self.llm, text, executor), self.timeout))
+                if key is not None:
+                    await loop.run_in_executor(executor, self.cache.put, key, output)
+                return {"ok": True, "output": output, "attempts": attempt + 1}
+            except asyncio.TimeoutError:
+                error = LLMTimeout(f"LLM call exceeded {self.timeout}s")
+            except Exception as exc:
+                error = exc
+        return {"ok": False, "output": f"LLM invocation failed: {error}", "attempts": self.retries + 1}
+
+    def _batches(self, elements: Iterable[Mapping[str, Any]]):
+        snippets = [format_element(el) for el in elements]
+        overhead = estimate_tokens(self.format_prompt(""))
+        return snippets, pack_batches(snippets, self.token_budget, overhead) or [["no samples"]]
+
+    def run(self, elements: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+        """Analyze ``elements`` and return the merged analysis plus throughput figures."""
+        started = time.perf_counter()
+        snippets, batches = self._batches(elements)
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            results = list(pool.map(self._run_batch, batches))
+        return self._summary(snippets, batches, results, started)
+
+    async def arun(
+        self, elements: Iterable[Mapping[str, Any]], executor: Optional["Executor"] = None
+    ) -> Dict[str, Any]:
+        """
+        Async run(): batches are awaited as tasks, at most ``max_concurrency`` calls at a time,
+        each bounded by ``timeout`` (a timed-out call is cancelled, then retried). Blocking
+        clients and cache lookups run in ``executor``. Cancelling arun cancels every call.
+        """
+        import asyncio
+
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        snippets, batches = await loop.run_in_executor(executor, self._batches, list(elements))
+        slots = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(*(self._arun_batch(batch, slots, executor) for batch in batches))
+        return self._summary(snippets, batches, results, started)
+
+    @staticmethod
+    def _summary(
+        snippets: List[str], batches: List[List[str]], results: List[Dict[str, Any]], started: float
+    ) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - started
+        return {
+            "analysis": "\n\n".join(r["output"] for r in results),
+            "elements": len(snippets),
+            "batches": len(batches),
+            "failed_batches": sum(1 for r in results if not r["ok"]),
+            "retried_batches": sum(1 for r in results if r["attempts"] > 1),
+            "cached_batches": sum(1 for r in results if r["attempts"] == 0),
+            "elapsed": elapsed,
+            "elements_per_second": (len(snippets) / elapsed) if elapsed > 0 else 0.0,
+        }
@@ -0,0 +1,458 @@
+import re
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .fuzzy import FuzzyIndex
+
+# Maximal runs of identifier characters (dots included, so qualified names stay whole).
+# Any occurrence of an identifier-like name in a document lies inside one of these runs.
+TOKEN_RE = re.compile(r"[\w.]+")
+
+# Byte-level counterpart used on memory-mapped docs. Non-ASCII bytes are kept inside
+# tokens and such tokens are re-split after decoding, so both scans agree.
+BYTES_TOKEN_RE = re.compile(rb"[\w.\x80-\xff]+")
+
+# Window size used when tokenizing mapped bytes, to avoid one huge findall() result.
+SCAN_WINDOW = 4 << 20
+
+MODES = ("substring", "identifier", "code", "heading", "structured", "fuzzy")
+
+# Modes answered from the Markdown structure index (see doc_structure.MODE_FLAGS).
+STRUCTURE_MODES = ("code", "heading", "structured")
+
+
+def _window_tokens(window) -> Set[str]:
+    """Distinct tokens of one bytes window that starts and ends between tokens."""
+    tokens: Set[str] = set()
+    for raw in set(BYTES_TOKEN_RE.findall(window)):
+        if raw.isascii():
+            tokens.add(raw.decode("ascii"))
+        else:
+            tokens.update(TOKEN_RE.findall(raw.decode("utf-8", errors="replace")))
+    return tokens
+
+
+def _bytes_tokens(buf) -> Set[str]:
+    """Distinct tokens of a bytes-like buffer (bytes or mmap), scanned window by window."""
+    tokens: Set[str] = set()
+    view = memoryview(buf)
+    try:
+        # _windows never cuts a token (nor, as non-ASCII bytes are token bytes, a UTF-8
+        # character), even on long stretches without a newline or space.
+        for start, end in _windows(buf, SCAN_WINDOW, 0):
+            tokens.update(_window_tokens(view[start:end]))
+    finally:
+        view.release()
+    return tokens
+
+
+class AhoCorasick:
+    """
+    Minimal Aho-Corasick automaton: finds which of many patterns occur in a text
+    with a single pass over it, instead of one ``in`` scan per pattern.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern)
+
+    def _build(self) -> None:
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                f = self._fail[state]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of patterns occurring at least once in ``text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[str] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+# Substring lookups: n-gram length, and the candidate count below which the candidate
+# tokens are checked directly rather than narrowed by the postings of one more n-gram.
+SUBSTRING_NGRAM = 4
+SUBSTRING_CANDIDATES = 128
+
+
+class SubstringIndex:
+    """
+    Answers "is ``name`` inside one of these tokens" with an n-gram index over the tokens
+    (n-gram -> token ids): a name is only checked against the tokens that hold all of its
+    rarest n-grams, so a lookup costs about the same whatever the number of tokens. Names
+    shorter than an n-gram are searched in the joined tokens.
+    """
+
+    def __init__(self, tokens: Iterable[str]):
+        self._tokens = list(tokens)
+        self._joined: Optional[str] = None
+        n = SUBSTRING_NGRAM
+        postings: Dict[str, List[int]] = {}
+        for i, token in enumerate(self._tokens):
+            for gram in {token[k:k + n] for k in range(len(token) - n + 1)}:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [i]
+                else:
+                    posting.append(i)
+        self._postings = postings
+
+    def occurs(self, name: str) -> bool:
+        n = SUBSTRING_NGRAM
+        if len(name) < n:
+            if self._joined is None:
+                self._joined = "\n".join(self._tokens)
+            return name in self._joined
+        postings = self._postings
+        found = []
+        for k in range(len(name) - n + 1):
+            posting = postings.get(name[k:k + n])
+            if posting is None:
+                return False
+            found.append(posting)
+        found.sort(key=len)
+        candidates: Iterable[int] = found[0]
+        if len(found[0]) > SUBSTRING_CANDIDATES:
+            narrowed = set(found[0])
+            for posting in found[1:]:
+                narrowed.intersection_update(posting)
+                if len(narrowed) <= SUBSTRING_CANDIDATES:
+                    break
+            candidates = narrowed
+        tokens = self._tokens
+        return any(name in tokens[i] for i in candidates)
+
+
+def doc_tokens(doc: Mapping[str, Any]) -> Set[str]:
+    """Distinct tokens of one document (a dict with "content" or a lazy document)."""
+    if hasattr(doc, "buffer"):
+        # Lazy document: scan its (possibly memory-mapped) bytes, never build a str.
+        with doc.buffer() as buf:
+            return _bytes_tokens(buf)
+    return set(TOKEN_RE.findall(doc["content"]))
+
+
+def identifier_parts(token: str) -> List[str]:
+    """A dotted token and each of its parts (``a.b`` -> ``a.b``, ``a``, ``b``), dots stripped."""
+    token = token.strip(".")
+    if not token:
+        return []
+    if "." not in token:
+        return [token]
+    return [token] + [part for part in token.split(".") if part]
+
+
+class DocIndex:
+    """
+    Token index built once over the documentation, used to resolve element names.
+
+    ``substring`` mode reproduces the historical ``name in all_doc_text`` semantics exactly:
+    exact token hits are O(1) set lookups and the remaining names are looked up in the
+    distinct tokens (much smaller than the raw text) through a SubstringIndex, built on
+    first use and kept until a document is added.
+    ``identifier`` mode is stricter: a name only counts when it appears as a whole
+    (possibly dotted) identifier, so ``add`` is no longer documented by ``address``.
+    ``code``, ``heading`` and ``structured`` are stricter still: the identifier must appear
+    in a code span or fenced block, in a heading, or in either. They use the per-document
+    structure index (doc_structure), parsed once per document fingerprint.
+    ``fuzzy`` is looser: names not found as identifiers are scored against the docs' words
+    by a word and n-gram index (FuzzyIndex), built on first use.
+    """
+
+    def __init__(self, docs: Iterable[Mapping[str, Any]] = ()):
+        self._docs: List[Mapping[str, Any]] = []
+        self.tokens: Set[str] = set()
+        self._identifiers: Set[str] = set()
+        self._substrings: Optional[SubstringIndex] = None
+        self._joined: Optional[str] = None
+        self._contexts: Optional[Dict[str, int]] = None
+        self._fuzzy = None
+        for d in docs:
+            self.add(d)
+
+    def add(self, doc: Mapping[str, Any], tokens: Optional[Set[str]] = None) -> None:
+        """Index one more document; ``tokens`` may be passed when already known (doc_tokens)."""
+        self._docs.append(doc)
+        self.tokens.update(doc_tokens(doc) if tokens is None else tokens)
+        self._identifiers = set()
+        self._substrings = None
+        self._joined = None
+        self._contexts = None
+        self._fuzzy = None
+
+    @property
+    def identifiers(self) -> Set[str]:
+        if not self._identifiers and self.tokens:
+            for token in self.tokens:
+                token = token.strip(".")
+                if token:
+                    self._identifiers.add(token)
+                    self._identifiers.update(part for part in token.split(".") if part)
+        return self._identifiers
+
+    @property
+    def substrings(self) -> SubstringIndex:
+        if self._substrings is None:
+            self._substrings = SubstringIndex(self.tokens)
+        return self._substrings
+
+    @property
+    def contexts(self) -> Dict[str, int]:
+        """Identifier -> HEADING / CODE / TEXT flags, merged over all documents."""
+        if self._contexts is None:
+            from .doc_structure import doc_structure
+
+            merged: Dict[str, int] = {}
+            for d in self._docs:
+                for name, flags in doc_structure(d).contexts.items():
+                    merged[name] = merged.get(name, 0) | flags
+            self._contexts = merged
+        return self._contexts
+
+    @property
+    def fuzzy(self) -> "FuzzyIndex":
+        if self._fuzzy is None:
+            from .fuzzy import FuzzyIndex
+
+            self._fuzzy = FuzzyIndex(self._docs)
+        return self._fuzzy
+
+    def sections(self, name: str) -> List[Tuple[str, str]]:
+        """(filename, section title) pairs where ``name`` appears as an identifier."""
+        from .doc_structure import doc_structure
+
+        return [
+            (d["filename"], title)
+            for d in self._docs
+            for title in doc_structure(d).section_titles(name)
+        ]
+
+    def contains(self, name: str, mode: str = "substring") -> bool:
+        """Single-name lookup, for callers that resolve names one at a time."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown matching mode: {mode!r}")
+        if mode in STRUCTURE_MODES:
+            from .doc_structure import MODE_FLAGS
+
+            return bool(self.contexts.get(name, 0) & MODE_FLAGS[mode])
+        if mode == "identifier":
+            return name in self.identifiers
+        if mode == "fuzzy":
+            return name in self.identifiers or self.fuzzy.documented(name)
+        if name in self.tokens:
+            return True
+        if TOKEN_RE.fullmatch(name):
+            # A token-shaped name can only occur inside a single token.
+            return self.substrings.occurs(name)
+        return self._in_contents(name)
+
+    def _in_contents(self, name: str) -> bool:
+        # The empty string is "in" any text, including the empty join of no docs.
+        if not name:
+            return True
+        encoded = None
+        for d in self._docs:
+            if hasattr(d, "buffer"):
+                encoded = encoded or name.encode("utf-8")
+                with d.buffer() as buf:
+                    if buf.find(encoded) != -1:
+                        return True
+            elif name in d["content"]:
+                return True
+        return False
+
+    def missing(self, names: Iterable[str], mode: str = "substring") -> Set[str]:
+        """Return the subset of ``names`` that the documentation does not mention."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown matching mode: {mode!r}")
+        unique = set(names)
+        if mode in STRUCTURE_MODES:
+            from .doc_structure import MODE_FLAGS
+
+            contexts, flags = self.contexts, MODE_FLAGS[mode]
+            return {n for n in unique if not contexts.get(n, 0) & flags}
+        if mode == "identifier":
+            return unique - self.identifiers
+        if mode == "fuzzy":
+            fuzzy = self.fuzzy
+            return {n for n in unique - self.identifiers if not fuzzy.documented(n)}
+
+        pending = unique - self.tokens
+        word_like = {n for n in pending if TOKEN_RE.fullmatch(n)}
+        missing = {n for n in pending - word_like if not self._in_contents(n)}
+        if word_like:
+            if self._substrings is None and len(word_like) <= DIRECT_SCAN_NAMES:
+                # A few names: plain scans of the joined tokens beat building the n-gram index.
+                if self._joined is None:
+                    self._joined = "\n".join(self.tokens)
+                joined = self._joined
+                missing.update(n for n in word_like if n not in joined)
+            else:
+                occurs = self.substrings.occurs
+                missing.update(n for n in word_like if not occurs(n))
+        return missing
+
+
+# Default window for the bounded-memory scan, in characters (str docs) or bytes (lazy docs).
+DEFAULT_CHUNK_SIZE = 4 << 20
+
+# Tokens remembered across windows so repeated words are not matched again; the set is
+# dropped and restarted when it reaches this size, which keeps it bounded.
+SEEN_TOKENS_LIMIT = 1 << 20
+
+# Below this many unresolved names, plain ``in`` checks beat an Aho-Corasick pass.
+DIRECT_SCAN_NAMES = 64
+
+
+# Characters that never occur inside a token: a window may end after any of them.
+_SEPARATOR_RE = re.compile(r"[^\w.]")
+_BYTES_SEPARATOR_RE = re.compile(rb"[^\w.\x80-\xff]")
+
+
+def _windows(buf, size: int, overlap: int) -> Iterator[Tuple[int, int]]:
+    """
+    (start, end) windows covering ``buf`` (str, bytes or mmap), each about ``size`` long
+    plus ``overlap`` characters repeated from the previous window. Windows end after a
+    newline or space when there is one, else after the next character that cannot be part
+    of a token, so a token is never cut (a window only outgrows ``size`` to finish one).
+    The overlap holds any occurrence of a non-token name up to ``overlap + 1`` long in full.
+    """
+    if isinstance(buf, str):
+        newline, space, separator = "\n", " ", _SEPARATOR_RE
+    else:
+        newline, space, separator = b"\n", b" ", _BYTES_SEPARATOR_RE
+    n, pos = len(buf), 0
+    while pos < n:
+        end = min(n, pos + size)
+        if end < n:
+            cut = max(buf.rfind(newline, pos, end), buf.rfind(space, pos, end))
+            if cut >= pos:
+                end = cut + 1
+            else:
+                found = separator.search(buf, end)
+                end = found.end() if found else n
+        yield max(0, pos - overlap), end
+        pos = end
+
+
+class ChunkedMatcher:
+    """
+    Bounded-memory resolution of element names against a documentation stream.
+
+    Documents are scanned window by window (``chunk_size`` characters, or bytes for lazy
+    documents read through ``buffer()``), never as a whole. Windows end between tokens and
+    overlap by the length of the longest name holding other characters (``a b``, ``x-y``),
+    so an occurrence cut by a window boundary is still seen. Each window's distinct
+    tokens are checked against the names not found yet, which are dropped as soon as
+    they match, and ``feed`` reports when none is left so the caller can stop reading
+    documents. Memory is one window, its tokens, a capped set of
+    already-seen tokens and the names themselves, whatever the size of the docs.
+
+    Both ``substring`` and ``identifier`` give the same answers as DocIndex.
+    """
+
+    def __init__(self, names: Iterable[str], mode: str = "substring", chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if mode not in ("substring", "identifier"):
+            raise ValueError(f"Mode {mode!r} is not supported by the chunked scan")
+        self.mode = mode
+        self.chunk_size = max(1, chunk_size)
+        self.pending: Set[str] = set(names)
+        if mode == "substring":
+            self.pending.discard("")  # the empty string is in every text, even no text
+        # Windows never cut a token, so only names with non-token characters can span two.
+        spanning = [n for n in self.pending if not TOKEN_RE.fullmatch(n)] if mode == "substring" else []
+        self.overlap = max((len(n.encode("utf-8")) - 1 for n in spanning), default=0)
+        self._automaton: Optional[AhoCorasick] = None
+        self._seen: Set[str] = set()
+        self.windows = 0
+
+    @property
+    def done(self) -> bool:
+        return not self.pending
+
+    def feed(self, doc: Mapping[str, Any]) -> bool:
+        """Scan one document; returns True once every name is resolved."""
+        if self.done:
+            return True
+        if hasattr(doc, "buffer"):
+            with doc.buffer() as buf:
+                self._scan(buf)
+        else:
+            self._scan(doc["content"])
+        return self.done
+
+    def _scan(self, buf) -> None:
+        is_text = isinstance(buf, str)
+        for start, end in _windows(buf, self.chunk_size, self.overlap):
+            window = buf[start:end]
+            self.windows += 1
+            # The window already ends between tokens: tokenize it whole, without re-cutting.
+            self._match(window, set(TOKEN_RE.findall(window)) if is_text else _window_tokens(window))
+            if self.done:
+                return
+
+    def _match(self, window, tokens: Set[str]) -> None:
+        pending = self.pending
+        if self.mode == "identifier":
+            for token in tokens:
+                for part in identifier_parts(token):
+                    pending.discard(part)
+            return
+
+        fresh = tokens - self._seen
+        if len(self._seen) + len(fresh) > SEEN_TOKENS_LIMIT:
+            self._seen = set()
+        self._seen |= fresh
+        pending.difference_update(fresh)
+        word_like = [n for n in pending if TOKEN_RE.fullmatch(n)]
+        if len(word_like) < len(pending):
+            # Names with other characters cannot be inside a token: look in the raw window.
+            encode = isinstance(window, str) is False
+            for name in [n for n in pending if not TOKEN_RE.fullmatch(n)]:
+                if (name.encode("utf-8") if encode else name) in window:
+                    pending.discard(name)
+        if not fresh:
+            return
+        if not word_like:
+            return
+        joined = "\n".join(fresh)
+        if len(word_like) <= DIRECT_SCAN_NAMES:
+            found = {n for n in word_like if n in joined}
+        else:
+            if self._automaton is None:
+                self._automaton = AhoCorasick(word_like)
+            found = self._automaton.find(joined)
+        pending -= found
+
+    def missing(self) -> Set[str]:
+        return set(self.pending)
@@ -0,0 +1,114 @@
+import heapq
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+# A hook receives every event as (event, data); events are "stage_start", "stage_end",
+# "file" and "parse_failure". Use it to drive a profiler or forward to a collector.
+Hook = Callable[[str, Dict[str, Any]], None]
+
+
+class Metrics:
+    """
+    Per-run instrumentation: wall/CPU time per stage, counters (files, bytes...), parse
+    failures and the slowest files.
+
+    Components take ``metrics=None`` and only touch it behind an ``is not None`` check,
+    so a run without instrumentation does no timing work at all.
+    """
+
+    def __init__(self, hooks: Sequence[Hook] = (), slowest: int = 10):
+        self.hooks: List[Hook] = list(hooks)
+        self.slowest = slowest
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.parse_failures: List[Dict[str, str]] = []
+        self._slowest_files: List[tuple] = []
+
+    def _emit(self, event: str, data: Dict[str, Any]) -> None:
+        for hook in self.hooks:
+            hook(event, data)
+
+    def add_time(self, name: str, wall: float, cpu: float, calls: int = 1) -> None:
+        stage = self.stages.get(name)
+        if stage is None:
+            stage = self.stages[name] = {"wall": 0.0, "cpu": 0.0, "calls": 0}
+        stage["wall"] += wall
+        stage["cpu"] += cpu
+        stage["calls"] += calls
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        self._emit("stage_start", {"stage": name})
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            self.add_time(name, wall, cpu)
+            self._emit("stage_end", {"stage": name, "wall": wall, "cpu": cpu})
+
+    def timed_iter(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        """Yield from ``iterable``, charging only the time spent producing items to ``name``."""
+        iterator = iter(iterable)
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.add_time(name, time.perf_counter() - wall, time.process_time() - cpu, calls=0)
+                return
+            self.add_time(name, time.perf_counter() - wall, time.process_time() - cpu, calls=0)
+            yield item
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] += n
+
+    def record_file(self, path: str, seconds: float, nbytes: int) -> None:
+        self.counters["files"] += 1
+        self.counters["bytes"] += nbytes
+        entry = (seconds, path, nbytes)
+        if len(self._slowest_files) < self.slowest:
+            heapq.heappush(self._slowest_files, entry)
+        else:
+            heapq.heappushpop(self._slowest_files, entry)
+        self._emit("file", {"path": path, "seconds": seconds, "bytes": nbytes})
+
+    def record_parse_failure(self, path: str, error: BaseException) -> None:
+        failure = {"path": path, "error": f"{type(error).__name__}: {error}"}
+        self.parse_failures.append(failure)
+        self.counters["parse_failures"] += 1
+        self._emit("parse_failure", failure)
+
+    def merge(self, other: Dict[str, Any]) -> None:
+        """Fold in the ``as_dict()`` of another Metrics (e.g. from a worker process)."""
+        for name, stage in other.get("stages", {}).items():
+            self.add_time(name, stage["wall"], stage["cpu"], stage["calls"])
+        for name, n in other.get("counters", {}).items():
+            self.counters[name] += n
+        self.parse_failures.extend(other.get("parse_failures", []))
+        for f in other.get("slowest_files", []):
+            entry = (f["seconds"], f["path"], f["bytes"])
+            if len(self._slowest_files) < self.slowest:
+                heapq.heappush(self._slowest_files, entry)
+            else:
+                heapq.heappushpop(self._slowest_files, entry)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "stages": {name: dict(stage) for name, stage in self.stages.items()},
+            "counters": dict(self.counters),
+            "parse_failures": list(self.parse_failures),
+            "slowest_files": [
+                {"path": path, "seconds": seconds, "bytes": nbytes}
+                for seconds, path, nbytes in sorted(self._slowest_files, reverse=True)
+            ],
+        }
+
+
+def resolve_metrics(metrics: Any) -> Optional[Metrics]:
+    """Accept ``False``/``None`` (disabled), ``True`` (fresh Metrics) or a Metrics instance."""
+    if metrics is True:
+        return Metrics()
+    return metrics or None
@@ -0,0 +1,81 @@
+"""
+Streaming NDJSON output: one JSON object per line, written while the project is analyzed.
+
+Unlike the analyze_project dict, nothing is accumulated: each element (optional) and each
+issue is encoded and written as soon as it is known, so output for millions of elements
+needs constant memory and consumers can start reading before the run ends. Every record
+has a "kind" ("element", "issue" or the final "summary").
+"""
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, Mapping, Optional
+
+from .code_parser import CodeParser
+from .comparator import Comparator
+from .doc_parser import DocumentationParser
+
+# One shared encoder: compact separators, non-ASCII kept as is (smaller, faster).
+_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def encode_record(kind: str, element: Mapping[str, Any]) -> str:
+    """One NDJSON line (with its newline) for ``element`` tagged with ``kind``."""
+    record = {"kind": kind}
+    record.update(element)
+    return _ENCODER.encode(record) + "\n"
+
+
+def write_ndjson(records: Iterable[Mapping[str, Any]], fp: IO[str], kind: str = "element") -> int:
+    """Write ``records`` to ``fp`` as NDJSON lines tagged with ``kind``; returns the count."""
+    count = 0
+    for record in records:
+        fp.write(encode_record(kind, record))
+        count += 1
+    return count
+
+
+def read_ndjson(fp: IO[str]) -> Iterator[Dict[str, Any]]:
+    """Yield the records of an NDJSON stream one by one (blank lines are skipped)."""
+    decode = json.JSONDecoder().decode
+    for line in fp:
+        if line.strip():
+            yield decode(line)
+
+
+def stream_project(
+    project_path: str,
+    fp: IO[str],
+    elements: bool = True,
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = None,
+    mode: str = "substring",
+) -> Dict[str, Any]:
+    """
+    Analyze ``project_path`` and stream the results to ``fp`` as NDJSON.
+
+    Each parsed element is written as it comes out of the parser (when ``elements``), directly
+    followed by its "issue" record if the docs do not mention it; a "summary" line with the
+    counts (and any skipped files) ends the stream and is also returned. Records come in walk order, not sorted.
+    """
+    counts = {"checked_samples": 0, "issues": 0}
+    cp = CodeParser(project_path, workers=workers, cache=cache_path)
+    comparator = Comparator([], DocumentationParser(project_path).iter_docs(), mode=mode)
+
+    def tap(parsed: Iterable[Mapping[str, Any]]) -> Iterator[Mapping[str, Any]]:
+        for element in parsed:
+            counts["checked_samples"] += 1
+            if elements:
+                fp.write(encode_record("element", element))
+            yield element
+
+    try:
+        for issue in comparator.iter_issues(tap(cp.iter_elements())):
+            counts["issues"] += 1
+            fp.write(encode_record("issue", issue))
+    finally:
+        if cp.cache is not None:
+            cp.cache.close()
+    summary = {"status": "fallback", "mode": "deterministic", **counts}
+    if cp.skipped:
+        summary["skipped_files"] = cp.skipped
+    fp.write(encode_record("summary", summary))
+    return summary
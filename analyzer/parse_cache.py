@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+# Default cap on the total size of cached payloads, in bytes.
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _file_digest(filepath: str) -> Optional[str]:
+    try:
+        with open(filepath, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class ParseCache:
+    """
+    On-disk cache of CodeParser.analyze_file results, stored in a SQLite file.
+
+    Entries are keyed by absolute path and validated with (mtime, size); when the stat
+    changed but the size did not, the content hash decides whether the entry is still good.
+    Cached elements do not carry the ``file`` key, so the same entry serves any project root.
+    The whole cache is dropped when ``version`` (the extractor version) changes, and the
+    least recently used entries are evicted once the payloads exceed ``max_bytes``.
+    One instance may be shared by several threads (e.g. analyze_projects).
+    """
+
+    def __init__(self, path: str, version: int, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.version = version
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        import sqlite3  # deferred: only needed when a cache is actually used
+
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, digest TEXT,"
+            " payload TEXT, payload_size INTEGER, last_used REAL)"
+        )
+        row = self._db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        if row is None or row[0] != str(version):
+            self._db.execute("DELETE FROM entries")
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (str(version),))
+            self._db.commit()
+        self._total = self._db.execute("SELECT COALESCE(SUM(payload_size), 0) FROM entries").fetchone()[0]
+
+    def get(self, filepath: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached elements for ``filepath`` or None (counted as a miss)."""
+        with self._lock:
+            return self._get(filepath)
+
+    def _get(self, filepath: str) -> Optional[List[Dict[str, Any]]]:
+        key = os.path.abspath(filepath)
+        row = self._db.execute(
+            "SELECT mtime_ns, size, digest, payload FROM entries WHERE path = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            mtime_ns, size, digest, payload = row
+            try:
+                st = os.stat(filepath)
+            except OSError:
+                st = None
+            valid = st is not None and st.st_mtime_ns == mtime_ns and st.st_size == size
+            if not valid and st is not None and st.st_size == size and _file_digest(filepath) == digest:
+                # Touched but unchanged (checkout, copy...): refresh the stat key.
+                self._db.execute("UPDATE entries SET mtime_ns = ? WHERE path = ?", (st.st_mtime_ns, key))
+                valid = True
+            if valid:
+                self._db.execute("UPDATE entries SET last_used = ? WHERE path = ?", (time.time(), key))
+                self.hits += 1
+                return json.loads(payload)
+        self.misses += 1
+        return None
+
+    def put(self, filepath: str, elements: List[Dict[str, Any]]) -> None:
+        """Store the elements extracted from ``filepath`` (without their ``file`` key)."""
+        with self._lock:
+            self._put(filepath, elements)
+
+    def _put(self, filepath: str, elements: List[Dict[str, Any]]) -> None:
+        key = os.path.abspath(filepath)
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return
+        payload = json.dumps([{k: v for k, v in e.items() if k != "file"} for e in elements])
+        old = self._db.execute("SELECT payload_size FROM entries WHERE path = ?", (key,)).fetchone()
+        if old is not None:
+            self._total -= old[0]
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, st.st_mtime_ns, st.st_size, _file_digest(filepath), payload, len(payload), time.time()),
+        )
+        self._total += len(payload)
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        # Drop least recently used entries until we are back under 90% of the cap.
+        target = self.max_bytes * 0.9
+        rows = self._db.execute("SELECT path, payload_size FROM entries ORDER BY last_used").fetchall()
+        for path, size in rows:
+            if self._total <= target:
+                break
+            self._db.execute("DELETE FROM entries WHERE path = ?", (path,))
+            self._total -= size
+            self.evictions += 1
+
+    def flush(self) -> None:
+        with self._lock:
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.commit()
+            self._db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "bytes": self._total,
+        }
@@ -0,0 +1,221 @@
+"""
+Sharded (map-reduce) analysis for codebases too large for one machine.
+
+The walker's file list is split deterministically into N shards by a CRC-32 of each
+file's project-relative path, so every host computes the same partition without
+coordination. ``run_shard`` (map) parses one shard's Python files, indexes its share of
+the docs, settles the names its own docs already mention, and writes a JSON partial
+result. ``reduce_shards`` merges all partials into the same output as a single-node
+deterministic ``analyze_project``.
+
+Shards only need a shared filesystem for the project and the output directory:
+
+    python -m analyzer.shards map PROJECT --shard 0 --shards 4 --out parts/
+    ...                                   --shard 3 --shards 4 --out parts/
+    python -m analyzer.shards reduce parts/ [--output result.json]
+"""
+import argparse
+import json
+import os
+import sys
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from .code_parser import CodeParser, _element_sort_key
+from .doc_parser import DocumentationParser
+from .matching import MODES, DocIndex, doc_tokens
+
+# Partials carry doc tokens, not the word positions the fuzzy mode scores against.
+SHARD_MODES = tuple(m for m in MODES if m != "fuzzy")
+
+# Bump when the partial-result layout changes; reduce refuses to mix formats.
+PARTIAL_FORMAT = 1
+
+
+def shard_of(rel_path: str, shards: int) -> int:
+    """Shard index of a project-relative path (stable across processes, hosts and Pythons)."""
+    return zlib.crc32(rel_path.replace(os.sep, "/").encode("utf-8")) % shards
+
+
+def partial_path(out_dir: str, shard: int, shards: int) -> str:
+    return os.path.join(out_dir, f"shard-{shard:05d}-of-{shards:05d}.json")
+
+
+class _ShardFilter:
+    """Mixin restricting a parser's walk to the files of one shard."""
+
+    shard = 0
+    shards = 1
+
+    def iter_files(self) -> Iterator[str]:
+        root = getattr(self, "project_dir", None) or getattr(self, "directory", ".")
+        for path in super().iter_files():
+            if shard_of(os.path.relpath(path, root), self.shards) == self.shard:
+                yield path
+
+
+class ShardCodeParser(_ShardFilter, CodeParser):
+    def __init__(self, project_dir: str, shard: int, shards: int, **options: Any):
+        super().__init__(project_dir, **options)
+        self.shard, self.shards = shard, shards
+
+
+class ShardDocumentationParser(_ShardFilter, DocumentationParser):
+    def __init__(self, directory: str, shard: int, shards: int, **options: Any):
+        super().__init__(directory, **options)
+        self.shard, self.shards = shard, shards
+
+
+def _check_shard(shard: int, shards: int) -> None:
+    if shards < 1 or not 0 <= shard < shards:
+        raise ValueError(f"Invalid shard {shard} of {shards}")
+
+
+def run_shard(
+    project_path: str,
+    shard: int,
+    shards: int,
+    out_dir: str,
+    mode: str = "substring",
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = None,
+) -> str:
+    """
+    Map step: analyze one shard and write its partial result; returns the file written.
+
+    The partial holds the shard's elements, the token set (and, for the Markdown-aware
+    modes, the identifier contexts) of its docs, and the names of its elements that its
+    own docs do not mention. Those "unresolved" names are all the reduce step re-checks.
+    Files the shard had to skip are carried along and reported by the reduce step.
+    """
+    _check_shard(shard, shards)
+    if mode not in MODES:
+        raise ValueError(f"Unknown matching mode: {mode!r}")
+    if mode not in SHARD_MODES:
+        raise ValueError(f"Mode {mode!r} is not supported by sharded runs")
+    cp = ShardCodeParser(project_path, shard, shards, workers=workers, cache=cache_path)
+    try:
+        elements = cp.analyze_directory()
+    finally:
+        if cp.cache is not None:
+            cp.cache.close()
+
+    # Docs are read lazily (mmap for large files): a shard never holds more than one doc.
+    index = DocIndex()
+    for doc in ShardDocumentationParser(project_path, shard, shards, lazy=True).iter_docs():
+        index.add(doc, doc_tokens(doc))
+    unresolved = index.missing((e["name"] for e in elements), mode)
+
+    partial: Dict[str, Any] = {
+        "format": PARTIAL_FORMAT,
+        "shard": shard,
+        "shards": shards,
+        "mode": mode,
+        "elements": elements,
+        "unresolved": sorted(unresolved),
+        "doc_tokens": sorted(index.tokens),
+        "skipped_files": cp.skipped,
+    }
+    if mode not in ("substring", "identifier"):
+        partial["doc_contexts"] = index.contexts
+
+    os.makedirs(out_dir, exist_ok=True)
+    path = partial_path(out_dir, shard, shards)
+    # Write then rename, so a reducer polling a shared directory never sees half a file.
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(partial, f)
+    os.replace(tmp, path)
+    return path
+
+
+class _TokenIndex(DocIndex):
+    """DocIndex over merged partials: tokens and contexts only, no document contents."""
+
+    def __init__(self, tokens: Set[str], contexts: Dict[str, int]):
+        super().__init__()
+        self.tokens = tokens
+        self._contexts = contexts
+
+
+def reduce_shards(out_dir: str) -> Dict[str, Any]:
+    """
+    Reduce step: merge every partial in ``out_dir`` into an analyze_project-style result.
+
+    Raises ValueError when a shard is missing or the partials do not belong together.
+    """
+    partials: List[Dict[str, Any]] = []
+    for name in sorted(os.listdir(out_dir)):
+        if name.startswith("shard-") and name.endswith(".json"):
+            with open(os.path.join(out_dir, name), "r", encoding="utf-8") as f:
+                partials.append(json.load(f))
+    if not partials:
+        raise ValueError(f"No shard results in {out_dir}")
+    shards, mode = partials[0]["shards"], partials[0]["mode"]
+    for p in partials:
+        if p.get("format") != PARTIAL_FORMAT or p["shards"] != shards or p["mode"] != mode:
+            raise ValueError(f"Shard {p.get('shard')} does not match the other partials")
+    missing_shards = sorted(set(range(shards)) - {p["shard"] for p in partials})
+    if missing_shards:
+        raise ValueError(f"Missing shard results: {missing_shards}")
+
+    tokens: Set[str] = set()
+    contexts: Dict[str, int] = {}
+    unresolved: Set[str] = set()
+    elements: List[Dict[str, Any]] = []
+    skipped: List[Dict[str, str]] = []
+    for p in partials:
+        skipped.extend(p.get("skipped_files", ()))
+        tokens.update(p["doc_tokens"])
+        for name, flags in p.get("doc_contexts", {}).items():
+            contexts[name] = contexts.get(name, 0) | flags
+        unresolved.update(p["unresolved"])
+        for e in p["elements"]:
+            e["decorators"] = tuple(e.get("decorators") or ())
+            elements.append(e)
+
+    # Names settled by their own shard's docs are documented; the rest meet every doc here.
+    missing = _TokenIndex(tokens, contexts).missing(unresolved, mode)
+    elements.sort(key=_element_sort_key)
+    result = {
+        "status": "fallback",
+        "mode": "deterministic",
+        "checked_samples": len(elements),
+        "issues": [e for e in elements if e["name"] in missing],
+    }
+    if skipped:
+        result["skipped_files"] = sorted(skipped, key=lambda s: s["path"])
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sharded documentation consistency analysis")
+    sub = parser.add_subparsers(dest="command", required=True)
+    map_cmd = sub.add_parser("map", help="analyze one shard and write its partial result")
+    map_cmd.add_argument("project")
+    map_cmd.add_argument("--shard", type=int, required=True)
+    map_cmd.add_argument("--shards", type=int, required=True)
+    map_cmd.add_argument("--out", required=True, help="directory shared by all shards")
+    map_cmd.add_argument("--mode", default="substring", choices=SHARD_MODES)
+    map_cmd.add_argument("--workers", type=int)
+    map_cmd.add_argument("--cache")
+    reduce_cmd = sub.add_parser("reduce", help="merge the partial results of every shard")
+    reduce_cmd.add_argument("out")
+    reduce_cmd.add_argument("--output", help="write the result here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if args.command == "map":
+        print(run_shard(args.project, args.shard, args.shards, args.out, args.mode, args.workers, args.cache))
+        return 0
+    result = reduce_shards(args.out)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    else:
+        json.dump(result, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
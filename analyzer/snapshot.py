@@ -0,0 +1,167 @@
+"""
+Compact binary snapshots of an extracted element set.
+
+Downstream tools can save the output of CodeParser once and load it back without parsing
+or JSON decoding: ``load_snapshot`` maps the file in memory and decodes an element only when
+it is accessed. The layout (all integers little-endian):
+
+    header   magic "DCSNAP\\0\\1", then u32 format, u32 extractor version,
+             u64 element count, u64 string count, u64 string blob size
+    offsets  (string count + 1) x u64, start of each string in the blob
+    records  element count x 7 x u32: name, type, file, line + 1, doc, signature,
+             decorators (string ids; NONE for missing, decorators joined with "\\n")
+    blob     the UTF-8 strings, each stored once
+"""
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Union
+
+from .code_parser import EXTRACTOR_VERSION
+from .elements import CodeElement
+
+MAGIC = b"DCSNAP\x00\x01"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+OFFSET = struct.Struct("<Q")
+OFFSET_PAIR = struct.Struct("<2Q")
+NONE = 0xFFFFFFFF
+FIELDS_PER_RECORD = 7
+RECORD = struct.Struct(f"<{FIELDS_PER_RECORD}I")
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def save_snapshot(elements: Iterable[Mapping[str, Any]], path: str) -> int:
+    """Write ``elements`` (dicts or CodeElement) to ``path``; returns the number written."""
+    ids: Dict[str, int] = {}
+    strings: List[bytes] = []
+    records = array("I")
+
+    def sid(value: Optional[str]) -> int:
+        if value is None:
+            return NONE
+        found = ids.get(value)
+        if found is None:
+            found = ids[value] = len(strings)
+            strings.append(value.encode("utf-8", errors="surrogatepass"))
+        return found
+
+    count = 0
+    for e in elements:
+        line = e.get("line")
+        decorators = e.get("decorators") or ()
+        records.extend((
+            sid(e["name"]),
+            sid(e.get("type")),
+            sid(e.get("file")),
+            0 if line is None else line + 1,
+            sid(e.get("doc")),
+            sid(e.get("signature")),
+            sid("\n".join(decorators)) if decorators else NONE,
+        ))
+        count += 1
+
+    offsets = array("Q", [0])
+    total = 0
+    for s in strings:
+        total += len(s)
+        offsets.append(total)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, EXTRACTOR_VERSION, count, len(strings), total))
+        f.write(_le(offsets))
+        f.write(_le(records))
+        if len(records) % 2:
+            f.write(b"\0\0\0\0")  # keep the blob 8-byte aligned
+        for s in strings:
+            f.write(s)
+    return count
+
+
+class ElementSnapshot(Sequence):
+    """
+    Read-only, memory-mapped view of a snapshot file; items are CodeElement records.
+
+    Opening is O(1) whatever the size: only the header is read. Each access decodes one
+    record and its strings. Close it (or use it as a context manager) to release the map.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, fmt, self.extractor_version, self._count, nstrings, _ = HEADER.unpack_from(self._map, 0)
+        except struct.error:
+            magic = fmt = None
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} element snapshot")
+        self._offsets_at = HEADER.size
+        self._records_at = self._offsets_at + OFFSET.size * (nstrings + 1)
+        words = FIELDS_PER_RECORD * self._count
+        self._blob_at = self._records_at + 4 * (words + words % 2)
+        self._strings: Dict[int, str] = {}
+
+    def _string(self, sid: int) -> Optional[str]:
+        if sid == NONE:
+            return None
+        value = self._strings.get(sid)
+        if value is None:
+            # Names, types and files repeat a lot: decode each string once.
+            start, end = OFFSET_PAIR.unpack_from(self._map, self._offsets_at + OFFSET.size * sid)
+            raw = self._map[self._blob_at + start:self._blob_at + end]
+            value = self._strings[sid] = raw.decode("utf-8", "surrogatepass")
+        return value
+
+    def _element(self, i: int) -> CodeElement:
+        name, type_, file, line, doc, signature, decorators = RECORD.unpack_from(
+            self._map, self._records_at + RECORD.size * i
+        )
+        string = self._string
+        return CodeElement(
+            string(name),
+            string(type_),
+            string(file),
+            line - 1 if line else None,
+            string(doc),
+            string(signature),
+            tuple(string(decorators).split("\n")) if decorators != NONE else (),
+        )
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return [self._element(i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("snapshot index out of range")
+        return self._element(index)
+
+    def __iter__(self) -> Iterator[CodeElement]:
+        for i in range(self._count):
+            yield self._element(i)
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "ElementSnapshot":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def load_snapshot(path: str) -> ElementSnapshot:
+    """Open a snapshot written by save_snapshot (memory-mapped, decoded lazily)."""
+    return ElementSnapshot(path)
@@ -0,0 +1,167 @@
+import fnmatch
+import os
+import re
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Directories that never contain project sources or docs worth checking. They are pruned
+# before descending, so nothing below them is listed or stat'ed.
+DEFAULT_EXCLUDED_DIRS = frozenset({
+    ".git", ".hg", ".svn",
+    "__pycache__", ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    ".tox", ".nox", ".eggs", "venv", "node_modules", "site-packages",
+    "build", "dist",
+})
+
+
+def _translate(pattern: str) -> str:
+    """Translate a .gitignore glob (``*``, ``?``, ``[..]``, ``**``) into a regex."""
+    i, n, out = 0, len(pattern), []
+    while i < n:
+        c = pattern[i]
+        if pattern.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRules:
+    """
+    Rules from one ``.gitignore`` file, relative to the directory that contains it.
+    Supports negation (``!``), directory-only (trailing ``/``), anchored patterns
+    (a leading or inner ``/``) and ``**``.
+    """
+
+    def __init__(self, base: str, lines: Iterable[str]):
+        self.base = base
+        self.rules: List[Tuple[re.Pattern, bool, bool, bool]] = []
+        for line in lines:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            anchored = "/" in line
+            line = line.lstrip("/")
+            if not line:
+                continue
+            self.rules.append((re.compile(_translate(line) + r"\Z"), negate, dir_only, anchored))
+
+    @classmethod
+    def from_file(cls, base: str, path: str) -> "IgnoreRules":
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return cls(base, f.readlines())
+
+    def match(self, rel: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included by a negation, None if no rule applies."""
+        result = None
+        name = rel.rsplit("/", 1)[-1]
+        for regex, negate, dir_only, anchored in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel if anchored else name):
+                result = not negate
+        return result
+
+
+def _matches_any(rel: str, name: str, patterns: Sequence[str]) -> bool:
+    return any(fnmatch.fnmatchcase(rel, p) or fnmatch.fnmatchcase(name, p) for p in patterns)
+
+
+def walk_files(
+    root: str,
+    suffixes: Tuple[str, ...],
+    exclude: Sequence[str] = (),
+    include: Sequence[str] = (),
+    max_size: Optional[int] = None,
+    use_gitignore: bool = True,
+    excluded_dirs: Iterable[str] = DEFAULT_EXCLUDED_DIRS,
+) -> Iterator[str]:
+    """
+    Yield ``os.path.join(root, ...)`` paths of files ending with one of ``suffixes``.
+
+    Uses ``os.scandir`` and prunes directories before descending: ``excluded_dirs`` (and
+    any ``.venv*``), ``.gitignore`` matches and ``exclude`` globs. ``exclude``/``include``
+    globs are matched against the ``/``-separated path relative to ``root`` and against
+    the bare name; when ``include`` is given, only files matching one of its globs are
+    yielded. Files larger than ``max_size`` bytes are skipped. Entries are visited in
+    sorted order, top-down, so the output is deterministic.
+    """
+    excluded_dirs = frozenset(excluded_dirs)
+    stack: List[Tuple[str, str, Tuple[IgnoreRules, ...]]] = [(root, "", ())]
+    while stack:
+        path, rel_dir, rules = stack.pop()
+        try:
+            with os.scandir(path) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+
+        if use_gitignore and any(e.name == ".gitignore" and e.is_file() for e in entries):
+            try:
+                rules = rules + (IgnoreRules.from_file(rel_dir, os.path.join(path, ".gitignore")),)
+            except OSError:
+                pass
+
+        subdirs = []
+        for entry in entries:
+            name = entry.name
+            rel = f"{rel_dir}/{name}" if rel_dir else name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if name in excluded_dirs or name.startswith(".venv"):
+                    continue
+            elif not name.endswith(suffixes):
+                continue
+
+            ignored = None
+            for rule_set in rules:
+                sub_rel = rel[len(rule_set.base) + 1:] if rule_set.base else rel
+                verdict = rule_set.match(sub_rel, is_dir)
+                if verdict is not None:
+                    ignored = verdict
+            if ignored or (exclude and _matches_any(rel, name, exclude)):
+                continue
+
+            if is_dir:
+                subdirs.append((entry.path, rel, rules))
+                continue
+            if include and not _matches_any(rel, name, include):
+                continue
+            if max_size is not None:
+                try:
+                    if entry.stat().st_size > max_size:
+                        continue
+                except OSError:
+                    continue
+            yield entry.path
+
+        # Reversed so that the first subdirectory is popped (and walked) first.
+        stack.extend(reversed(subdirs))
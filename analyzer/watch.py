@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .code_parser import CodeParser, _element_sort_key
+from .doc_parser import DocumentationParser
+from .matching import TOKEN_RE, DocIndex, SubstringIndex, doc_tokens
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+def _snapshot(paths) -> Snapshot:
+    snap: Snapshot = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        snap[path] = (st.st_mtime_ns, st.st_size)
+    return snap
+
+
+def _diff(old: Snapshot, new: Snapshot) -> Tuple[Set[str], Set[str]]:
+    """Return (changed or added paths, deleted paths)."""
+    changed = {p for p, sig in new.items() if old.get(p) != sig}
+    return changed, set(old) - set(new)
+
+
+class ProjectWatcher:
+    """
+    Keeps a project's parsed elements and doc index in memory and updates them incrementally.
+
+    Each ``refresh()`` polls stat snapshots of the ``.py`` and doc files and re-parses only
+    what changed. If only code changed, only the changed files are re-checked against the
+    existing doc index. If docs changed, the index is rebuilt from cached per-doc token sets
+    (only modified docs are re-read); in substring mode only the names whose status the
+    changed tokens can flip are looked up again, in other modes every element is re-checked
+    in one DocIndex.missing call.
+    ``skipped`` lists the Python files that currently cannot be read, decoded or parsed.
+    """
+
+    def __init__(self, project_path: str, interval: float = 0.5, mode: str = "substring"):
+        self.project_path = project_path
+        self.interval = interval
+        self.mode = mode
+        self.code_parser = CodeParser(project_path)
+        self.doc_parser = DocumentationParser(project_path)
+        self._code_snap: Snapshot = {}
+        self._doc_snap: Snapshot = {}
+        self._elements: Dict[str, List[Dict[str, Any]]] = {}
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._missing: Dict[str, List[Dict[str, Any]]] = {}
+        self._skipped: Dict[str, Dict[str, str]] = {}
+        self._index = DocIndex()
+        self.issues: List[Dict[str, Any]] = []
+        self.skipped: List[Dict[str, str]] = []
+        self.last_refresh_seconds = 0.0
+        self.refresh()
+
+    def _check(self, paths: Iterable[str]) -> None:
+        """Re-check the elements of ``paths`` with a single DocIndex.missing call."""
+        paths = list(paths)
+        elements = self._elements
+        missing = self._index.missing((e["name"] for p in paths for e in elements.get(p, ())), self.mode)
+        for path in paths:
+            self._missing[path] = [e for e in elements.get(path, ()) if e["name"] in missing]
+
+    def _check_after_doc_change(self, old: DocIndex, code_changed: Set[str]) -> None:
+        """
+        Substring mode: a name found in the old docs stays found unless a token containing it
+        is gone, and a missing one is only found now through a new token. Only the names of
+        the re-parsed files, those of vanished tokens and (rare) non-token names go back to
+        DocIndex.missing; every other status is carried over.
+        """
+        new = self._index
+        gained, lost = new.tokens - old.tokens, old.tokens - new.tokens
+        recheck = {e["name"] for p in code_changed for e in self._elements.get(p, ())}
+        names = {e["name"] for p, es in self._elements.items() if p not in code_changed for e in es}
+        was_missing = {e["name"] for p, m in self._missing.items() if p not in code_changed for e in m}
+        recheck.update(n for n in names if not TOKEN_RE.fullmatch(n))
+        if lost:
+            occurs = SubstringIndex(lost).occurs
+            recheck.update(n for n in names - was_missing if occurs(n))
+        still_missing = names & was_missing
+        if gained:
+            occurs = SubstringIndex(gained).occurs
+            still_missing = {n for n in still_missing if not occurs(n)}
+        missing = new.missing(recheck, self.mode) | (still_missing - recheck)
+        for path, elements in self._elements.items():
+            self._missing[path] = [e for e in elements if e["name"] in missing]
+
+    def refresh(self) -> bool:
+        """Pick up changes since the last call; returns True if the issue set was recomputed."""
+        started = time.perf_counter()
+        code_snap = _snapshot(self.code_parser.iter_files())
+        doc_snap = _snapshot(self.doc_parser.iter_files())
+        code_changed, code_deleted = _diff(self._code_snap, code_snap)
+        doc_changed, doc_deleted = _diff(self._doc_snap, doc_snap)
+        self._code_snap, self._doc_snap = code_snap, doc_snap
+        if not (code_changed or code_deleted or doc_changed or doc_deleted):
+            return False
+
+        for path in code_deleted:
+            self._elements.pop(path, None)
+            self._missing.pop(path, None)
+            self._skipped.pop(path, None)
+        # The parser is reused across refreshes: only keep the skips of the files re-parsed now.
+        self.code_parser.skipped.clear()
+        for path in code_changed:
+            self._skipped.pop(path, None)
+            self._elements[path] = self.code_parser.analyze_file(path)
+        for entry in self.code_parser.skipped:
+            self._skipped[entry["path"]] = entry
+        self.skipped = sorted(self._skipped.values(), key=lambda s: s["path"])
+
+        if doc_changed or doc_deleted:
+            for path in doc_deleted:
+                self._docs.pop(path, None)
+                self._doc_tokens.pop(path, None)
+            for path in doc_changed:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        doc = {"filename": os.path.basename(path), "content": f.read()}
+                except (OSError, UnicodeDecodeError):
+                    self._docs.pop(path, None)
+                    self._doc_tokens.pop(path, None)
+                    continue
+                self._docs[path] = doc
+                self._doc_tokens[path] = doc_tokens(doc)
+            old_index, self._index = self._index, DocIndex()
+            for path, doc in self._docs.items():
+                self._index.add(doc, self._doc_tokens[path])
+            if self.mode == "substring":
+                self._check_after_doc_change(old_index, code_changed)
+            else:
+                self._check(self._elements)
+        else:
+            self._check(code_changed)
+
+        issues = [e for missing in self._missing.values() for e in missing]
+        issues.sort(key=_element_sort_key)
+        self.issues = issues
+        self.last_refresh_seconds = time.perf_counter() - started
+        return True
+
+    def run(
+        self,
+        callback: Callable[[List[Dict[str, Any]]], None],
+        stop_event: Optional[threading.Event] = None,
+    ) -> None:
+        """Poll every ``interval`` seconds and call ``callback(issues)`` after each change."""
+        stop_event = stop_event or threading.Event()
+        callback(self.issues)
+        while not stop_event.wait(self.interval):
+            if self.refresh():
+                callback(self.issues)
@@ -1,10 +1,32 @@
+import sys
+
 from analyzer import analyze_project
 from generator.text_suggester import suggest_text_improvements
 from generator.visual_creator import create_visual
 
-def main():
-    project_path = "./data"
-    result = analyze_project(project_path)
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analyse de cohérence code / documentation")
+    parser.add_argument("project", nargs="?", default="./data")
+    parser.add_argument(
+        "--ndjson", metavar="FICHIER",
+        help="écrit éléments et problèmes au fil de l'eau en NDJSON ('-' pour la sortie standard)",
+    )
+    args = parser.parse_args(argv)
+
+    if args.ndjson:
+        from analyzer.ndjson import stream_project
+
+        if args.ndjson == "-":
+            stream_project(args.project, sys.stdout)
+        else:
+            with open(args.ndjson, "w", encoding="utf-8") as out:
+                summary = stream_project(args.project, out)
+            print("Analyse terminée :", summary)
+        return
+
+    result = analyze_project(args.project)
     print("Analyse terminée :", result)
 
     suggestion = suggest_text_improvements("Example documentation text")
@@ -14,4 +36,4 @@ def main():
     print("Visual créé :", visual_file)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
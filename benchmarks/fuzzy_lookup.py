@@ -0,0 +1,99 @@
+"""
+Cost of a fuzzy-mode name lookup as the documentation grows.
+
+Builds doc sets of growing size from a pseudo-English vocabulary (the larger the docs, the
+more distinct words, as in real corpora), then times, per element name:
+
+- indexed: FuzzyIndex.score, with a fresh index (cold memo) per size;
+- brute force: best n-gram similarity of each name word against every vocabulary word, the
+  naive fallback whose cost grows with the vocabulary (timed on ``--naive`` names only).
+
+Usage: python -m benchmarks.fuzzy_lookup [--sizes 1,4,16] [--names N] [--naive N]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from analyzer.fuzzy import FuzzyIndex, name_words, ngrams  # noqa: E402
+
+LETTERS = "etaoinshrdlcumwfgypbvkjxqz"
+WEIGHTS = [12, 9, 8, 8, 7, 7, 6, 6, 6, 4, 4, 3, 3, 2, 2, 2, 2, 2, 2, 1, 1, 1, 1, 1, 1, 1]
+
+
+def _word(rng):
+    return "".join(rng.choices(LETTERS, WEIGHTS, k=rng.randint(3, 10)))
+
+
+def _docs(megabytes, rng):
+    # Zipf-like: most words come from a small common set, new words keep appearing.
+    common = [_word(rng) for _ in range(2000)]
+    docs, size, count = [], 0, 0
+    while size < megabytes << 20:
+        line = " ".join(rng.choice(common) if rng.random() < 0.9 else _word(rng) for _ in range(12))
+        docs.append(line)
+        size += len(line) + 1
+        count += 1
+    chunk = 2000
+    return [{"filename": f"doc_{i}.md", "content": "\n".join(docs[i:i + chunk])} for i in range(0, count, chunk)]
+
+
+def _names(count, rng):
+    return [f"{_word(rng).title()}{_word(rng).title()}.{_word(rng)}_{_word(rng)}" for _ in range(count)]
+
+
+def _brute_force(index, name):
+    vocabulary = index._vocabulary
+    for word in name_words(name):
+        grams = ngrams(word)
+        max((2 * len(grams & ngrams(other)) / (len(grams) + len(ngrams(other))) for other in vocabulary), default=0)
+
+
+def run(sizes=(1, 4, 16), names=2000, naive=20):
+    rng = random.Random(0)
+    lookups = _names(names, rng)
+    rows = []
+    for megabytes in sizes:
+        docs = _docs(megabytes, rng)
+        started = time.perf_counter()
+        index = FuzzyIndex(docs)
+        build = time.perf_counter() - started
+        started = time.perf_counter()
+        for name in lookups:
+            index.score(name)
+        indexed = (time.perf_counter() - started) / len(lookups)
+        started = time.perf_counter()
+        for name in lookups[:naive]:
+            _brute_force(index, name)
+        brute = (time.perf_counter() - started) / max(1, naive)
+        rows.append({
+            "megabytes": megabytes,
+            "vocabulary": len(index._vocabulary),
+            "build_seconds": build,
+            "indexed_us": indexed * 1e6,
+            "brute_force_us": brute * 1e6,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1,4,16", help="doc set sizes, in MiB")
+    parser.add_argument("--names", type=int, default=2000)
+    parser.add_argument("--naive", type=int, default=20)
+    args = parser.parse_args()
+
+    for row in run([int(s) for s in args.sizes.split(",")], args.names, args.naive):
+        print(
+            f"  {row['megabytes']:4d} MiB  vocabulary {row['vocabulary']:8d}  build {row['build_seconds']:6.2f} s"
+            f"  lookup {row['indexed_us']:8.1f} us  brute force {row['brute_force_us'] / 1000:9.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
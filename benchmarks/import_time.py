@@ -0,0 +1,74 @@
+"""
+Cold import-time benchmark for the CLI entry points.
+
+Each measurement runs a fresh interpreter with ``-X importtime`` so nothing is cached
+in-process. Reports the median cumulative import time per module and the modules that
+should stay out of a cold start (langchain, markdown, ...).
+
+Usage: python -m benchmarks.import_time [--runs N] [--json PATH]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["analyzer", "generator.text_suggester", "app"]
+
+# Heavy or optional dependencies that a plain import must not pull in.
+DEFERRED = ["langchain", "markdown", "PIL", "sqlite3", "multiprocessing", "concurrent.futures"]
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of ``module`` in a fresh interpreter, in microseconds."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in proc.stderr.splitlines():
+        parts = [p.strip() for p in line.split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def loaded_modules(module: str) -> List[str]:
+    """Which of DEFERRED are in sys.modules right after ``import module``."""
+    code = f"import sys, {module}; print(' '.join(m for m in {DEFERRED!r} if m in sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    return proc.stdout.split()
+
+
+def run(runs: int = 5) -> Dict[str, Dict[str, object]]:
+    results: Dict[str, Dict[str, object]] = {}
+    for module in MODULES:
+        samples = [import_time_us(module) for _ in range(runs)]
+        results[module] = {
+            "median_ms": statistics.median(samples) / 1000,
+            "min_ms": min(samples) / 1000,
+            "deferred_loaded": loaded_modules(module),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", dest="json_path")
+    args = parser.parse_args()
+
+    results = run(args.runs)
+    for module, r in results.items():
+        print(f"{module:28s} median {r['median_ms']:7.1f} ms  min {r['min_ms']:7.1f} ms  "
+              f"heavy deps loaded: {', '.join(r['deferred_loaded']) or 'none'}")
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
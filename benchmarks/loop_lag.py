@@ -0,0 +1,87 @@
+"""
+Event-loop lag while a project is analyzed from inside a running loop.
+
+Generates a synthetic project of ``--files`` files, then, with a LoopLagMonitor ticking
+every 5 ms, runs:
+
+- blocking: analyze_project called directly from a coroutine (what a service would do
+  without the async API);
+- async: analyze_project_async on an AsyncAnalyzer of ``--workers`` processes;
+- concurrent: ``--concurrent`` async analyses at once, through the same analyzer.
+
+and reports wall time and the max / p99 / mean loop lag of each.
+
+Usage: python -m benchmarks.loop_lag [--files N] [--workers W] [--concurrent C]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from analyzer import analyze_project  # noqa: E402
+from analyzer.aio import AsyncAnalyzer, LoopLagMonitor, analyze_project_async  # noqa: E402
+from analyzer.llm_pipeline import LLMPipeline  # noqa: E402
+from data_generator import generate_synthetic_project  # noqa: E402
+
+
+def _no_llm():
+    # The default pipeline would call a real model when langchain is installed.
+    return LLMPipeline(lambda text: "ok", max_concurrency=1, token_budget=1 << 30)
+
+
+async def _measure(make_coroutine):
+    async with LoopLagMonitor() as lag:
+        started = time.perf_counter()
+        await make_coroutine()
+        seconds = time.perf_counter() - started
+    return dict(lag.stats(), seconds=seconds)
+
+
+async def _run(project, workers, concurrent):
+    async def blocking():
+        analyze_project(project, workers=workers, llm_pipeline=_no_llm())
+
+    report = {"blocking": await _measure(blocking)}
+    async with AsyncAnalyzer(workers=workers, max_concurrent=concurrent, llm_pipeline=_no_llm()) as analyzer:
+        await analyzer.analyze(project)  # start the pools outside the measurements
+
+        async def one():
+            await analyze_project_async(project, analyzer=analyzer)
+
+        async def many():
+            await asyncio.gather(*(analyze_project_async(project, analyzer=analyzer) for _ in range(concurrent)))
+
+        report["async"] = await _measure(one)
+        report[f"concurrent x{concurrent}"] = await _measure(many)
+    return report
+
+
+def run(files=500, workers=4, concurrent=4):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, "project")
+        generate_synthetic_project(project, files=files, defs_per_file=40, doc_files=20, doc_bytes=20000)
+        return asyncio.run(_run(project, workers, concurrent))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concurrent", type=int, default=4)
+    args = parser.parse_args()
+
+    for name, row in run(args.files, args.workers, args.concurrent).items():
+        print(
+            f"  {name:16s} {row['seconds'] * 1000:9.1f} ms   lag max {row['max'] * 1000:7.1f} ms"
+            f"  p99 {row['p99'] * 1000:6.1f} ms  mean {row['mean'] * 1000:6.2f} ms  ({row['samples']} ticks)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Throughput of the batch report renderer (generator.visual_creator.create_visuals).
+
+Renders ``--count`` synthetic coverage summaries with 1 and ``--workers`` processes and
+prints images per second for each, plus the naive one-create_visual-per-project loop.
+
+Usage: python -m benchmarks.render_visuals [--count N] [--workers W]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from generator.visual_creator import create_visual, create_visuals  # noqa: E402
+
+
+def synthetic_summaries(count, seed=0):
+    rng = random.Random(seed)
+    return [
+        {
+            "project": f"project-{i}",
+            "coverage": {
+                kind: {"documented": rng.randint(0, 500), "missing": rng.randint(0, 200)}
+                for kind in ("class", "function", "method")
+            },
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    summaries = synthetic_summaries(args.count)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        started = time.perf_counter()
+        for i, s in enumerate(summaries):
+            create_visual(f"{s['project']}: {s['coverage']}", os.path.join(tmpdir, f"naive_{i}.png"))
+        print(f"create_visual loop      {args.count / (time.perf_counter() - started):8.1f} images/s")
+
+        for workers in sorted({1, args.workers}):
+            started = time.perf_counter()
+            create_visuals(summaries, os.path.join(tmpdir, f"w{workers}"), workers=workers)
+            print(f"create_visuals w={workers:<3d}    {args.count / (time.perf_counter() - started):8.1f} images/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark suite: times the analyzer stages on synthetic projects of increasing size.
+
+For each size tier a project is generated in a temporary directory (see
+data_generator.generate_synthetic_project) and the following are timed, best of
+``--repeat`` runs:
+
+- CodeParser.analyze_directory
+- DocumentationParser.read_docs
+- Comparator.check_consistency
+- analyze_project (end to end, deterministic mode)
+- analyze_project_stream (every issue consumed)
+- ProjectWatcher.refresh after a doc edit, then after a code edit
+
+Results are written as JSON so two versions can be compared with ``--compare``.
+
+Usage: python -m benchmarks.run_benchmarks [--tiers small,medium] [--output FILE] [--compare OLD.json]
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from analyzer import (  # noqa: E402
+    Comparator,
+    CodeParser,
+    DocumentationParser,
+    ProjectWatcher,
+    analyze_project,
+    analyze_project_stream,
+)
+from data_generator import generate_synthetic_project  # noqa: E402
+
+TIERS: Dict[str, Dict[str, Any]] = {
+    "small": {"files": 50, "defs_per_file": 20, "doc_files": 5, "doc_bytes": 200_000},
+    "medium": {"files": 500, "defs_per_file": 30, "doc_files": 20, "doc_bytes": 5_000_000},
+    "large": {"files": 2000, "defs_per_file": 40, "doc_files": 50, "doc_bytes": 50_000_000},
+}
+
+
+def best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def _append(path: str, text: str) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+    # Move the mtime forward so the watcher's stat snapshot sees the edit on coarse clocks.
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def bench_watcher(project: str, repeat: int) -> Dict[str, float]:
+    """Latency of ProjectWatcher.refresh after appending to one doc, then to one module."""
+    watcher = ProjectWatcher(project)
+    doc = sorted(watcher.doc_parser.iter_files())[0]
+    module = sorted(watcher.code_parser.iter_files())[0]
+    probes = itertools.count()
+
+    def edit_doc() -> None:
+        _append(doc, f"\nSee also watcher_probe_{next(probes)}.\n")
+        watcher.refresh()
+
+    def edit_code() -> None:
+        _append(module, f"\ndef watcher_probe_{next(probes)}():\n    pass\n")
+        watcher.refresh()
+
+    return {"watcher_doc_edit": best_of(edit_doc, repeat), "watcher_code_edit": best_of(edit_code, repeat)}
+
+
+def _git_revision() -> str:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True)
+        return proc.stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def bench_tier(name: str, params: Dict[str, Any], repeat: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmpdir:
+        summary = generate_synthetic_project(tmpdir, **params)
+        elements = CodeParser(tmpdir).analyze_directory()
+        docs = DocumentationParser(tmpdir).read_docs()
+        timings = {
+            "analyze_directory": best_of(lambda: CodeParser(tmpdir).analyze_directory(), repeat),
+            "read_docs": best_of(lambda: DocumentationParser(tmpdir).read_docs(), repeat),
+            "check_consistency": best_of(lambda: Comparator(elements, docs).check_consistency(), repeat),
+            "analyze_project": best_of(lambda: analyze_project(tmpdir), repeat),
+            "analyze_project_stream": best_of(lambda: list(analyze_project_stream(tmpdir)), repeat),
+        }
+        # Last: the watcher edits the generated files.
+        timings.update(bench_watcher(tmpdir, repeat))
+    return {
+        "tier": name,
+        "params": params,
+        "elements": summary["elements"],
+        "doc_bytes": sum(len(d["content"]) for d in docs),
+        "seconds": timings,
+        "elements_per_second": summary["elements"] / timings["analyze_project"] if timings["analyze_project"] else 0.0,
+    }
+
+
+def run(tiers: List[str], repeat: int = 3) -> Dict[str, Any]:
+    return {
+        "revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": [bench_tier(t, TIERS[t], repeat) for t in tiers],
+    }
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Human-readable ratios new/old per tier and stage (> 1.0 means slower)."""
+    lines = []
+    previous = {r["tier"]: r for r in old.get("results", [])}
+    for r in new["results"]:
+        before = previous.get(r["tier"])
+        if before is None:
+            continue
+        for stage, seconds in r["seconds"].items():
+            was = before["seconds"].get(stage)
+            if was:
+                lines.append(f"{r['tier']:8s} {stage:22s} {was:8.3f}s -> {seconds:8.3f}s  x{seconds / was:5.2f}")
+    return lines
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tiers", default="small,medium", help=f"comma-separated, from {', '.join(TIERS)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args()
+
+    report = run([t for t in args.tiers.split(",") if t], args.repeat)
+    for r in report["results"]:
+        stages = "  ".join(f"{k}={v:.3f}s" for k, v in r["seconds"].items())
+        print(f"{r['tier']:8s} {r['elements']:8d} elements  {stages}")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            for line in compare(json.load(f), report):
+                print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Save/load cost of the element set: JSON vs streaming NDJSON vs binary snapshot.
+
+Parses a synthetic project of ``--files`` files once, then times, best of ``--repeat``:
+
+- json: json.dump of the element list / json.load of it
+- ndjson: write_ndjson / read_ndjson of every element
+- snapshot: save_snapshot / load_snapshot (open only, O(1)), plus a full pass over the
+  loaded snapshot and 1,000 random accesses
+
+and reports the file sizes.
+
+Usage: python -m benchmarks.serialization [--files N] [--repeat R]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from analyzer import CodeParser  # noqa: E402
+from analyzer.ndjson import read_ndjson, write_ndjson  # noqa: E402
+from analyzer.snapshot import load_snapshot, save_snapshot  # noqa: E402
+from data_generator import generate_synthetic_project  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(files=2000, repeat=3):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = os.path.join(tmpdir, "project")
+        generate_synthetic_project(project, files=files, defs_per_file=40, doc_files=1, doc_bytes=1000)
+        elements = CodeParser(project).analyze_directory()
+        paths = {fmt: os.path.join(tmpdir, f"elements.{fmt}") for fmt in ("json", "ndjson", "snap")}
+
+        def json_save():
+            with open(paths["json"], "w", encoding="utf-8") as f:
+                json.dump(elements, f)
+
+        def json_load():
+            with open(paths["json"], "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        def ndjson_save():
+            with open(paths["ndjson"], "w", encoding="utf-8") as f:
+                write_ndjson(elements, f)
+
+        def ndjson_load():
+            with open(paths["ndjson"], "r", encoding="utf-8") as f:
+                return sum(1 for _ in read_ndjson(f))
+
+        def snapshot_open():
+            load_snapshot(paths["snap"]).close()
+
+        def snapshot_scan():
+            with load_snapshot(paths["snap"]) as snap:
+                for _ in snap:
+                    pass
+
+        picks = random.Random(0).sample(range(len(elements)), min(1000, len(elements)))
+
+        def snapshot_random():
+            with load_snapshot(paths["snap"]) as snap:
+                for i in picks:
+                    snap[i]
+
+        seconds = {
+            "json_save": best_of(json_save, repeat),
+            "json_load": best_of(json_load, repeat),
+            "ndjson_save": best_of(ndjson_save, repeat),
+            "ndjson_load": best_of(ndjson_load, repeat),
+            "snapshot_save": best_of(lambda: save_snapshot(elements, paths["snap"]), repeat),
+            "snapshot_open": best_of(snapshot_open, repeat),
+            "snapshot_scan": best_of(snapshot_scan, repeat),
+            "snapshot_1000_random": best_of(snapshot_random, repeat),
+        }
+        sizes = {fmt: os.path.getsize(path) for fmt, path in paths.items()}
+    return {"elements": len(elements), "seconds": seconds, "bytes": sizes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    report = run(args.files, args.repeat)
+    print(f"{report['elements']} elements")
+    for name, seconds in report["seconds"].items():
+        print(f"  {name:22s} {seconds * 1000:9.1f} ms")
+    for fmt, size in report["bytes"].items():
+        print(f"  {fmt:22s} {size / 1e6:9.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 Générateur de données synthétiques pour tester l'assistant.
 Utilise SynthCity pour produire de faux exemples de code et documentation.
 """
+import os
+import random
 
 try:
     from synthcity.plugins import Plugins
@@ -65,3 +67,79 @@ def generate_synthetic_data():
         "docs": doc_example,
         "synthetic_data": X.head().to_dict()
     }
+
+
+FILLER_WORDS = (
+    "the", "value", "returns", "list", "when", "input", "configuration", "module",
+    "object", "result", "parameter", "optional", "default", "error", "is", "a", "of",
+)
+
+
+def generate_synthetic_project(
+    dest,
+    files=100,
+    defs_per_file=20,
+    class_ratio=0.3,
+    methods_per_class=3,
+    doc_coverage=0.5,
+    doc_files=5,
+    doc_bytes=100_000,
+    seed=0,
+):
+    """
+    Écrit un projet synthétique de taille configurable dans ``dest`` (pour les benchmarks).
+
+    - ``files`` modules de ``defs_per_file`` définitions de premier niveau chacun ;
+      une proportion ``class_ratio`` sont des classes avec ``methods_per_class`` méthodes.
+    - ``doc_coverage`` : part des noms cités dans la documentation.
+    - ``doc_files`` fichiers Markdown totalisant environ ``doc_bytes`` octets (texte de remplissage).
+
+    :return: dictionnaire résumant ce qui a été généré
+    """
+    rng = random.Random(seed)
+    os.makedirs(dest, exist_ok=True)
+    names = []
+    for f in range(files):
+        package = os.path.join(dest, f"pkg{f % 10}")
+        os.makedirs(package, exist_ok=True)
+        lines = []
+        for d in range(defs_per_file):
+            if rng.random() < class_ratio:
+                cls = f"Class{f}_{d}"
+                names.append(cls)
+                lines.append(f"class {cls}:\n    '''Synthetic class {d}.'''\n")
+                for m in range(methods_per_class):
+                    names.append(f"{cls}.method_{m}")
+                    lines.append(f"    def method_{m}(self, x):\n        return x + {m}\n")
+            else:
+                func = f"func_{f}_{d}"
+                names.append(func)
+                lines.append(f"def {func}(a, b=None):\n    '''Synthetic function {d}.'''\n    return a\n")
+            lines.append("\n")
+        with open(os.path.join(package, f"module_{f}.py"), "w", encoding="utf-8") as out:
+            out.write("\n".join(lines))
+
+    documented = [n for n in names if rng.random() < doc_coverage]
+    per_file = max(1, doc_bytes // max(1, doc_files))
+    for i in range(doc_files):
+        mentioned = documented[i::doc_files]
+        parts = [f"# Synthetic documentation {i}\n"]
+        size = 0
+        for name in mentioned:
+            line = f"- `{name}` " + " ".join(rng.choice(FILLER_WORDS) for _ in range(8)) + "\n"
+            parts.append(line)
+            size += len(line)
+        while size < per_file:
+            line = " ".join(rng.choice(FILLER_WORDS) for _ in range(16)) + "\n"
+            parts.append(line)
+            size += len(line)
+        with open(os.path.join(dest, f"doc_{i}.md"), "w", encoding="utf-8") as out:
+            out.write("".join(parts))
+
+    return {
+        "path": dest,
+        "files": files,
+        "elements": len(names),
+        "documented": len(documented),
+        "doc_files": doc_files,
+    }
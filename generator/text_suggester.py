@@ -1,49 +1,74 @@
 import importlib
-from typing import Any, Dict, Callable
-
-# Initialize the function variable
-suggest_text_improvements: Callable[[str], Any]
-
-# Try dynamic import of langchain components; provide a lightweight fallback.
-try:
-    llms_mod = importlib.import_module("langchain.llms")
-    prompts_mod = importlib.import_module("langchain.prompts")
-
-    OpenAI = getattr(llms_mod, "OpenAI")
-    PromptTemplate = getattr(prompts_mod, "PromptTemplate")
-
-    llm = OpenAI(temperature=0)
-    prompt = PromptTemplate(
-        input_variables=["doc_text"],
-        template="Suggest improvements for the following documentation:\n{doc_text}"
-    )
-
-    def _langchain_implementation(doc_text: str) -> Any:
-        """
-        Use langchain/OpenAI to suggest improvements for documentation.
-        """
-        formatted = prompt.format(doc_text=doc_text)
+from typing import Any, Dict, Optional, Tuple
+
+from analyzer.llm_cache import LLMCache, default_cache, llm_params
+
+# langchain and the OpenAI client are only imported and built on the first suggestion
+# request. The outcome of that probe (success or failure) is remembered for the process.
+_LLM_PROBED = False
+_llm = None
+_prompt = None
+
+
+def _get_llm() -> Tuple[Any, Any]:
+    """Return (llm, prompt), or (None, None) when langchain/OpenAI are unavailable."""
+    global _LLM_PROBED, _llm, _prompt
+    if not _LLM_PROBED:
+        _LLM_PROBED = True
+        try:
+            llms_mod = importlib.import_module("langchain.llms")
+            prompts_mod = importlib.import_module("langchain.prompts")
+
+            OpenAI = getattr(llms_mod, "OpenAI")
+            PromptTemplate = getattr(prompts_mod, "PromptTemplate")
+
+            _llm = OpenAI(temperature=0)
+            _prompt = PromptTemplate(
+                input_variables=["doc_text"],
+                template="Suggest improvements for the following documentation:\n{doc_text}"
+            )
+        except Exception:
+            _llm, _prompt = None, None
+    return _llm, _prompt
+
+
+def _langchain_implementation(doc_text: str, llm: Any, prompt: Any, cache: Optional[LLMCache] = None) -> Any:
+    """
+    Use langchain/OpenAI to suggest improvements for documentation, returned as text.
+    Identical requests are answered from ``cache`` (the shared default cache if omitted).
+    """
+    formatted = prompt.format(doc_text=doc_text)
+    cache = cache or default_cache()
+    key = cache.make_key(formatted, prompt.template, llm_params(llm))
+
+    def call() -> Any:
         try:
             return llm(formatted)
         except Exception:
-            try:
-                return llm.generate([formatted])
-            except Exception:
-                return {"error": "LLM invocation failed at runtime."}
-    
-    # Assign the primary implementation
-    suggest_text_improvements = _langchain_implementation
-
-except Exception:
-    def _fallback_implementation(doc_text: str) -> Dict[str, Any]:
-        """
-        Fallback: returns a basic suggestion structure if langchain/OpenAI are unavailable.
-        """
-        return {
-            "suggestion": "Fallback: install langchain and OpenAI or select the correct Python interpreter.",
-            "length": len(doc_text),
-            "summary": (doc_text[:200] + "...") if len(doc_text) > 200 else doc_text
-        }
-    
-    # Assign the fallback implementation
-    suggest_text_improvements = _fallback_implementation
+            return llm.generate([formatted])
+
+    try:
+        return cache.get_or_call(key, call)
+    except Exception:
+        return {"error": "LLM invocation failed at runtime."}
+
+
+def _fallback_implementation(doc_text: str) -> Dict[str, Any]:
+    """
+    Fallback: returns a basic suggestion structure if langchain/OpenAI are unavailable.
+    """
+    return {
+        "suggestion": "Fallback: install langchain and OpenAI or select the correct Python interpreter.",
+        "length": len(doc_text),
+        "summary": (doc_text[:200] + "...") if len(doc_text) > 200 else doc_text
+    }
+
+
+def suggest_text_improvements(doc_text: str, cache: Optional[LLMCache] = None) -> Any:
+    """
+    Suggest improvements for ``doc_text`` with the LLM when available, else a fallback summary.
+    """
+    llm, prompt = _get_llm()
+    if llm is None or prompt is None:
+        return _fallback_implementation(doc_text)
+    return _langchain_implementation(doc_text, llm, prompt, cache)
@@ -1,13 +1,117 @@
+import os
+from functools import lru_cache
+
+# Taille et couleurs communes aux rapports visuels.
+CANVAS_SIZE = (600, 200)
+BACKGROUND = (73, 109, 137)
+TEXT_COLOR = (255, 255, 0)
+DOCUMENTED_COLOR = (88, 196, 120)
+MISSING_COLOR = (224, 92, 80)
+
+
+@lru_cache(maxsize=None)
+def _font():
+    from PIL import ImageFont
+
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _template(size=CANVAS_SIZE, color=BACKGROUND):
+    """Canevas vide mis en cache ; chaque rendu travaille sur une copie."""
+    from PIL import Image
+
+    return Image.new('RGB', size, color=color)
+
+
 # Exemple minimal de génération visuelle
 def create_visual(content, filename="output.png"):
     """
     Crée un fichier visuel basé sur le contenu fourni.
     """
     # Ici tu pourrais utiliser matplotlib ou PIL
-    from PIL import Image, ImageDraw, ImageFont
+    from PIL import ImageDraw
 
-    img = Image.new('RGB', (600, 200), color=(73, 109, 137))
+    img = _template().copy()
     d = ImageDraw.Draw(img)
-    d.text((10,10), content, fill=(255,255,0))
+    d.text((10,10), content, fill=TEXT_COLOR, font=_font())
     img.save(filename)
-    return filename
\ No newline at end of file
+    return filename
+
+
+def coverage_by_type(elements, issues):
+    """
+    Compte, par type d'élément, les éléments documentés et manquants.
+    :return: {"function": {"documented": n, "missing": m}, ...}
+    """
+    missing_keys = {(e["file"], e["line"], e["name"]) for e in issues}
+    counts = {}
+    for e in elements:
+        bucket = counts.setdefault(e["type"], {"documented": 0, "missing": 0})
+        key = "missing" if (e["file"], e["line"], e["name"]) in missing_keys else "documented"
+        bucket[key] += 1
+    return counts
+
+
+def render_report(summary):
+    """
+    Dessine le graphique de couverture d'un projet.
+    ``summary`` : {"project": nom, "coverage": coverage_by_type(...)}
+    """
+    from PIL import ImageDraw
+
+    img = _template().copy()
+    d = ImageDraw.Draw(img)
+    font = _font()
+    coverage = summary.get("coverage", {})
+    total = sum(c["documented"] + c["missing"] for c in coverage.values())
+    missing = sum(c["missing"] for c in coverage.values())
+    title = f"{summary.get('project', '')} - {total - missing}/{total} documented"
+    d.text((10, 10), title, fill=TEXT_COLOR, font=font)
+
+    width = CANVAS_SIZE[0] - 130
+    largest = max((c["documented"] + c["missing"] for c in coverage.values()), default=0) or 1
+    for row, (kind, c) in enumerate(sorted(coverage.items())):
+        y = 40 + row * 30
+        d.text((10, y + 4), kind, fill=TEXT_COLOR, font=font)
+        documented_w = int(width * c["documented"] / largest)
+        missing_w = int(width * c["missing"] / largest)
+        if documented_w:
+            d.rectangle([80, y, 80 + documented_w, y + 18], fill=DOCUMENTED_COLOR)
+        if missing_w:
+            d.rectangle([80 + documented_w, y, 80 + documented_w + missing_w, y + 18], fill=MISSING_COLOR)
+        label = f"{c['documented']}/{c['missing']}"
+        d.text((90 + documented_w + missing_w, y + 4), label, fill=TEXT_COLOR, font=font)
+    return img
+
+
+def _render_batch(jobs):
+    paths = []
+    for summary, path in jobs:
+        # Flat-colour charts compress well even at the fastest zlib level.
+        render_report(summary).save(path, format="PNG", compress_level=1)
+        paths.append(path)
+    return paths
+
+
+def create_visuals(summaries, out_dir, workers=None, chunk_size=16):
+    """
+    Génère un PNG de couverture par projet dans ``out_dir`` et retourne les chemins, dans l'ordre.
+
+    Police et canevas sont mis en cache par processus ; avec ``workers`` > 1, le rendu et
+    l'encodage PNG sont répartis par lots de ``chunk_size`` sur un pool de processus.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    jobs = []
+    for i, summary in enumerate(summaries):
+        name = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in str(summary.get("project", "")))
+        jobs.append((summary, os.path.join(out_dir, f"{i:04d}_{name or 'project'}.png")))
+    batches = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+    if not workers or workers <= 1 or len(batches) <= 1:
+        return [path for batch in batches for path in _render_batch(batch)]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return [path for paths in pool.map(_render_batch, batches) for path in paths]
@@ -1,3 +1,4 @@
+import os
 import sys
 import tempfile
 from pathlib import Path
@@ -81,4 +82,397 @@ def test_analyze_project_project_root():
     assert isinstance(result, dict)
     assert "status" in result
     # PROJECT_ROOT has actual Python files, so checked_samples > 0
-    assert result["checked_samples"] > 0
\ No newline at end of file
+    assert result["checked_samples"] > 0
+
+def test_analyze_project_stream_yields_same_issues():
+    """analyze_project_stream should yield the same issues as analyze_project."""
+    from analyzer import analyze_project_stream
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "mod.py").write_text("def documented():\n    pass\n\ndef forgotten():\n    pass\n")
+        (Path(tmpdir) / "README.md").write_text("Call `documented` first.")
+
+        stream = analyze_project_stream(tmpdir)
+        first = next(stream)
+        assert first["name"] == "forgotten"
+        assert [first] + list(stream) == analyze_project(tmpdir)["issues"]
+
+        (Path(tmpdir) / "README.md").write_text("Call `documented` first, forgotten_too.")
+        assert list(analyze_project_stream(tmpdir)) == []
+        strict = analyze_project(tmpdir, mode="identifier")["issues"]
+        assert list(analyze_project_stream(tmpdir, mode="identifier")) == strict != []
+
+def touch(path, text):
+    """Write ``text`` and move the mtime forward, so stat snapshots see it on coarse clocks."""
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+def test_project_watcher_tracks_changes_incrementally():
+    """ProjectWatcher should match analyze_project after code and doc edits."""
+    from analyzer import ProjectWatcher
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        touch(root / "a.py", "def alpha():\n    pass\n")
+        touch(root / "README.md", "alpha")
+        watcher = ProjectWatcher(tmpdir)
+        assert watcher.issues == []
+        assert watcher.refresh() is False
+
+        touch(root / "b.py", "def beta():\n    pass\n")
+        assert watcher.refresh() is True
+        assert [e["name"] for e in watcher.issues] == ["beta"]
+
+        touch(root / "README.md", "alpha and beta")
+        (root / "a.py").unlink()
+        touch(root / "c.py", "class Gamma:\n    pass\n")
+        assert watcher.refresh() is True
+        assert watcher.issues == analyze_project(tmpdir)["issues"]
+        assert [e["name"] for e in watcher.issues] == ["Gamma"]
+
+def test_project_watcher_reports_current_skipped_files_only():
+    """ProjectWatcher.skipped should list each unparsable file once, and drop it once fixed."""
+    from analyzer import ProjectWatcher
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        touch(root / "broken.py", "def broken(:\n")
+        watcher = ProjectWatcher(tmpdir)
+        assert watcher.skipped == analyze_project(tmpdir)["skipped_files"]
+
+        touch(root / "a.py", "def alpha():\n    pass\n")
+        assert watcher.refresh() is True
+        touch(root / "b.py", "def beta():\n    pass\n")
+        assert watcher.refresh() is True
+        assert [s["path"] for s in watcher.skipped] == [str(root / "broken.py")]
+        assert watcher.code_parser.skipped == []
+
+        touch(root / "broken.py", "def broken():\n    pass\n")
+        assert watcher.refresh() is True
+        assert watcher.skipped == []
+
+def test_project_watcher_doc_edit_looks_up_only_affected_names(monkeypatch):
+    """After a doc edit the watcher should match analyze_project with one lookup of the names it can flip."""
+    from analyzer import ProjectWatcher
+    from analyzer.matching import DocIndex
+
+    lookups = []
+    missing = DocIndex.missing
+
+    def recording_missing(self, names, mode="substring"):
+        names = set(names)
+        lookups.append(names)
+        return missing(self, names, mode)
+
+    monkeypatch.setattr(DocIndex, "missing", recording_missing)
+    documented = " ".join(f"func_{i}" for i in range(20))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for i in range(20):
+            touch(root / f"m{i}.py", f"def func_{i}():\n    pass\n\ndef helper_{i}():\n    pass\n")
+        touch(root / "README.md", documented)
+        watcher = ProjectWatcher(tmpdir)
+        identifier_watcher = ProjectWatcher(tmpdir, mode="identifier")
+        assert len(watcher.issues) == 20
+
+        # Only new tokens can document a missing name: nothing needs a full lookup.
+        lookups.clear()
+        touch(root / "README.md", documented + " helper_3 and helper_1x")
+        assert watcher.refresh() is True
+        assert lookups == [set()]
+        assert identifier_watcher.refresh() is True
+        assert len(lookups) == 2
+        assert watcher.issues == analyze_project(tmpdir)["issues"]
+        assert identifier_watcher.issues == analyze_project(tmpdir, mode="identifier")["issues"]
+        assert "helper_1" not in [e["name"] for e in watcher.issues]
+
+        # Names inside vanished tokens are looked up again.
+        lookups.clear()
+        touch(root / "README.md", documented.replace("func_0 ", ""))
+        assert watcher.refresh() is True
+        assert lookups == [{"func_0", "helper_1", "helper_3"}]
+        assert watcher.issues == analyze_project(tmpdir)["issues"]
+
+def test_analyze_project_with_injected_llm_pipeline():
+    """An injected pipeline should analyze every element and report throughput."""
+    from analyzer import LLMPipeline
+
+    prompts = []
+
+    def fake_llm(prompt):
+        prompts.append(prompt)
+        return "looks fine"
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "mod.py").write_text("".join(f"def f{i}():\n    pass\n" for i in range(30)))
+        result = analyze_project(tmpdir, llm_pipeline=LLMPipeline(fake_llm, token_budget=100))
+        assert result["mode"] == "llm_augmented"
+        assert "looks fine" in result["llm_analysis"]
+        assert result["llm"]["elements"] == 30
+        assert result["llm"]["batches"] == len(prompts) > 1
+        assert "function f29 -" in "".join(prompts)
+
+        scoped = analyze_project(tmpdir, llm_pipeline=LLMPipeline(fake_llm), llm_scope="issues")
+        assert scoped["llm"]["elements"] == len(scoped["issues"])
+
+def test_analyze_project_reports_llm_cache_stats():
+    """analyze_project should expose the LLM cache hit rate in its result."""
+    from analyzer import LLMCache, LLMPipeline
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "mod.py").write_text("def f():\n    pass\n")
+        pipeline = LLMPipeline(lambda prompt: "ok", cache=LLMCache())
+        analyze_project(tmpdir, llm_pipeline=pipeline)
+        result = analyze_project(tmpdir, llm_pipeline=pipeline)
+        assert result["llm_cache"]["hit_rate"] == 0.5
+        assert result["llm"]["cached_batches"] == 1
+
+def test_import_analyzer_defers_heavy_dependencies():
+    """Importing the package and the CLI modules should not load LLM or markdown deps."""
+    from benchmarks.import_time import loaded_modules
+
+    for module in ("analyzer", "generator.text_suggester", "app"):
+        assert loaded_modules(module) == []
+
+def test_llm_probe_failure_is_remembered(monkeypatch):
+    """A failed langchain probe should not be retried on every analyze_project call."""
+    import analyzer
+    import importlib
+
+    calls = []
+
+    def failing_import(name, *args, **kwargs):
+        calls.append(name)
+        raise ImportError(name)
+
+    monkeypatch.setattr(analyzer, "_LLM_PROBED", False)
+    monkeypatch.setattr(analyzer, "_LLM_AVAILABLE", False)
+    monkeypatch.setattr(importlib, "import_module", failing_import)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        analyze_project(tmpdir)
+        analyze_project(tmpdir)
+    assert calls == ["langchain.llms"]
+
+def test_analyze_project_metrics_block():
+    """metrics=True should report stage timings, volumes and parse failures; off by default."""
+    from analyzer import Metrics
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "good.py").write_text("def ok():\n    pass\n")
+        (Path(tmpdir) / "broken.py").write_text("def broken(:\n")
+        (Path(tmpdir) / "README.md").write_text("ok")
+
+        assert "metrics" not in analyze_project(tmpdir)
+
+        events = []
+        result = analyze_project(tmpdir, metrics=Metrics(hooks=[lambda event, data: events.append(event)]))
+        m = result["metrics"]
+        assert {"walk", "read", "parse", "docs_read", "index", "compare"} <= set(m["stages"])
+        assert all(s["wall"] >= 0 and s["cpu"] >= 0 for s in m["stages"].values())
+        assert m["counters"]["files"] == 1 and m["counters"]["doc_files"] == 1
+        assert m["counters"]["bytes"] > 0 and m["counters"]["elements"] == 1
+        assert [f["path"] for f in m["parse_failures"]] == [str(Path(tmpdir) / "broken.py")]
+        assert m["slowest_files"][0]["path"].endswith("good.py")
+        assert {"stage_start", "stage_end", "file", "parse_failure"} <= set(events)
+
+def test_parallel_parse_merges_worker_metrics():
+    """Per-file metrics gathered in worker processes should be merged into the parent."""
+    from analyzer import CodeParser, Metrics
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(6):
+            (Path(tmpdir) / f"m{i}.py").write_text(f"def f{i}():\n    pass\n")
+        metrics = Metrics()
+        CodeParser(tmpdir, workers=2, chunk_size=2, metrics=metrics).analyze_directory()
+        assert metrics.counters["files"] == 6
+        assert metrics.stages["parse"]["wall"] > 0
+
+def test_analyze_projects_shares_resources_largest_first():
+    """analyze_projects should yield one result per project, largest first, sharing the parse cache."""
+    from analyzer import analyze_projects
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for name, count in (("small", 1), ("large", 20), ("medium", 5)):
+            (root / name).mkdir()
+            (root / name / "mod.py").write_text("".join(f"def f{i}():\n    pass\n" for i in range(count)))
+        paths = [str(root / n) for n in ("small", "large", "medium")]
+        cache = str(root / "cache.sqlite")
+
+        results = list(analyze_projects(paths, concurrency=1, cache_path=cache))
+        assert [Path(r["project"]).name for r in results] == ["large", "medium", "small"]
+        assert [len(r["issues"]) for r in results] == [20, 5, 1]
+        assert results[-1]["batch"]["completed"] == results[-1]["batch"]["total"] == 3
+        assert results[-1]["batch"]["projects_per_minute"] > 0
+
+        assert [(r["cache"]["hits"], r["cache"]["misses"]) for r in results] == [(0, 1)] * 3
+
+        # Each project reports its own lookups, not the shared cache's running totals.
+        (root / "medium" / "extra.py").write_text("def g():\n    pass\n")
+        warm = list(analyze_projects(paths, concurrency=2, cache_path=cache))
+        assert sorted(len(r["issues"]) for r in warm) == [1, 6, 20]
+        lookups = {Path(r["project"]).name: (r["cache"]["hits"], r["cache"]["misses"]) for r in warm}
+        assert lookups == {"large": (1, 0), "medium": (1, 1), "small": (1, 0)}
+
+def test_analyze_project_changed_files_mode(tmp_path):
+    """base_revision should only report issues introduced or resolved since that revision."""
+    import subprocess
+
+    def git(*args):
+        subprocess.run(["git", *args], cwd=tmp_path, check=True, capture_output=True)
+
+    project = tmp_path / "proj"
+    (project / "pkg").mkdir(parents=True)
+    (project / "pkg" / "a.py").write_text("def alpha():\n    pass\n\ndef beta():\n    pass\n")
+    (project / "pkg" / "b.py").write_text("def gamma():\n    pass\n\ndef delta():\n    pass\n")
+    (project / "README.md").write_text("# API\n`alpha` and `gamma` and `delta`.\n")
+    git("init", "-q")
+    git("-c", "user.name=t", "-c", "user.email=t@t", "add", ".")
+    git("-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "base")
+
+    # beta gets documented, epsilon is added undocumented, delta loses its doc mention.
+    (project / "pkg" / "a.py").write_text("def alpha():\n    pass\n\ndef beta():\n    pass\n\ndef epsilon():\n    pass\n")
+    (project / "pkg" / "c.py").write_text("class Zeta:\n    pass\n")
+    (project / "README.md").write_text("# API\n`alpha`, `beta` and `gamma`.\n")
+    (project / "CHANGES.md").write_text("Zeta is new.\n")
+
+    result = analyze_project(str(project), base_revision="HEAD")
+    assert result["mode"] == "changed_files"
+    assert result["changed_files"] == ["CHANGES.md", "README.md", "pkg/a.py", "pkg/c.py"]
+    assert [(e["file"], e["name"]) for e in result["introduced"]] == [("pkg/a.py", "epsilon"), ("pkg/b.py", "delta")]
+    assert [e["name"] for e in result["resolved"]] == ["beta"]
+    assert result["issues"] == result["introduced"]
+
+    full_now = {e["name"] for e in analyze_project(str(project))["issues"]}
+    assert full_now == {"delta", "epsilon"}
+
+    # The matching mode applies to the changed files too: "address" only documents addr as a substring.
+    (project / "pkg" / "d.py").write_text("def addr():\n    pass\n")
+    (project / "CHANGES.md").write_text("Zeta is new. Pass an address.\n")
+    substring = analyze_project(str(project), base_revision="HEAD")
+    identifier = analyze_project(str(project), base_revision="HEAD", mode="identifier")
+    assert "addr" not in [e["name"] for e in substring["introduced"]]
+    assert ("pkg/d.py", "addr") in [(e["file"], e["name"]) for e in identifier["introduced"]]
+
+def test_sharded_map_reduce_matches_single_node(tmp_path):
+    """Shards run as separate processes should reduce to the single-node analyze_project output."""
+    import json
+    import subprocess
+    from data_generator import generate_synthetic_project
+    import pytest
+    from analyzer.shards import reduce_shards, run_shard
+
+    project = tmp_path / "proj"
+    generate_synthetic_project(str(project), files=40, defs_per_file=6, doc_files=4, doc_bytes=20_000, seed=3)
+    expected = analyze_project(str(project))
+
+    parts = tmp_path / "parts"
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-m", "analyzer.shards", "map", str(project),
+             "--shard", str(i), "--shards", "3", "--out", str(parts)],
+            cwd=str(PROJECT_ROOT), stdout=subprocess.PIPE,
+        )
+        for i in range(3)
+    ]
+    for p in procs:
+        p.communicate()  # reads and closes the pipe
+        assert p.returncode == 0
+    output = tmp_path / "result.json"
+    subprocess.run(
+        [sys.executable, "-m", "analyzer.shards", "reduce", str(parts), "--output", str(output)],
+        cwd=str(PROJECT_ROOT), check=True,
+    )
+    merged = json.loads(output.read_text())
+    assert merged["checked_samples"] == expected["checked_samples"]
+    assert [(e["file"], e["name"]) for e in merged["issues"]] == [(e["file"], e["name"]) for e in expected["issues"]]
+    assert reduce_shards(str(parts)) == expected
+
+    (parts / "shard-00001-of-00003.json").unlink()
+    with pytest.raises(ValueError):
+        reduce_shards(str(parts))
+    run_shard(str(project), 1, 3, str(parts), mode="identifier")
+    with pytest.raises(ValueError):
+        reduce_shards(str(parts))
+
+def test_analyze_project_async_matches_sync_without_blocking_the_loop(tmp_path):
+    """analyze_project_async should return the analyze_project result while the loop keeps ticking."""
+    import asyncio
+    from data_generator import generate_synthetic_project
+    from analyzer import analyze_project_async
+    from analyzer.aio import AsyncAnalyzer, LoopLagMonitor
+
+    project = tmp_path / "proj"
+    generate_synthetic_project(str(project), files=150, defs_per_file=20, doc_files=4, doc_bytes=20_000, seed=5)
+    (project / "broken.py").write_text("def broken(:\n")
+    expected = analyze_project(str(project))
+
+    async def scenario():
+        async with LoopLagMonitor() as blocking:
+            analyze_project(str(project))
+        async with AsyncAnalyzer(workers=2) as analyzer:
+            await analyzer.analyze(str(project))  # pools started outside the measurement
+            async with LoopLagMonitor() as lag:
+                result = await analyze_project_async(str(project), analyzer=analyzer)
+        return result, blocking.stats(), lag.stats()
+
+    result, blocking, lag = asyncio.run(scenario())
+    assert result == expected
+    assert result["skipped_files"][0]["reason"] == "syntax"
+    assert blocking["samples"] == 1
+    assert lag["samples"] > 5
+    assert lag["p99"] < blocking["max"] / 4
+    assert asyncio.run(analyze_project_async(str(project), doc_chunk_size=4096)) == expected
+    strict = analyze_project(str(project), mode="identifier")
+    assert asyncio.run(analyze_project_async(str(project), mode="identifier")) == strict
+
+def test_analyze_project_async_llm_timeouts_cancellation_and_backpressure(tmp_path):
+    """Async LLM calls should time out and be cancelled; extra analyses should wait or be refused."""
+    import asyncio
+    import pytest
+    from analyzer import LLMPipeline
+    from analyzer.aio import AnalyzerBusy, AsyncAnalyzer
+
+    (tmp_path / "mod.py").write_text("def f():\n    pass\n")
+    calls, cancelled = [], []
+
+    async def hanging_llm(prompt):
+        calls.append(prompt)
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.append(prompt)
+            raise
+
+    async def scenario():
+        async with AsyncAnalyzer(workers=1, max_concurrent=1, max_waiting=1) as analyzer:
+            timed_out = await analyzer.analyze(
+                str(tmp_path), llm_pipeline=LLMPipeline(hanging_llm, timeout=0.05, retries=1, backoff=0)
+            )
+            assert timed_out["llm"]["failed_batches"] == timed_out["llm"]["batches"] == 1
+            assert "exceeded 0.05s" in timed_out["llm_analysis"]
+            assert len(calls) == len(cancelled) == 2
+
+            hanging = LLMPipeline(hanging_llm, timeout=None)
+            first = asyncio.ensure_future(analyzer.analyze(str(tmp_path), llm_pipeline=hanging))
+            while len(calls) < 3:
+                await asyncio.sleep(0.01)
+            second = asyncio.ensure_future(analyzer.analyze(str(tmp_path), llm_pipeline=hanging))
+            await asyncio.sleep(0.01)
+            assert analyzer.stats() == {"running": 1, "waiting": 1, "max_concurrent": 1}
+            with pytest.raises(AnalyzerBusy):
+                await analyzer.analyze(str(tmp_path))
+
+            first.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await first
+            assert len(cancelled) == 3
+            while len(calls) < 4:  # the waiting analysis got the slot
+                await asyncio.sleep(0.01)
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(second, 0.05)
+            assert len(cancelled) == 4
+            assert analyzer.stats()["running"] == analyzer.stats()["waiting"] == 0
+
+    asyncio.run(scenario())
@@ -58,6 +58,46 @@ class Greeter:
     finally:
         test_file.unlink()
 
+def test_code_parser_extracts_nested_scopes_signatures_and_decorators():
+    """Nested definitions should get qualified names, signatures and decorators."""
+    source = (
+        "import functools\n"
+        "class Outer(Base, metaclass=Meta):\n"
+        "    class Inner:\n"
+        "        @property\n"
+        "        def value(self) -> int:\n"
+        "            '''The value.'''\n"
+        "            return 1\n"
+        "    async def run(self, *args, timeout: float = 1.0, **kw):\n"
+        "        pass\n"
+        "def build(n):\n"
+        "    @functools.lru_cache(maxsize=None)\n"
+        "    def helper(x=n):\n"
+        "        pass\n"
+        "    return helper\n"
+        "try:\n"
+        "    from fast import speedup\n"
+        "except ImportError:\n"
+        "    def speedup():\n"
+        "        pass\n"
+    )
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "mod.py").write_text(source)
+        elements = {e["name"]: e for e in CodeParser(tmpdir).analyze_directory()}
+
+    assert sorted(elements) == [
+        "Outer", "Outer.Inner", "Outer.Inner.value", "Outer.run", "build", "build.helper", "speedup",
+    ]
+    assert elements["Outer"]["signature"] == "(Base, metaclass=Meta)"
+    assert elements["Outer.Inner.value"]["type"] == "method"
+    assert elements["Outer.Inner.value"]["decorators"] == ("property",)
+    assert elements["Outer.Inner.value"]["signature"] == "(self) -> int"
+    assert elements["Outer.Inner.value"]["doc"] == "The value."
+    assert elements["Outer.run"]["signature"] == "async (self, *args, timeout: float=1.0, **kw)"
+    assert elements["build.helper"]["type"] == "function"
+    assert elements["build.helper"]["decorators"] == ("functools.lru_cache(maxsize=None)",)
+    assert elements["speedup"]["line"] == 18
+
 # ===== DocumentationParser Tests =====
 
 def test_doc_parser_read_docs():
@@ -141,4 +181,725 @@ def test_create_visual_returns_path():
 def test_create_visual_empty_summary():
     """create_visual should handle empty summary gracefully."""
     result = create_visual("")
-    assert isinstance(result, str)
\ No newline at end of file
+    assert isinstance(result, str)
+
+def test_code_parser_parallel_matches_sequential():
+    """Parallel parsing should return the same elements in the same order."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(12):
+            sub = Path(tmpdir) / f"pkg{i % 3}"
+            sub.mkdir(exist_ok=True)
+            (sub / f"mod{i}.py").write_text(
+                f"def func_{i}():\n    '''Doc {i}.'''\n\nclass Klass{i}:\n    def method(self):\n        pass\n"
+            )
+        sequential = CodeParser(tmpdir).analyze_directory()
+        parallel = CodeParser(tmpdir, workers=2, chunk_size=4).analyze_directory()
+        assert len(sequential) == 36
+        assert parallel == sequential
+
+def test_code_parser_reads_bytes_honoring_encoding_and_reports_skips():
+    """Declared encodings should be honored and unparsable files reported, not dropped."""
+    from analyzer import analyze_project
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "legacy.py").write_bytes(b"# -*- coding: latin-1 -*-\ndef caf\xe9():\n    '''D\xe9j\xe0 vu.'''\n")
+        (root / "bom.py").write_bytes(b"\xef\xbb\xbfdef with_bom():\n    pass\n")
+        (root / "binary.py").write_bytes(b"def bad():\n    return '\xff\xfe'\n")
+        (root / "broken.py").write_text("def broken(:\n")
+        (root / "big.py").write_text("".join(f"def f{i}():\n    pass\n" for i in range(2000)))
+        (root / "small.py").write_text("def small():\n    pass\n")
+        cache_file = str(root / "parse.sqlite")
+
+        parser = CodeParser(tmpdir, cache=cache_file)
+        elements = parser.analyze_directory()
+        names = {e["name"] for e in elements}
+        assert {"café", "with_bom", "small", "f1999"} <= names and "bad" not in names
+        assert next(e for e in elements if e["name"] == "café")["doc"] == "Déjà vu."
+        reasons = {Path(s["path"]).name: s["reason"] for s in parser.skipped}
+        assert reasons == {"binary.py": "undecodable", "broken.py": "syntax"}
+        parser.cache.close()
+
+        # Skipped files are not cached as empty: the next run reports them again.
+        warm = CodeParser(tmpdir, cache=cache_file)
+        assert warm.analyze_directory() == elements
+        assert sorted(Path(s["path"]).name for s in warm.skipped) == ["binary.py", "broken.py"]
+        warm.cache.close()
+
+        parallel = CodeParser(tmpdir, workers=2, chunk_size=2)
+        assert parallel.analyze_directory() == elements
+        assert sorted(s["path"] for s in parallel.skipped) == sorted(s["path"] for s in parser.skipped)
+
+        result = analyze_project(tmpdir)
+        assert [Path(s["path"]).name for s in result["skipped_files"]] == ["binary.py", "broken.py"]
+
+LIGHT_EXTRACT_CORPUS = '''"""Module doc.
+def not_a_function():
+    pass
+"""
+X = {"a": (1, [2, {3}]),  # a quote ' and """ in a comment
+'b': \'\'\'
+class NotAClass:
+    pass
+\'\'\'}
+
+
+@decorator.with_args(
+    1, key="value",
+)
+@simple
+async def coroutine(a, /, b: int = 2, *args, c, **kw) -> "Result":
+    ("Parenthesized"
+     " docstring.")
+
+
+class Outer(Base, metaclass=Meta):
+    \'\'\'Outer doc.\'\'\'
+
+    class Inner:
+        def method(self): "One-liner doc."; return 1
+
+    if TYPE_CHECKING:
+        def typed(self) -> None: ...
+    else:
+        def untyped(self):
+            r"""Raw \\" doc."""
+
+    try:
+        def in_try(self): pass
+    except ImportError:
+        def in_except(self): pass
+    else:
+        def in_else(self): pass
+    finally:
+        def in_finally(self): pass
+
+def after(): b"not a docstring"
+
+def éclair(x=')', y="#", z='\\\\'):
+    """Ünïcode."""
+    def inner():
+        class Deep:
+            def deeper(self):
+                """Deepest."""
+
+match command:
+    case "go":
+        def go(): pass
+'''
+
+def test_light_extractor_matches_ast_path_on_corpus():
+    """The tiered extractor should give exactly the full AST results, whatever tier is used."""
+    from analyzer.code_parser import LIGHT_MIN_BYTES
+    from analyzer.metrics import Metrics
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        (root / "tricky.py").write_text(LIGHT_EXTRACT_CORPUS, encoding="utf-8")
+        (root / "crlf.py").write_bytes(LIGHT_EXTRACT_CORPUS.replace("\n", "\r\n").encode("utf-8"))
+        (root / "legacy.py").write_bytes(("# coding: latin-1\n" + LIGHT_EXTRACT_CORPUS).encode("latin-1"))
+        (root / "tabs.py").write_text(LIGHT_EXTRACT_CORPUS.replace("    ", "\t"), encoding="utf-8")
+        (root / "constants.py").write_text("A = 1\nB = 'undefined'\n")
+        corpus = [str(p) for p in root.glob("*.py")]
+        corpus += [str(p) for p in Path(__file__).parent.glob("analyzer/*.py")]
+
+        metrics = Metrics()
+        light = CodeParser(tmpdir, light_min_bytes=0, light_bytes_per_def=0, metrics=metrics)
+        full = CodeParser(tmpdir, light_min_bytes=None)
+        for path in corpus:
+            assert light.analyze_file(path) == full.analyze_file(path), path
+        counters = metrics.counters
+        assert counters["prefiltered_files"] == 1 and counters["light_fallbacks"] >= 1
+        assert counters["light_files"] + counters["light_fallbacks"] + 1 == len(corpus)
+        names = [e["name"] for e in light.analyze_file(str(root / "tricky.py"))]
+        assert "not_a_function" not in names and "NotAClass" not in names
+        assert names.index("Outer.in_finally") < names.index("Outer.in_except")  # AST field order
+
+        # Suggested thresholds: a large generated table takes the light path, regular code does not.
+        rows = "".join(f"    {i}: ('name_{i}', {i * 0.5}),\n" for i in range(20000))
+        (root / "table.py").write_text(f"TABLE = {{\n{rows}}}\n\ndef lookup(key):\n    '''Row.'''\n")
+        metrics = Metrics()
+        parser = CodeParser(tmpdir, metrics=metrics, light_min_bytes=LIGHT_MIN_BYTES)
+        assert [e["name"] for e in parser.analyze_file(str(root / "table.py"))] == ["lookup"]
+        parser.analyze_file(str(root / "tricky.py"))
+        assert metrics.counters["light_files"] == 1 and metrics.counters["files"] == 2
+
+def test_light_extractor_is_opt_in_for_syntax_errors_outside_definitions():
+    """A large file with a syntax error outside its defs is skipped by default; opted in, it is not checked."""
+    from analyzer.code_parser import LIGHT_MIN_BYTES
+    from analyzer.metrics import Metrics
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        rows = "".join(f"    {i}: ('name_{i}', {i * 0.5}),\n" for i in range(20000))
+        path = Path(tmpdir) / "table.py"
+        path.write_text(f"TABLE = {{\n{rows}}}\nBROKEN = = 1\n\ndef lookup(key):\n    '''Row.'''\n")
+        assert path.stat().st_size >= LIGHT_MIN_BYTES
+
+        metrics = Metrics()
+        default = CodeParser(tmpdir, metrics=metrics)
+        assert default.analyze_file(str(path)) == []
+        assert [s["path"] for s in default.skipped] == [str(path)]
+        assert "light_files" not in metrics.counters
+
+        metrics = Metrics()
+        light = CodeParser(tmpdir, metrics=metrics, light_min_bytes=LIGHT_MIN_BYTES)
+        assert [e["name"] for e in light.analyze_file(str(path))] == ["lookup"]
+        assert light.skipped == [] and metrics.counters["light_files"] == 1
+
+def test_code_parser_cache_serves_unchanged_files():
+    """Warm runs should hit the parse cache and re-parse only modified files."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        project = Path(tmpdir) / "proj"
+        project.mkdir()
+        (project / "a.py").write_text("def alpha():\n    pass\n")
+        (project / "b.py").write_text("def beta():\n    pass\n")
+        cache_file = str(Path(tmpdir) / "cache" / "parse.sqlite")
+
+        cold = CodeParser(str(project), cache=cache_file)
+        first = cold.analyze_directory()
+        assert cold.cache.misses == 2 and cold.cache.hits == 0
+        cold.cache.close()
+
+        (project / "b.py").write_text("def beta():\n    pass\n\ndef gamma():\n    pass\n")
+        warm = CodeParser(str(project), cache=cache_file)
+        second = warm.analyze_directory()
+        assert warm.cache.hits == 1 and warm.cache.misses == 1
+        assert [e["name"] for e in second] == ["alpha", "beta", "gamma"]
+        assert second[0] == first[0]
+        warm.cache.close()
+
+def test_parse_cache_invalidated_on_version_change():
+    """Changing the extractor version should discard every cached entry."""
+    from analyzer.parse_cache import ParseCache
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        src = Path(tmpdir) / "a.py"
+        src.write_text("def alpha():\n    pass\n")
+        cache_file = str(Path(tmpdir) / "parse.sqlite")
+        cache = ParseCache(cache_file, version=1)
+        cache.put(str(src), [{"name": "alpha", "type": "function", "file": "a.py", "line": 1, "doc": None}])
+        cache.close()
+
+        same = ParseCache(cache_file, version=1)
+        assert same.get(str(src)) is not None
+        same.close()
+        bumped = ParseCache(cache_file, version=2)
+        assert bumped.get(str(src)) is None
+        bumped.close()
+
+def test_comparator_matches_plain_substring_semantics():
+    """The indexed engine should flag exactly what a naive substring scan flags."""
+    names = ["add", "dd", "Student", "Student.__init__", "__init__", "calc", "sub-tract", "Teacher", "ress"]
+    code_elements = [
+        {"name": n, "type": "function", "file": "a.py", "line": i, "doc": None} for i, n in enumerate(names)
+    ]
+    docs = [
+        {"filename": "README.md", "content": "Use `add` for addresses. Student.__init__ builds a Stud"},
+        {"filename": "notes.txt", "content": "ent; see sub-tract and calculator"},
+    ]
+    all_doc_text = " ".join(d["content"] for d in docs)
+    expected = [e for e in code_elements if e["name"] not in all_doc_text]
+
+    assert Comparator(code_elements, docs).check_consistency() == expected
+    assert list(Comparator(code_elements, docs).iter_issues()) == expected
+
+def test_substring_index_matches_plain_substring_scan():
+    """SubstringIndex.occurs should agree with ``in`` on the joined tokens, short names included."""
+    import random
+    from analyzer.matching import SUBSTRING_CANDIDATES, SubstringIndex
+
+    rng = random.Random(3)
+    tokens = {"".join(rng.choice("ab_1.") for _ in range(rng.randint(1, 12))) for _ in range(400)}
+    tokens.update(f"common_{i}" for i in range(4 * SUBSTRING_CANDIDATES))
+    joined = "\n".join(tokens)
+    index = SubstringIndex(tokens)
+    names = ["", "a", "b_", "zzz", "common_", "common_77", "mon_1", "ommon_0x"]
+    names += ["".join(rng.choice("ab_1.") for _ in range(rng.randint(1, 8))) for _ in range(2000)]
+    for name in names:
+        assert index.occurs(name) == (name in joined), name
+
+def test_comparator_identifier_mode_is_stricter():
+    """identifier mode should not count partial-word occurrences as documented."""
+    code_elements = [
+        {"name": "add", "type": "function", "file": "a.py", "line": 1, "doc": None},
+        {"name": "Student", "type": "class", "file": "a.py", "line": 2, "doc": None},
+    ]
+    docs = [{"filename": "README.md", "content": "The address is stored by Student.__init__."}]
+
+    assert Comparator(code_elements, docs).check_consistency() == []
+    missing = Comparator(code_elements, docs, mode="identifier").check_consistency()
+    assert [m["name"] for m in missing] == ["add"]
+
+def test_markdown_structure_index_and_strict_modes():
+    """The structure index should tell headings, code spans and fences apart from prose."""
+    from analyzer.doc_structure import CODE, HEADING, TEXT, StructureCache, parse_structure
+
+    content = (
+        "Intro mentions prose_only.\n"
+        "# Module `render`\n"
+        "Call `Parser.run` first.\n"
+        "```python\n"
+        "fenced_call()\n"
+        "# not a heading\n"
+        "```\n"
+        "Setext title\n"
+        "------------\n"
+        "Talks about fenced_call again.\n"
+    )
+    structure = parse_structure(content.splitlines())
+    assert [(level, title) for level, title, _ in structure.headings] == [(1, "Module `render`"), (2, "Setext title")]
+    assert structure.contexts["render"] == HEADING | CODE
+    assert structure.contexts["run"] == CODE and structure.contexts["Parser.run"] == CODE
+    assert structure.contexts["fenced_call"] == CODE | TEXT
+    assert structure.contexts["prose_only"] == TEXT
+    assert structure.contexts["heading"] == CODE  # inside the fence
+    assert structure.section_titles("fenced_call") == ["Module `render`", "Setext title"]
+    assert structure.section_titles("prose_only") == [""]
+
+    code_elements = [
+        {"name": n, "type": "function", "file": "a.py", "line": i, "doc": None}
+        for i, n in enumerate(["render", "run", "fenced_call", "prose_only", "Setext"])
+    ]
+    docs = [{"filename": "README.md", "content": content}]
+    def missing(mode):
+        return [m["name"] for m in Comparator(code_elements, docs, mode=mode).check_consistency()]
+    assert missing("identifier") == []
+    assert missing("code") == ["prose_only", "Setext"]
+    assert missing("heading") == ["run", "fenced_call", "prose_only"]
+    assert missing("structured") == ["prose_only"]
+
+    cache = StructureCache()
+    cache.get(docs[0])
+    cache.get({"filename": "copy.md", "content": content})
+    assert cache.stats()["hits"] == 1 and cache.stats()["entries"] == 1
+
+def test_comparator_fuzzy_mode_scores_near_misses():
+    """fuzzy mode should accept near-miss and descriptive mentions and rate what is left."""
+    import pytest
+    from analyzer.fuzzy import FuzzyIndex, name_words
+    from analyzer.matching import DocIndex
+    from analyzer.shards import run_shard
+
+    assert name_words("pkg.Student.__init__") == ["student", "init"]
+    assert name_words("HTTPServer.getURL") == ["http", "server", "get", "url"]
+    names = ["Student.__init__", "Student.get_grade", "Student.save", "compute_total", "frobnicate"]
+    code_elements = [
+        {"name": n, "type": "function", "file": "a.py", "line": i, "doc": None} for i, n in enumerate(names)
+    ]
+    docs = [{"filename": "README.md", "content": (
+        "The Student's constructor takes a name. Call `Student.getGrades` for the marks,\n"
+        "and Student.save to store them. We compute a lot of things here.\n\n"
+        "Much later, and in another paragraph, the total is shown.\n"
+    )}]
+
+    assert [e["name"] for e in Comparator(code_elements, docs).check_consistency()] == [
+        "Student.__init__", "Student.get_grade", "compute_total", "frobnicate"
+    ]
+    issues = Comparator(code_elements, docs, mode="fuzzy").check_consistency()
+    assert [(e["name"], e["confidence"], e["closest"]) for e in issues] == [
+        ("compute_total", 0.5, "compute total"),
+        ("frobnicate", 1.0, None),
+    ]
+    assert list(Comparator(code_elements, docs, mode="fuzzy").iter_issues()) == issues
+    index = DocIndex(docs)
+    assert index.contains("Student.__init__", "fuzzy") and not index.contains("compute_total", "fuzzy")
+
+    # Only max_candidates words are verified per lookup: with one, the best n-gram hit wins.
+    fuzzy = FuzzyIndex(docs, max_candidates=1)
+    assert fuzzy.similar("grade") == [(pytest.approx(8 / 11), "grades")]
+    assert fuzzy.similar("init") == [(0.9, "constructor")]
+    assert fuzzy.near("student", "constructor") and not fuzzy.near("compute", "total")
+    with pytest.raises(ValueError):
+        run_shard("example_project", 0, 1, "unused", mode="fuzzy")
+
+def test_iter_counterparts_match_list_apis():
+    """iter_elements/iter_docs/iter_issues should produce the same items as the list APIs."""
+    cp = CodeParser(str(PROJECT_ROOT / "example_project"))
+    dp = DocumentationParser(str(PROJECT_ROOT / "example_project"))
+    elements = cp.analyze_directory()
+    docs = dp.read_docs()
+
+    assert sorted(cp.iter_elements(), key=lambda e: (e["file"], e["line"])) == elements
+    assert list(dp.iter_docs()) == docs
+    comp = Comparator(elements, docs)
+    assert list(comp.iter_issues()) == comp.check_consistency()
+
+def test_code_parser_compact_records_behave_like_dicts():
+    """compact=True should return slotted records equal to the dict elements."""
+    from analyzer.elements import CodeElement
+
+    project = str(PROJECT_ROOT / "example_project")
+    dicts = CodeParser(project).analyze_directory()
+    records = CodeParser(project, compact=True).analyze_directory()
+
+    assert all(isinstance(r, CodeElement) for r in records)
+    assert records == dicts
+    assert [dict(r) for r in records] == dicts
+    assert not hasattr(records[0], "__dict__")
+    same_file = [r for r in records if r["file"] == records[0]["file"]]
+    assert all(r.file is same_file[0].file for r in same_file)
+    assert Comparator(records, []).check_consistency() == records
+
+# ===== Walker Tests =====
+
+def test_walk_files_prunes_and_honors_ignore_rules():
+    """walk_files should prune excluded dirs and apply .gitignore, globs and size limits."""
+    from analyzer.walker import walk_files
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        root = Path(tmpdir)
+        for rel in [
+            "pkg/core.py", "pkg/generated/big.py", "pkg/generated/keep.py", "pkg/notes.md",
+            "node_modules/lib/x.py", ".git/hooks/h.py", ".venv-3.11/site.py", "build/out.py",
+            "scratch.py", "tests/test_core.py",
+        ]:
+            (root / rel).parent.mkdir(parents=True, exist_ok=True)
+            (root / rel).write_text("x = 1\n")
+        (root / "pkg" / "generated" / "big.py").write_text("x = 1\n" * 100)
+        (root / ".gitignore").write_text("# local files\n/scratch.py\npkg/generated/*\n!pkg/generated/keep.py\n")
+
+        def rels(**kwargs):
+            return [Path(p).relative_to(root).as_posix() for p in walk_files(str(root), (".py",), **kwargs)]
+
+        assert rels() == ["pkg/core.py", "pkg/generated/keep.py", "tests/test_core.py"]
+        assert rels(use_gitignore=False, max_size=50) == [
+            "scratch.py", "pkg/core.py", "pkg/generated/keep.py", "tests/test_core.py"
+        ]
+        assert rels(exclude=["tests", "generated"]) == ["pkg/core.py"]
+        assert rels(include=["tests/*"]) == ["tests/test_core.py"]
+
+def test_doc_parser_lazy_documents_match_eager_results(monkeypatch):
+    """Lazy (memory-mapped) documents should give the same comparison results as eager docs."""
+    import analyzer.doc_parser as doc_parser_mod
+    from analyzer.doc_parser import LazyDocument
+
+    monkeypatch.setattr(doc_parser_mod, "MMAP_THRESHOLD", 16)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        (Path(tmpdir) / "guide.md").write_text("Étape : appeler `add` puis Student.__init__\n" * 50, encoding="utf-8")
+        (Path(tmpdir) / "small.txt").write_text("calc", encoding="utf-8")
+        code_elements = [
+            {"name": n, "type": "function", "file": "a.py", "line": i, "doc": None}
+            for i, n in enumerate(["add", "Étape", "tape", "calc", "Student.__init__", "subtract", "e :"])
+        ]
+
+        lazy_docs = DocumentationParser(tmpdir, lazy=True).read_docs()
+        assert all(isinstance(d, LazyDocument) for d in lazy_docs)
+        eager_docs = DocumentationParser(tmpdir).read_docs()
+        assert sorted(d["content"] for d in lazy_docs) == sorted(d["content"] for d in eager_docs)
+
+        expected = Comparator(code_elements, eager_docs).check_consistency()
+        assert [m["name"] for m in expected] == ["subtract"]
+        assert Comparator(code_elements, lazy_docs).check_consistency() == expected
+
+def test_lazy_doc_tokens_never_cut_a_token_without_spaces(monkeypatch):
+    """A separator-free line longer than the scan window should not lose tokens at the cut."""
+    import analyzer.doc_parser as doc_parser_mod
+    import analyzer.matching as matching
+    from analyzer.matching import DocIndex
+
+    monkeypatch.setattr(doc_parser_mod, "MMAP_THRESHOLD", 16)
+    monkeypatch.setattr(matching, "SCAN_WINDOW", 64)
+    names = ["target_name", "épée_forte", "tail"]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for shift in range(16):
+            line = ",".join(["ab"] * (16 + shift) + ["target_name", "épée_forte", "tail"])
+            (Path(tmpdir) / "data.txt").write_text(line, encoding="utf-8")
+            eager = DocumentationParser(tmpdir).read_docs()
+            lazy = DocumentationParser(tmpdir, lazy=True).read_docs()
+            assert len(line.encode("utf-8")) > matching.SCAN_WINDOW
+            assert DocIndex(eager).missing(names) == set()
+            assert DocIndex(lazy).missing(names) == set()
+            assert DocIndex(lazy).missing(names, "identifier") == set()
+
+def test_chunked_comparison_windows_at_least_scan_window(monkeypatch):
+    """Chunked matching with chunk_size >= SCAN_WINDOW should find names on separator-free lines."""
+    import analyzer.doc_parser as doc_parser_mod
+    import analyzer.matching as matching
+
+    monkeypatch.setattr(doc_parser_mod, "MMAP_THRESHOLD", 16)
+    monkeypatch.setattr(matching, "SCAN_WINDOW", 64)
+    long_name = "very_long_" * 8 + "target_name"
+    names = ["target_name", "épée_forte", long_name]
+    elements = [{"name": n, "type": "function"} for n in names]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for shift in range(16):
+            line = ",".join(["ab"] * (16 + shift) + ["target_name", "épée_forte", long_name, "tail"])
+            (Path(tmpdir) / "data.txt").write_text(line, encoding="utf-8")
+            for chunk_size in (64, 96, 128):
+                for mode in ("substring", "identifier"):
+                    docs = DocumentationParser(tmpdir, lazy=True).iter_docs()
+                    comparator = Comparator(elements, docs, mode=mode, chunk_size=chunk_size)
+                    assert comparator.check_consistency() == []
+
+
+def test_chunked_comparison_matches_index_and_stops_early(monkeypatch):
+    """The bounded-memory scan should agree with DocIndex at any window size and stop reading once done."""
+    import random
+    import analyzer.doc_parser as doc_parser_mod
+    from analyzer.matching import ChunkedMatcher
+
+    rng = random.Random(7)
+    words = ["alpha", "beta_gamma", "Delta.run", "épée", "x" * 40, "sub.tract", "e :"]
+    content = "".join(rng.choice(words) + rng.choice([" ", "\n", "", "."]) for _ in range(400))
+    names = ["alpha", "gamma", "Delta", "run", "pée", "x" * 35, "tractor", "e :", "a.beta", "zeta", ""]
+    code_elements = [{"name": n, "type": "function", "file": "a.py", "line": i, "doc": None} for i, n in enumerate(names)]
+    docs = [{"filename": "a.md", "content": content}, {"filename": "b.md", "content": "zeta"}]
+
+    monkeypatch.setattr(doc_parser_mod, "MMAP_THRESHOLD", 16)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for d in docs:
+            (Path(tmpdir) / d["filename"]).write_text(d["content"], encoding="utf-8")
+        lazy_docs = DocumentationParser(tmpdir, lazy=True).read_docs()
+        for mode in ("substring", "identifier"):
+            expected = Comparator(code_elements, docs, mode=mode).check_consistency()
+            for chunk_size in (7, 64, 1 << 20):
+                assert Comparator(code_elements, docs, mode=mode, chunk_size=chunk_size).check_consistency() == expected
+                assert Comparator(code_elements, lazy_docs, mode=mode, chunk_size=chunk_size).check_consistency() == expected
+
+    opened = []
+
+    def doc_stream():
+        for i in range(100):
+            opened.append(i)
+            yield {"filename": f"{i}.md", "content": "alpha beta " * 10}
+
+    matcher_docs = Comparator(code_elements[:1], doc_stream(), chunk_size=8)
+    assert matcher_docs.check_consistency() == []
+    assert opened == [0]
+    try:
+        ChunkedMatcher(["a"], mode="structured")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("expected ValueError")
+
+# ===== LLM Pipeline Tests =====
+
+class FakeLLM:
+    """Local stand-in for a langchain LLM: records prompts, sleeps ``latency`` seconds per call."""
+
+    def __init__(self, latency=0.0, fail_first=0):
+        import threading
+
+        self.latency = latency
+        self.fail_first = fail_first
+        self.prompts = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt):
+        import time
+
+        with self._lock:
+            self.prompts.append(prompt)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failing = len(self.prompts) <= self.fail_first
+        try:
+            time.sleep(self.latency)
+            if failing:
+                raise RuntimeError("transient failure")
+            return f"analysis of {prompt.count(chr(10)) - 1} lines"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+def test_llm_pipeline_covers_all_elements_within_budget():
+    """Every element should be sent, in prompts under the token budget, with bounded concurrency."""
+    from analyzer.llm_pipeline import LLMPipeline, estimate_tokens
+
+    elements = [{"name": f"func_{i}", "type": "function", "doc": None} for i in range(200)]
+    llm = FakeLLM(latency=0.01)
+    run = LLMPipeline(llm, token_budget=150, max_concurrency=3).run(elements)
+
+    sent = "\n".join(llm.prompts)
+    assert all(f"function func_{i} -" in sent for i in range(200))
+    assert all(estimate_tokens(p) <= 150 for p in llm.prompts)
+    assert run["batches"] == len(llm.prompts) > 1
+    assert run["failed_batches"] == 0
+    assert 1 < llm.max_in_flight <= 3
+    assert run["elements"] == 200 and run["elements_per_second"] > 0
+
+def test_llm_pipeline_retries_and_times_out():
+    """Transient failures should be retried and slow calls abandoned after the timeout."""
+    from analyzer.llm_pipeline import LLMPipeline
+
+    flaky = FakeLLM(fail_first=1)
+    run = LLMPipeline(flaky, retries=2, backoff=0).run([{"name": "a", "type": "function"}])
+    assert run["failed_batches"] == 0 and run["retried_batches"] == 1
+
+    slow = FakeLLM(latency=0.5)
+    run = LLMPipeline(slow, retries=0, timeout=0.05).run([{"name": "a", "type": "function"}])
+    assert run["failed_batches"] == 1
+    assert "LLM invocation failed" in run["analysis"]
+
+def test_llm_cache_memory_and_disk_tiers():
+    """LLMCache should serve repeats from memory, survive restarts on disk and honor TTL/size caps."""
+    from analyzer.llm_cache import LLMCache
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "llm.sqlite")
+        cache = LLMCache(path, max_memory_entries=2, max_disk_entries=3)
+        keys = [LLMCache.make_key(f"prompt {i}", "tpl", {"model": "m"}) for i in range(4)]
+        assert keys[0] != LLMCache.make_key("prompt 0", "tpl", {"model": "other"})
+        assert cache.get(keys[0]) is None
+        for i, key in enumerate(keys):
+            cache.put(key, f"answer {i}")
+        assert cache.get(keys[3]) == "answer 3"
+        cache.close()
+
+        reopened = LLMCache(path)
+        assert reopened.get(keys[0]) is None  # evicted by the disk cap
+        assert reopened.get(keys[1]) == "answer 1"
+        assert reopened.stats()["disk_hits"] == 1
+        reopened.close()
+
+        expired = LLMCache(path, ttl=-1)
+        assert expired.get(keys[1]) is None
+        expired.close()
+
+def test_llm_pipeline_uses_cache_for_repeated_prompts():
+    """A second identical run should not call the model at all."""
+    from analyzer.llm_cache import LLMCache
+    from analyzer.llm_pipeline import LLMPipeline
+
+    elements = [{"name": f"func_{i}", "type": "function", "doc": None} for i in range(50)]
+    llm = FakeLLM()
+    pipeline = LLMPipeline(llm, token_budget=100, cache=LLMCache())
+    first = pipeline.run(elements)
+    calls = len(llm.prompts)
+    second = pipeline.run(elements)
+
+    assert len(llm.prompts) == calls
+    assert second["analysis"] == first["analysis"]
+    assert second["cached_batches"] == second["batches"]
+    assert pipeline.cache.stats()["hit_rate"] == 0.5
+
+def test_suggest_text_improvements_caches_llm_answers_as_text(monkeypatch):
+    """The suggester should return the same text on a miss and on a cache hit."""
+    import generator.text_suggester as text_suggester
+    from analyzer.llm_cache import LLMCache
+
+    class Answer:
+        def __str__(self):
+            return "Add an example."
+
+    class Prompt:
+        template = "Suggest: {doc_text}"
+
+        def format(self, doc_text):
+            return self.template.format(doc_text=doc_text)
+
+    calls = []
+
+    def llm(text):
+        calls.append(text)
+        return Answer()
+
+    monkeypatch.setattr(text_suggester, "_get_llm", lambda: (llm, Prompt()))
+    cache = LLMCache()
+    first = suggest_text_improvements("Some doc", cache=cache)
+    second = suggest_text_improvements("Some doc", cache=cache)
+
+    assert first == second == "Add an example."
+    assert calls == ["Suggest: Some doc"]
+    assert cache.stats()["memory_hits"] == 1
+
+# ===== Synthetic project / benchmark Tests =====
+
+def test_generate_synthetic_project_matches_requested_shape():
+    """The synthetic generator should write the requested files, elements and docs."""
+    from data_generator import generate_synthetic_project
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        summary = generate_synthetic_project(
+            tmpdir, files=8, defs_per_file=5, class_ratio=0.0, doc_coverage=1.0, doc_files=2, doc_bytes=2000
+        )
+        elements = CodeParser(tmpdir).analyze_directory()
+        docs = DocumentationParser(tmpdir).read_docs()
+        assert summary["elements"] == len(elements) == 40
+        assert len(docs) == 2 and sum(len(d["content"]) for d in docs) >= 2000
+        assert Comparator(elements, docs).check_consistency() == []
+
+def test_benchmark_suite_reports_every_stage(monkeypatch):
+    """run_benchmarks should time each stage and produce JSON-serializable results."""
+    import json
+    from benchmarks import run_benchmarks
+
+    monkeypatch.setitem(run_benchmarks.TIERS, "tiny", {"files": 3, "defs_per_file": 4, "doc_files": 1, "doc_bytes": 500})
+    report = run_benchmarks.run(["tiny"], repeat=1)
+    json.dumps(report)
+    (result,) = report["results"]
+    assert set(result["seconds"]) == {
+        "analyze_directory", "read_docs", "check_consistency", "analyze_project", "analyze_project_stream",
+        "watcher_doc_edit", "watcher_code_edit",
+    }
+    assert run_benchmarks.compare(report, report)
+
+def test_create_visuals_batch_renders_coverage_charts():
+    """create_visuals should write one PNG per summary, in order, sequentially or in parallel."""
+    from PIL import Image
+    from generator.visual_creator import coverage_by_type, create_visuals
+
+    elements = CodeParser(str(PROJECT_ROOT / "example_project")).analyze_directory()
+    docs = DocumentationParser(str(PROJECT_ROOT / "example_project")).read_docs()
+    coverage = coverage_by_type(elements, Comparator(elements, docs).check_consistency())
+    assert coverage["method"] == {"documented": 0, "missing": 2}
+
+    summaries = [{"project": f"proj/{i}", "coverage": coverage} for i in range(5)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        sequential = create_visuals(summaries, str(Path(tmpdir) / "seq"))
+        parallel = create_visuals(summaries, str(Path(tmpdir) / "par"), workers=2, chunk_size=2)
+        assert [Path(p).name for p in sequential] == [Path(p).name for p in parallel]
+        assert Path(sequential[0]).name == "0000_proj_0.png"
+        for a, b in zip(sequential, parallel):
+            with Image.open(a) as img:
+                assert img.size == (600, 200)
+            assert Path(a).read_bytes() == Path(b).read_bytes()
+
+# ===== Output format Tests =====
+
+def test_ndjson_stream_matches_analyze_project():
+    """stream_project should write every element, then its issue, and a closing summary."""
+    import io
+    from analyzer import analyze_project
+    from analyzer.ndjson import read_ndjson, stream_project
+
+    project = str(PROJECT_ROOT / "example_project")
+    out = io.StringIO()
+    summary = stream_project(project, out)
+    records = list(read_ndjson(io.StringIO(out.getvalue())))
+    expected = analyze_project(project)
+
+    assert records[-1] == {"kind": "summary", **summary}
+    assert summary["checked_samples"] == expected["checked_samples"]
+    elements = [r for r in records if r["kind"] == "element"]
+    issues = [r for r in records if r["kind"] == "issue"]
+    assert len(elements) == expected["checked_samples"]
+    assert sorted((r["file"], r["name"]) for r in issues) == [(e["file"], e["name"]) for e in expected["issues"]]
+    assert records[records.index(issues[0]) - 1]["name"] == issues[0]["name"]
+
+def test_binary_snapshot_round_trip():
+    """A snapshot should load back (memory-mapped) to the same elements."""
+    from analyzer.snapshot import load_snapshot, save_snapshot
+
+    elements = CodeParser(str(PROJECT_ROOT)).analyze_directory()
+    elements.append({"name": "décoré", "type": "function", "file": "ü.py", "line": None, "doc": None,
+                     "signature": "()", "decorators": ("a.b(1)", "c")})
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = str(Path(tmpdir) / "elements.snap")
+        assert save_snapshot(elements, path) == len(elements)
+        with load_snapshot(path) as snap:
+            assert len(snap) == len(elements)
+            assert list(snap) == elements
+            assert snap[-1] == elements[-1] and snap[1:3] == elements[1:3]
+            assert Comparator(snap, []).check_consistency() == elements
+
+        Path(path).write_bytes(b"not a snapshot" * 10)
+        try:
+            load_snapshot(path)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("expected ValueError")